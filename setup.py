@@ -15,6 +15,9 @@ setup(
         'pyyaml',
         'docopt',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     entry_points = {
         'console_scripts': [
             'morfologija=morfologija.tools.morfologija:main',
@@ -1 +1,6 @@
 __version__ = '0.1'
+
+import os
+
+if os.environ.get('MORFOLOGIJA_PROFILE'):
+    from . import profiling  # noqa
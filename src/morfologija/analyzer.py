@@ -0,0 +1,98 @@
+"""Reverse morphological analysis.
+
+Analyzer maps each word form generated by ``Lexeme.genforms`` back to all its
+readings, where each reading is lemma, part of speech name and symbols.
+
+Analyzer is built from whole ``lexemes.txt`` file by a separate compile step
+and saved to a binary file in data directory. Lookup is a single dict access,
+readings are interned and shared between all forms.
+
+"""
+
+import os
+import collections
+
+from . import __version__
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import iterlines
+from .utils import dump
+from .utils import undump
+
+ANALYZER_FILE = 'analyzer.cache'
+ANALYZER_VERSION = 1
+ANALYZER_HEADER = ('morfologija.analyzer', __version__, ANALYZER_VERSION)
+
+Reading = collections.namedtuple('Reading', 'lemma pos symbols')
+
+
+class Analyzer(object):
+    def __init__(self):
+        self.forms = dict()
+        self.readings = dict()
+        self.errors = []
+
+    def reading(self, lemma, pos, symbols):
+        reading = Reading(lemma, pos, tuple(symbols.items()))
+        return self.readings.setdefault(reading, reading)
+
+    def add(self, form, reading):
+        readings = self.forms.get(form, ())
+        if reading not in readings:
+            self.forms[form] = readings + (reading,)
+
+    def remove(self, form, reading):
+        readings = tuple(r for r in self.forms.get(form, ()) if r != reading)
+        if readings:
+            self.forms[form] = readings
+        else:
+            self.forms.pop(form, None)
+
+    def add_lexeme(self, lexeme):
+        lemma = lexeme.get_lemma()
+        for form, symbols in lexeme.surface_forms():
+            self.add(form, self.reading(lemma, lexeme.pos.name, symbols))
+
+    def remove_lexeme(self, lexeme):
+        """Remove readings of lexeme, even if other lexemes have them too."""
+        lemma = lexeme.get_lemma()
+        for form, symbols in lexeme.surface_forms():
+            self.remove(form, self.reading(lemma, lexeme.pos.name, symbols))
+
+    def analyze(self, form):
+        """Return tuple of all ``Reading``'s of given word form."""
+        return self.forms.get(form, ())
+
+    def __len__(self):
+        return len(self.forms)
+
+
+def build(model, lines):
+    """Build analyzer from lines of ``lexemes.txt`` file.
+
+    Lines that can not be turned into lexemes are skipped and collected to
+    ``errors`` list of ``(line number, message)`` pairs.
+
+    """
+    analyzer = Analyzer()
+    for i, line in iterlines(lines):
+        try:
+            lexeme = Lexeme(model.grammar, model.paradigms, model.sources,
+                            line).resolve()
+            analyzer.add_lexeme(lexeme)
+        except LexemeError as e:
+            analyzer.errors.append((i, str(e)))
+    return analyzer
+
+
+def compile(model, data_dir, analyzer_file=ANALYZER_FILE):
+    """Build analyzer from ``lexemes.txt`` and save it to data directory."""
+    with open(os.path.join(data_dir, 'lexemes.txt'), encoding='utf-8') as f:
+        analyzer = build(model, f)
+    dump(os.path.join(data_dir, analyzer_file), ANALYZER_HEADER, analyzer)
+    return analyzer
+
+
+def load(data_dir, analyzer_file=ANALYZER_FILE):
+    """Load compiled analyzer, returns None if it is not compiled."""
+    return undump(os.path.join(data_dir, analyzer_file), ANALYZER_HEADER)
@@ -0,0 +1,334 @@
+"""Performance benchmarks.
+
+Benchmarks time model loading, ``Lexeme`` construction, paradigm definition
+selection, stem extraction, form generation, syllabification, lexicon
+lookup paths used by the command line tool and column store queries.
+
+Benchmarks run on ``lexemes.txt`` from data directory. If there is no
+lexicon file, a synthetic lexicon is sampled from ``lmdb-counts.txt``, where
+each line is a ``pos param1 ... param19,count`` signature and number of
+lexicon entries with that signature. Sampling is weighted by counts and
+seeded, so synthetic lexicon has the same signature distribution as the
+real one and is the same on every run. Lexeme of each synthetic entry is
+taken from paradigm definitions of signature properties, so that entry has
+realistic stem and paradigm.
+
+Each benchmark is run several times and the best time is reported.
+Syllabification and pardef selection caches are cleared before each run of
+benchmarks measuring them. Results are written as JSON, so runs on
+different commits can be compared.
+
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import subprocess
+import collections
+
+from . import __version__
+from . import model
+from . import lookup
+from . import postings
+from . import columns
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import get_signature
+from .lexemes import iterlines
+from .syllabification import syllabificate
+
+COUNTS_FILE = 'lmdb-counts.txt'
+DEFAULT_WORD = 'žodis'
+SEED = 0
+
+Signature = collections.namedtuple('Signature', 'pos params count')
+
+
+def read_counts(path):
+    """Yield signatures and their counts from ``lmdb-counts.txt`` file."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                params, count = line.rsplit(',', 1)
+                params = tuple(map(int, params.split()))
+                yield Signature(params[0], params[1:], int(count))
+
+
+def get_candidate_words(grammar, pos, params):
+    """Yield lexemes of paradigm definitions of given signature."""
+    try:
+        signature = get_signature(grammar, pos, params)
+    except LexemeError:
+        return
+    for value in signature.properties:
+        for pardef in value.node.pardefs or ():
+            for item in (pardef if isinstance(pardef, list) else [pardef]):
+                key = item['key'] if isinstance(item, dict) else item
+                yield key.replace('/', '')
+
+
+def create_line(word, pos, params):
+    return '%s 1 - %d %s' % (word, pos, ' '.join(map(str, params)))
+
+
+def get_signature_line(mdl, pos, params):
+    """Return synthetic ``lexemes.txt`` line of given signature.
+
+    First paradigm definition lexeme, which can be used to build a
+    ``Lexeme``, is used. If there is no such lexeme, line will fail the
+    same way as lines with that signature fail in real lexicon.
+
+    """
+    words = list(get_candidate_words(mdl.grammar, pos, params))
+    for word in words:
+        line = create_line(word, pos, params)
+        try:
+            Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, line).resolve()
+        except LexemeError:
+            continue
+        return line
+    return create_line(words[0] if words else DEFAULT_WORD, pos, params)
+
+
+def synthetic_lexicon(mdl, signatures, size, seed=SEED):
+    """Return list of ``size`` lines sampled from signature counts."""
+    signatures = list(signatures)
+    rng = random.Random(seed)
+    sample = rng.choices(range(len(signatures)),
+                         [s.count for s in signatures], k=size)
+    lines = dict()
+    for i in sorted(set(sample)):
+        lines[i] = get_signature_line(mdl, signatures[i].pos,
+                                      signatures[i].params)
+    return [lines[i] for i in sample]
+
+
+class Context(object):
+    """Data shared by all benchmarks."""
+
+    def __init__(self, data_dir, lexicon, synthetic):
+        self.data_dir = data_dir
+        self.lexicon = lexicon
+        self.synthetic = synthetic
+        self.model = model.load(data_dir)
+        with open(lexicon, encoding='utf-8') as f:
+            self.lines = [line for i, line in iterlines(f)]
+        self.lexemes = []
+        self.errors = 0
+        for line in self.lines:
+            try:
+                self.lexemes.append(self.create_lexeme(line).resolve())
+            except LexemeError:
+                self.errors += 1
+        self.words = sorted({lexeme.lexeme for lexeme in self.lexemes})
+        self.keys = sorted({line.split(None, 1)[0].split('(', 1)[0]
+                            for line in self.lines})
+        self.poses = sorted({
+            fields[3] for fields in map(str.split, self.lines)
+            if len(fields) >= Lexeme.MIN_FIELDS
+        })
+
+    def create_lexeme(self, line):
+        mdl = self.model
+        return Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, line)
+
+
+def bench_model_build(ctx):
+    model.build(ctx.data_dir)
+    return 1
+
+
+def bench_model_load(ctx):
+    model.load(ctx.data_dir)
+    return 1
+
+
+def bench_lexeme(ctx):
+    for line in ctx.lines:
+        try:
+            ctx.create_lexeme(line).resolve()
+        except LexemeError:
+            pass
+    return len(ctx.lines)
+
+
+def bench_get_pardefs(ctx):
+    ctx.model.grammar.pardef_selectors.clear()
+    n = 0
+    for lexeme in ctx.lexemes:
+        for value in lexeme.properties:
+            list(lexeme.get_pardefs(value.node))
+            n += 1
+    return n
+
+
+def bench_get_stem(ctx):
+    ctx.model.grammar.pardef_selectors.clear()
+    for lexeme in ctx.lexemes:
+        lexeme.get_stem()
+    return len(ctx.lexemes)
+
+
+def bench_genforms(ctx):
+    n = 0
+    for lexeme in ctx.lexemes:
+        for forms, symbols in lexeme.genforms():
+            n += len(forms)
+    return n
+
+
+def bench_syllabificate(ctx):
+    syllabificate.cache_clear()
+    for word in ctx.words:
+        syllabificate(word)
+    return len(ctx.words)
+
+
+def bench_lookup_build(ctx):
+    lookup.build(ctx.lexicon)
+    return 1
+
+
+def bench_lookup(ctx):
+    index = lookup.load(ctx.lexicon)
+    try:
+        for key in ctx.keys:
+            list(index.lookup(key))
+    finally:
+        index.close()
+    return len(ctx.keys)
+
+
+def bench_postings_build(ctx):
+    postings.build(ctx.lexicon)
+    return 1
+
+
+def bench_query(ctx):
+    for pos in ctx.poses:
+        list(postings.query(ctx.lexicon, ['3=%s' % pos]))
+    return len(ctx.poses)
+
+
+def bench_columns_build(ctx):
+    columns.build(ctx.lexicon)
+    return 1
+
+
+def bench_columns_select(ctx):
+    store = columns.load(ctx.lexicon)
+    try:
+        for pos in ctx.poses:
+            store.select(['3=%s' % pos])
+    finally:
+        store.close()
+    return len(ctx.poses)
+
+
+def bench_columns_signatures(ctx):
+    store = columns.load(ctx.lexicon)
+    try:
+        store.signature_counts()
+    finally:
+        store.close()
+    return len(ctx.lines)
+
+
+BENCHMARKS = collections.OrderedDict([
+    ('model.build', bench_model_build),
+    ('model.load', bench_model_load),
+    ('Lexeme', bench_lexeme),
+    ('Lexeme.get_pardefs', bench_get_pardefs),
+    ('Lexeme.get_stem', bench_get_stem),
+    ('Lexeme.genforms', bench_genforms),
+    ('syllabificate', bench_syllabificate),
+    ('lookup.build', bench_lookup_build),
+    ('lookup', bench_lookup),
+    ('postings.build', bench_postings_build),
+    ('query', bench_query),
+    ('columns.build', bench_columns_build),
+    ('columns.select', bench_columns_select),
+    ('columns.signature_counts', bench_columns_signatures),
+])
+
+
+def timeit(func, ctx, repeat):
+    """Return number of operations and list of times of each run."""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        n = func(ctx)
+        times.append(time.perf_counter() - start)
+    return n, times
+
+
+def get_commit():
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def run_context(ctx, repeat=3, names=None):
+    results = collections.OrderedDict()
+    for name, func in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        n, times = timeit(func, ctx, repeat)
+        best = min(times)
+        results[name] = collections.OrderedDict([
+            ('n', n),
+            ('best', best),
+            ('mean', sum(times) / len(times)),
+            ('per_op_us', best / n * 1e6 if n else None),
+            ('times', times),
+        ])
+    return collections.OrderedDict([
+        ('morfologija', __version__),
+        ('commit', get_commit()),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('timestamp', time.strftime('%Y-%m-%dT%H:%M:%S%z')),
+        ('repeat', repeat),
+        ('lexicon', collections.OrderedDict([
+            ('path', None if ctx.synthetic else ctx.lexicon),
+            ('synthetic', ctx.synthetic),
+            ('lines', len(ctx.lines)),
+            ('errors', ctx.errors),
+        ])),
+        ('benchmarks', results),
+    ])
+
+
+def run(data_dir, counts=COUNTS_FILE, size=10000, repeat=3, names=None,
+        seed=SEED):
+    """Run benchmarks and return results as a JSON serializable dict.
+
+    ``size`` and ``seed`` are used only for synthetic lexicon.
+
+    """
+    lexicon = os.path.join(data_dir, 'lexemes.txt')
+    if os.path.exists(lexicon):
+        return run_context(Context(data_dir, lexicon, False), repeat, names)
+
+    lines = synthetic_lexicon(model.load(data_dir), read_counts(counts),
+                              size, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        lexicon = os.path.join(tmp, 'lexemes.txt')
+        with open(lexicon, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return run_context(Context(data_dir, lexicon, True), repeat, names)
+
+
+def write(results, output=sys.stdout):
+    json.dump(results, output, indent=2, ensure_ascii=False)
+    output.write('\n')
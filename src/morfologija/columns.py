@@ -0,0 +1,333 @@
+"""Columnar store of ``lexemes.txt``.
+
+Numeric columns of lexicon (source, part of speech and all parameters) are
+stored as fixed width integer arrays, one array per column, lexemes and
+lemmas are stored in a string heap. Store is written next to lexicon file,
+as ``lexemes.txt.columns``, and is rebuilt automatically if modification
+time or size of lexicon file changes.
+
+Columns are numbered same way as in ``postings``: 1 is source, 3 is part of
+speech and 4 and following columns are parameters. Values, which are
+missing or are not numbers, are stored as ``MISSING`` and never match any
+condition.
+
+File layout, all integers are little endian:
+
+header
+    Magic bytes, format version, lexicon file modification time in
+    nanoseconds, lexicon file size, number of rows, number of numeric
+    columns and size of string heap.
+
+line numbers
+    Unsigned 32 bit line number of each row.
+
+columns
+    Signed 32 bit values of each numeric column, one column after another.
+
+lexemes, lemmas
+    ``rows + 1`` unsigned 32 bit offsets of each row string in heap, lemma
+    is empty if it is the same as lexeme.
+
+heap
+    UTF-8 encoded lexemes followed by UTF-8 encoded lemmas.
+
+File is memory mapped and columns are used without copying: as NumPy arrays
+if NumPy is installed, otherwise as ``memoryview``'s. With NumPy, filters
+and group-bys are vectorized, without it, they are plain Python loops.
+
+"""
+
+import os
+import sys
+import mmap
+import array
+import struct
+import operator
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .postings import parse_query
+
+COLUMNS_SUFFIX = '.columns'
+COLUMNS_MAGIC = b'MRFLXCOL'
+COLUMNS_VERSION = 1
+
+HEADER = struct.Struct('<8sIqqIII')
+INDEX = struct.Struct('<I')
+
+MISSING = -1
+CODE_COLUMNS = (1, 3)
+FIRST_PARAM_COLUMN = 4
+
+OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def get_column_number(index):
+    """Return lexicon column number of store column index."""
+    if index < len(CODE_COLUMNS):
+        return CODE_COLUMNS[index]
+    return FIRST_PARAM_COLUMN + index - len(CODE_COLUMNS)
+
+
+def get_column_index(column):
+    """Return store column index of lexicon column number or None."""
+    if column in CODE_COLUMNS:
+        return CODE_COLUMNS.index(column)
+    if column >= FIRST_PARAM_COLUMN:
+        return column - FIRST_PARAM_COLUMN + len(CODE_COLUMNS)
+    return None
+
+
+def parse_int(fields, column):
+    try:
+        return int(fields[column])
+    except (IndexError, ValueError):
+        return MISSING
+
+
+def build(path):
+    """Build store of lexicon file and return it as bytes."""
+    stat = os.stat(path)
+    linenos = array.array('I')
+    columns = [array.array('i') for column in CODE_COLUMNS]
+    lexemes = array.array('I', [0])
+    lemmas = array.array('I', [0])
+    lexeme_heap = bytearray()
+    lemma_heap = bytearray()
+
+    with open(path, 'rb') as f:
+        for lineno, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            row = len(linenos)
+            linenos.append(lineno)
+
+            nparams = max(len(fields) - FIRST_PARAM_COLUMN, 0)
+            while len(columns) < len(CODE_COLUMNS) + nparams:
+                columns.append(array.array('i', [MISSING]) * row)
+            for index, values in enumerate(columns):
+                values.append(parse_int(fields, get_column_number(index)))
+
+            lexeme_heap.extend(fields[0])
+            lexemes.append(len(lexeme_heap))
+            lemma = fields[2] if len(fields) > 2 else b'-'
+            if lemma != b'-':
+                lemma_heap.extend(lemma)
+            lemmas.append(len(lemma_heap))
+
+    heap = lexeme_heap + lemma_heap
+    lemmas = array.array('I', (len(lexeme_heap) + i for i in lemmas))
+    arrays = [linenos] + columns + [lexemes, lemmas]
+    if sys.byteorder != 'little':
+        for values in arrays:
+            values.byteswap()
+
+    header = HEADER.pack(COLUMNS_MAGIC, COLUMNS_VERSION, stat.st_mtime_ns,
+                         stat.st_size, len(linenos), len(columns), len(heap))
+    return b''.join([header] + [a.tobytes() for a in arrays] + [bytes(heap)])
+
+
+class ColumnStore(object):
+    def __init__(self, path, buf):
+        self.path = path
+        self.buf = buf
+        magic, version, mtime, size, rows, ncolumns, heap_size = \
+            HEADER.unpack_from(buf, 0)
+        if magic != COLUMNS_MAGIC or version != COLUMNS_VERSION:
+            raise ValueError('Not a compiled morfologija column store.')
+        self.rows = rows
+        self.ncolumns = ncolumns
+        size = rows * INDEX.size
+        self.linenos_offset = HEADER.size
+        self.columns_offset = self.linenos_offset + size
+        self.lexemes_offset = self.columns_offset + ncolumns * size
+        self.lemmas_offset = self.lexemes_offset + size + INDEX.size
+        self.heap_offset = self.lemmas_offset + size + INDEX.size
+        self.cache = dict()
+
+    def __len__(self):
+        return self.rows
+
+    def get_array(self, offset, count, typecode):
+        """Return zero copy array of ``count`` integers at offset."""
+        key = offset, typecode
+        if key not in self.cache:
+            if numpy is not None:
+                dtype = '<i4' if typecode == 'i' else '<u4'
+                self.cache[key] = numpy.frombuffer(self.buf, dtype, count,
+                                                   offset)
+            elif sys.byteorder == 'little':
+                view = memoryview(self.buf)[offset:offset + count * 4]
+                self.cache[key] = view.cast(typecode)
+            else:
+                values = array.array(typecode)
+                values.frombytes(self.buf[offset:offset + count * 4])
+                values.byteswap()
+                self.cache[key] = values
+        return self.cache[key]
+
+    def column(self, column):
+        """Return values of given lexicon column number."""
+        index = get_column_index(column)
+        if index is None or index >= self.ncolumns:
+            raise KeyError(column)
+        offset = self.columns_offset + index * self.rows * INDEX.size
+        return self.get_array(offset, self.rows, 'i')
+
+    def columns(self):
+        """Return list of lexicon column numbers in store."""
+        return [get_column_number(i) for i in range(self.ncolumns)]
+
+    @property
+    def linenos(self):
+        return self.get_array(self.linenos_offset, self.rows, 'I')
+
+    def get_string(self, offsets_offset, row):
+        start, end = struct.unpack_from('<II', self.buf,
+                                        offsets_offset + row * INDEX.size)
+        start += self.heap_offset
+        end += self.heap_offset
+        return bytes(self.buf[start:end]).decode('utf-8')
+
+    def lexeme(self, row):
+        return self.get_string(self.lexemes_offset, row)
+
+    def lemma(self, row):
+        """Return lemma of row, which is lexeme if lemma is not given."""
+        return self.get_string(self.lemmas_offset, row) or self.lexeme(row)
+
+    def mask(self, condition):
+        """Return NumPy boolean array of rows matching condition."""
+        try:
+            values = self.column(condition.column)
+        except KeyError:
+            return numpy.zeros(self.rows, dtype=bool)
+        if isinstance(condition.values, range):
+            result = (
+                (values >= condition.values.start) &
+                (values < condition.values.stop)
+            )
+        elif isinstance(condition.values, frozenset):
+            result = numpy.isin(values, list(condition.values))
+        else:
+            result = OPERATORS[condition.op](values, condition.values)
+        if condition.op == '!=' and not isinstance(condition.values, int):
+            result = ~result
+        return result & (values != MISSING)
+
+    def select(self, conditions):
+        """Return rows matching all conditions, see ``postings``."""
+        conditions = parse_query(conditions)
+        if numpy is not None:
+            result = numpy.ones(self.rows, dtype=bool)
+            for condition in conditions:
+                result &= self.mask(condition)
+            return numpy.flatnonzero(result)
+
+        rows = range(self.rows)
+        for condition in conditions:
+            try:
+                values = self.column(condition.column)
+            except KeyError:
+                return []
+            rows = [
+                row for row in rows
+                if values[row] != MISSING and condition.match(values[row])
+            ]
+        return list(rows)
+
+    def count(self, conditions):
+        return len(self.select(conditions))
+
+    def group_by(self, columns, rows=None):
+        """Return ``Counter`` of value tuples of given columns.
+
+        ``rows`` is an optional selection of rows, see ``select``.
+
+        """
+        arrays = [self.column(column) for column in columns]
+        if numpy is None:
+            if rows is not None:
+                arrays = [[values[row] for row in rows] for values in arrays]
+            return collections.Counter(zip(*arrays))
+
+        if rows is not None:
+            arrays = [values[rows] for values in arrays]
+        if not arrays or not len(arrays[0]):
+            return collections.Counter()
+        keys = numpy.zeros(len(arrays[0]), dtype=numpy.int64)
+        radix = 1
+        for values in arrays:
+            values = values.astype(numpy.int64) - MISSING
+            size = int(values.max()) + 1
+            if radix * size >= 2 ** 62:
+                # Renumber keys densely, so that they do not overflow.
+                unique, keys = numpy.unique(keys, return_inverse=True)
+                radix = len(unique)
+            keys = keys * size + values
+            radix *= size
+        unique, first, counts = numpy.unique(keys, return_index=True,
+                                             return_counts=True)
+        matrix = numpy.stack(arrays, axis=1)[first].tolist()
+        return collections.Counter({
+            tuple(values): count
+            for values, count in zip(matrix, counts.tolist())
+        })
+
+    def signature_counts(self, rows=None):
+        """Return ``Counter`` of ``(pos, param1, ...)`` signatures."""
+        columns = [column for column in self.columns() if column != 1]
+        return self.group_by(columns, rows)
+
+    def close(self):
+        self.cache.clear()
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+
+
+def get_header(path):
+    stat = os.stat(path)
+    return COLUMNS_MAGIC, COLUMNS_VERSION, stat.st_mtime_ns, stat.st_size
+
+
+def is_fresh(path):
+    try:
+        with open(path + COLUMNS_SUFFIX, 'rb') as f:
+            header = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return False
+    return header[:4] == get_header(path)
+
+
+def open_store(path):
+    with open(path + COLUMNS_SUFFIX, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return ColumnStore(path, buf)
+
+
+def load(path):
+    """Open store of given lexicon file, rebuilding it if it is stale."""
+    if not is_fresh(path):
+        data = build(path)
+        tmp = '%s%s.%d.tmp' % (path, COLUMNS_SUFFIX, os.getpid())
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path + COLUMNS_SUFFIX)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return ColumnStore(path, data)
+    return open_store(path)
@@ -0,0 +1,271 @@
+"""Prefix completion of lemmas and word forms.
+
+Completion index contains every lexeme of ``lexemes.txt`` and every form
+generated by ``Lexeme.genforms``, each mapped to its lemmas. Words are
+sorted by their UTF-8 encoding and front coded in blocks of ``BLOCK_SIZE``
+entries: the first word of a block is stored in full, following words only
+store the length of the prefix shared with the previous word and the rest
+of the word. Each entry is::
+
+    shared prefix length, suffix length, suffix, number of lemmas, lemma IDs
+
+where all numbers are variable length integers. First words of blocks are
+also kept in a list and binary searched to find blocks of words with a
+given prefix.
+
+Without frequencies completions are returned in sorted order. If word
+frequencies are given when index is built, completions are ranked by
+frequency. Maximum frequency of each block is stored, so blocks are scanned
+starting from the most frequent ones and scanning stops as soon as no
+remaining block can have a more frequent word. Words with equal frequency
+are ordered alphabetically.
+
+"""
+
+import os
+import array
+import heapq
+import bisect
+import collections
+
+from . import __version__
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import iterlines
+from .utils import dump
+from .utils import undump
+
+COMPLETION_FILE = 'completion.cache'
+COMPLETION_VERSION = 1
+COMPLETION_HEADER = ('morfologija.completion', __version__,
+                     COMPLETION_VERSION)
+
+BLOCK_SIZE = 16
+
+Completion = collections.namedtuple('Completion', 'form lemmas frequency')
+
+
+def write_varint(data, number):
+    while number >= 0x80:
+        data.append(number & 0x7f | 0x80)
+        number >>= 7
+    data.append(number)
+
+
+def read_varint(data, offset):
+    """Return ``(number, offset after number)``."""
+    number = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+
+def read_frequencies(lines):
+    """Return ``{word: frequency}`` from ``word frequency`` lines."""
+    frequencies = dict()
+    for i, line in iterlines(lines):
+        word, frequency = line.split()[:2]
+        frequencies[word] = frequencies.get(word, 0) + int(frequency)
+    return frequencies
+
+
+class CompletionIndex(object):
+    def __init__(self, words, lemmas, frequencies=None):
+        """Build index from ``{word: set of lemmas}`` dict."""
+        self.lemmas = sorted(lemmas)
+        lemma_ids = {lemma: i for i, lemma in enumerate(self.lemmas)}
+        self.data = bytearray()
+        self.blocks = array.array('I')
+        self.block_keys = []
+        self.frequencies = array.array('I') if frequencies else None
+        self.block_max = array.array('I') if frequencies else None
+
+        keys = sorted((word.encode('utf-8'), word) for word in words)
+        previous = b''
+        for i, (key, word) in enumerate(keys):
+            if i % BLOCK_SIZE == 0:
+                self.blocks.append(len(self.data))
+                self.block_keys.append(key)
+                previous = b''
+            shared = len(os.path.commonprefix([previous, key]))
+            write_varint(self.data, shared)
+            write_varint(self.data, len(key) - shared)
+            self.data.extend(key[shared:])
+            write_varint(self.data, len(words[word]))
+            for lemma in sorted(words[word]):
+                write_varint(self.data, lemma_ids[lemma])
+            previous = key
+
+            if frequencies:
+                frequency = frequencies.get(word, 0)
+                self.frequencies.append(frequency)
+                if i % BLOCK_SIZE == 0:
+                    self.block_max.append(frequency)
+                else:
+                    self.block_max[-1] = max(self.block_max[-1], frequency)
+
+        self.data = bytes(self.data)
+        self.count = len(keys)
+
+    def __len__(self):
+        return self.count
+
+    def iter_block(self, block):
+        """Yield ``(entry index, key, lemma IDs)`` of a block."""
+        data = self.data
+        offset = self.blocks[block]
+        key = b''
+        start = block * BLOCK_SIZE
+        for i in range(start, min(start + BLOCK_SIZE, self.count)):
+            # Numbers are almost always single byte, read them inline.
+            shared = data[offset]
+            if shared < 0x80:
+                offset += 1
+            else:
+                shared, offset = read_varint(data, offset)
+            length = data[offset]
+            if length < 0x80:
+                offset += 1
+            else:
+                length, offset = read_varint(data, offset)
+            key = key[:shared] + data[offset:offset + length]
+            offset += length
+            n = data[offset]
+            if n == 1 and data[offset + 1] < 0x80:
+                lemmas = [data[offset + 1]]
+                offset += 2
+            else:
+                n, offset = read_varint(data, offset)
+                lemmas = []
+                for j in range(n):
+                    lemma, offset = read_varint(data, offset)
+                    lemmas.append(lemma)
+            yield i, key, lemmas
+
+    def find_blocks(self, prefix):
+        """Return range of blocks, which can have words with prefix."""
+        start = max(bisect.bisect_left(self.block_keys, prefix) - 1, 0)
+        # UTF-8 never has 0xff byte, so all words with prefix are less than
+        # prefix followed by 0xff.
+        end = bisect.bisect_left(self.block_keys, prefix + b'\xff', start)
+        return range(start, end)
+
+    def completion(self, i, key, lemmas):
+        return Completion(
+            key.decode('utf-8'),
+            tuple(self.lemmas[lemma] for lemma in lemmas),
+            self.frequencies[i] if self.frequencies is not None else None,
+        )
+
+    def iter_matches(self, blocks, prefix):
+        for block in blocks:
+            for i, key, lemmas in self.iter_block(block):
+                if key.startswith(prefix):
+                    yield i, key, lemmas
+                elif key > prefix:
+                    return
+
+    def complete(self, prefix, limit=10):
+        """Return up to ``limit`` completions of given prefix.
+
+        Completions are sorted by frequency, if index has frequencies, and
+        by word otherwise.
+
+        """
+        prefix = prefix.encode('utf-8')
+        blocks = self.find_blocks(prefix)
+        if limit <= 0:
+            return []
+
+        if self.frequencies is None:
+            result = []
+            for match in self.iter_matches(blocks, prefix):
+                result.append(self.completion(*match))
+                if len(result) == limit:
+                    break
+            return result
+
+        # Heap of (frequency, -index, key, lemmas), worst completion first.
+        best = []
+        for block in sorted(blocks, key=lambda b: -self.block_max[b]):
+            if len(best) == limit and self.is_worse(block, best[0]):
+                break
+            for i, key, lemmas in self.iter_matches([block], prefix):
+                item = (self.frequencies[i], -i, key, lemmas)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+        return [
+            self.completion(-negative_index, key, lemmas)
+            for frequency, negative_index, key, lemmas in sorted(best,
+                                                                 reverse=True)
+        ]
+
+    def is_worse(self, block, worst):
+        """Return True if no word of block can replace worst completion.
+
+        Blocks are scanned by their maximum frequency and, for equal
+        frequencies, in word order, so when this is true for a block, it is
+        true for all remaining blocks.
+
+        """
+        frequency, negative_index = worst[:2]
+        return self.block_max[block] < frequency or (
+            self.block_max[block] == frequency and
+            block * BLOCK_SIZE > -negative_index
+        )
+
+
+def build(model, lines, frequencies=None):
+    """Build completion index from ``lexemes.txt`` lines.
+
+    Returns ``(index, errors)``, lexemes of lines, which can not be turned
+    into lexemes, are still indexed, but without their forms.
+
+    """
+    words = dict()
+    lemmas = set()
+    errors = []
+    for i, line in iterlines(lines):
+        try:
+            lexeme = Lexeme(model.grammar, model.paradigms, model.sources,
+                            line)
+        except LexemeError as e:
+            errors.append((i, str(e)))
+            continue
+        lemma = lexeme.get_lemma()
+        lemmas.add(lemma)
+        words.setdefault(lexeme.lexeme, set()).add(lemma)
+        try:
+            for form, symbols in lexeme.resolve().surface_forms():
+                words.setdefault(form, set()).add(lemma)
+        except LexemeError as e:
+            errors.append((i, str(e)))
+    return CompletionIndex(words, lemmas, frequencies), errors
+
+
+def compile(model, data_dir, frequencies=None,
+            completion_file=COMPLETION_FILE):
+    """Build completion index from ``lexemes.txt`` and save it.
+
+    ``frequencies`` is an optional path of word frequency list. Returns
+    ``(index, errors)``, see ``build``.
+
+    """
+    if frequencies is not None:
+        with open(frequencies, encoding='utf-8') as f:
+            frequencies = read_frequencies(f)
+    with open(os.path.join(data_dir, 'lexemes.txt'), encoding='utf-8') as f:
+        index, errors = build(model, f, frequencies)
+    dump(os.path.join(data_dir, completion_file), COMPLETION_HEADER, index)
+    return index, errors
+
+
+def load(data_dir, completion_file=COMPLETION_FILE):
+    """Load completion index, returns None if it is not compiled."""
+    return undump(os.path.join(data_dir, completion_file), COMPLETION_HEADER)
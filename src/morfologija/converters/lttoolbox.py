@@ -1,97 +1,144 @@
-import sys
-import yaml
-
-from ..lexemes import Lexeme
-from ..grammar import Node
-from ..utils   import first
+"""Apertium lttoolbox ``.dix`` dictionary exporter.
 
+Each lexeme is turned into a stem and a paradigm definition, where paradigm
+definition is a list of ``(surface suffix, lemma suffix, tags)`` entries and
+stem is the longest common prefix of lemma and all generated forms.
 
-class Converter(object):
-    def __init__(self, lmdb, mdb, paradigms):
-        self.lmdb_file = lmdb_file
-        self.lmdb = lmdb
-        self.mdb = mdb
-        self.paradigms = paradigms
+Many lexemes share exactly the same paradigm definition, so definitions are
+deduplicated by content hash and only one ``<pardef>`` is written for each
+distinct definition. Paradigm definitions are named after the first lexeme
+using them, in Apertium manner, for example ``vyr/as__n``.
 
-    def build_symbols(self):
-        for node in self.mdb.fields:
-            symbol = node.get('symbol')
-            if symbol is not None:
-                yield '<sdef n=%-10s c="%s"/>' % (
-                    '"%s"' % node['symbol'], node['label']
-                )
-            else:
-                yield '<!-- sdef n=%-10s c="%s"/ -->' % (
-                    '"%s"' % '', node['label']
-                )
-
-        for paradigm in self.paradigms:
-            if paradigm['type'] == 'symbol':
-                yield '<sdef n=%-10s c="%s"/>' % (
-                    '"%s"' % paradigm['key'], paradigm['label']
-                )
-
-    def get_field_values(self, node, params):
-        fields = []
-        for node in node.fields:
-            if 'code' in node:
-                code = node['code']
-                n = code - 4
-                assert n < len(params), ('%s not in params: %r' % (n, params))
-                value_node = self.get_node_by_field(
-                    node.get('fields', []), 'code', params[n]
-                )
-                assert value_node is not None, (
-                    '%s not in %r' % (params[n], node))
-                fields.append((node, value_node))
-            else:
-                fields.extend(self.get_field_values(node, params))
-        return fields
+Dictionary sections must follow paradigm definitions, so lexeme entries are
+streamed to a temporary file first and copied to output at the end. Only
+distinct paradigm definitions are kept in memory.
 
-    def build_paradigms(self):
-        paradigms = {
-            p['key']: p for p in self.paradigms if 'key' in p
-        }
-        import pprint; pprint.pprint(paradigms)
+"""
 
-        for i, line in enumerate(self.lmdb):
-            line = line.strip()
-            #if line.endswith('1 1 1 1 3 1 1 0 0 2 0 0 0 0 1 1 0 0 0 0'):
-            if line.startswith('Adomas '):
-                print(line)
-                lexeme = Lexeme(self.mdb, line)
+import os
+import hashlib
+import tempfile
 
-                pardefs = []
-                for node in lexeme.properties:
-                    pardefs.extend(lexeme.get_pardefs(node))
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
 
-                print(list(pardefs))
+from ..lexemes import Lexeme
+from ..lexemes import LexemeError
+from ..lexemes import iterlines
 
-                for node in lexeme.nodes:
-                    parent = first(node.parents(code__isnull=False))
-                    print('{:2}: {}'.format(parent.code, parent.label))
-                    print('    {}: {}'.format(node.code, node.label[:72]))
-                    print()
+ALPHABET = 'AĄBCČDEĘĖFGHIĮYJKLMNOPRSŠTUŲŪVZŽaąbcčdeęėfghiįyjklmnoprsštuųūvzž'
 
-                #for node in self.mdb.
 
-                yield '<pardef />'
+class Converter(object):
+    def __init__(self, grammar, paradigms, sources, lexemes):
+        self.grammar = grammar
+        self.paradigms = paradigms
+        self.sources = sources
+        self.lexemes = lexemes
+        self.pardefs = dict()
+        self.pardef_names = set()
+        self.symbols = dict()
+        self.errors = []
+
+    def add_symbol(self, symbol, label=''):
+        if symbol not in self.symbols or not self.symbols[symbol]:
+            self.symbols[symbol] = label or ''
+
+    def init_symbols(self):
+        nodes = list(self.grammar.node.nodes)
+        while nodes:
+            node = nodes.pop(0)
+            if node.symbol is not None:
+                self.add_symbol(node.symbol, node.label)
+            nodes.extend(node.nodes)
+
+        for paradigm in self.paradigms.paradigms.values():
+            if paradigm.type == 'symbol':
+                self.add_symbol(paradigm.key, paradigm.label)
 
-                # <pardef n="BASE__bais/ingas">
-                #   <e><p><l>ingas</l><r><s n="m"/><s n="sg"/><s n="nom"/></r></p></e>
-                # </pardef>
+    def build_symbols(self):
+        for symbol, label in sorted(self.symbols.items()):
+            yield '<sdef n=%-10s c=%s/>' % (
+                quoteattr(symbol), quoteattr(' '.join(str(label).split()))
+            )
+
+    def get_tags(self, lexeme, symbols):
+        tags = []
+        if lexeme.pos.node.symbol:
+            tags.append(lexeme.pos.node.symbol)
+        tags.extend(symbols.values())
+        return tuple(tags)
+
+    def get_pardef(self, lexeme):
+        """Return lemma, stem and paradigm definition rows of a lexeme."""
+        lemma = lexeme.get_lemma()
+        forms = [
+            (form, self.get_tags(lexeme, symbols))
+            for form, symbols in lexeme.surface_forms()
+        ]
+        stem = os.path.commonprefix([lemma] + [form for form, tags in forms])
+        rows = tuple(
+            (form[len(stem):], lemma[len(stem):], tags)
+            for form, tags in forms
+        )
+        return lemma, stem, rows
+
+    def get_pardef_name(self, lemma, stem, rows):
+        """Return name of deduplicated paradigm definition."""
+        digest = hashlib.sha1(repr(rows).encode('utf-8')).digest()
+        if digest in self.pardefs:
+            return self.pardefs[digest][0]
+
+        pos = rows[0][2][0] if rows and rows[0][2] else ''
+        name = '%s/%s__%s' % (stem, lemma[len(stem):], pos)
+        if name in self.pardef_names:
+            i = 2
+            while '%s__%d' % (name, i) in self.pardef_names:
+                i += 1
+            name = '%s__%d' % (name, i)
+        self.pardef_names.add(name)
+        self.pardefs[digest] = (name, rows)
+        for row in rows:
+            for tag in row[2]:
+                self.add_symbol(tag)
+        return name
+
+    def build_entries(self):
+        for i, line in iterlines(self.lexemes):
+            try:
+                lexeme = Lexeme(self.grammar, self.paradigms, self.sources,
+                                line).resolve()
+                lemma, stem, rows = self.get_pardef(lexeme)
+            except LexemeError as e:
+                self.errors.append((i, str(e)))
+                continue
+            if not rows:
+                continue
+            name = self.get_pardef_name(lemma, stem, rows)
+            yield '<e lm=%s><i>%s</i><par n=%s/></e>' % (
+                quoteattr(lemma), escape(stem), quoteattr(name),
+            )
 
-                break
+    def build_paradigms(self):
+        for name, rows in self.pardefs.values():
+            yield '<pardef n=%s>' % quoteattr(name)
+            for left, right, tags in rows:
+                tags = ''.join('<s n=%s/>' % quoteattr(tag) for tag in tags)
+                yield '  <e><p><l>%s</l><r>%s%s</r></p></e>' % (
+                    escape(left), escape(right), tags,
+                )
+            yield '</pardef>'
 
-    def build_dix(self):
+    def build_dix(self, section):
+        """Yield dictionary lines, ``section`` is file with lexeme entries."""
         yield '<?xml version="1.0" encoding="UTF-8"?>'
         yield '<dictionary>'
 
-        yield '  <alphabet>AĄBCČDEĘĖFGHIĮYJKLMNOPRSŠTUŲŪVZŽaąbcčdeęėfghiįyjklmnoprsštuųūvzž</alphabet>'
+        yield '  <alphabet>%s</alphabet>' % ALPHABET
 
         yield '  <sdefs>'
-        #for line in self.build_symbols():
-        #    yield '    ' + line
+        for line in self.build_symbols():
+            yield '    ' + line
         yield '  </sdefs>'
 
         yield '  <pardefs>'
@@ -100,10 +147,18 @@ class Converter(object):
         yield '  </pardefs>'
 
         yield '  <section id="main" type="standard">'
-
-        #for line in gen_entries(lmdb, '    '):
-        #    yield line
-
+        for line in section:
+            yield '    ' + line.rstrip('\n')
         yield '  </section>'
 
         yield '</dictionary>'
+
+    def write(self, output):
+        """Write whole dictionary to ``output`` file object."""
+        self.init_symbols()
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as section:
+            for line in self.build_entries():
+                section.write(line + '\n')
+            section.seek(0)
+            for line in self.build_dix(section):
+                output.write(line + '\n')
@@ -0,0 +1,395 @@
+"""Minimal acyclic automaton of all generated word forms.
+
+Each generated form is stored as a key::
+
+    form \\0 rule tag
+
+where ``form`` is UTF-8 encoded word form, ``rule`` is an ID of a rule
+turning the form into its lemma and ``tag`` is an ID of part of speech and
+symbols. Both IDs are 3 byte big endian integers. Rule is a number of
+characters to cut from the end of the form and a suffix to append, so forms
+of different lexemes of the same paradigm share rules and therefore share
+whole key suffixes, not only endings. Keys are compiled into a minimal
+deterministic acyclic automaton (DAWG), so common prefixes (stems) and
+common suffixes (endings with outputs) are stored once. Readings of a form
+are all paths following ``form \\0``.
+
+Keys are collected in chunks of ``CHUNK_SIZE`` distinct keys, each chunk is
+sorted and written to a temporary file and sorted chunks are merged. Merged
+keys are added to the automaton in sorted order and it is minimized
+incrementally, using the algorithm of Daciuk et al., so besides the
+automaton itself only one chunk of keys and the unminimized path of the last
+key are kept in memory.
+
+File layout, all integers are little endian:
+
+header
+    Magic bytes, format version, number of states, number of transitions
+    and size of metadata.
+
+states
+    ``number of states + 1`` unsigned 32 bit indexes of the first
+    transition of each state. Transitions of state ``i`` are
+    ``states[i]:states[i + 1]``. State 0 is the start state.
+
+labels
+    One byte label of each transition, sorted within each state, padded to
+    4 bytes.
+
+targets
+    Unsigned 32 bit target state of each transition.
+
+metadata
+    UTF-8 encoded JSON with rule and tag tables.
+
+File is memory mapped and lookups read only the states they visit.
+
+"""
+
+import os
+import sys
+import json
+import mmap
+import array
+import heapq
+import struct
+import tempfile
+
+from .analyzer import Reading
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import iterlines
+
+DAWG_FILE = 'forms.dawg'
+DAWG_MAGIC = b'MRFDAWG\0'
+DAWG_VERSION = 1
+
+HEADER = struct.Struct('<8sIIII')
+INDEX = struct.Struct('<I')
+KEY_SIZE = struct.Struct('<H')
+
+SEP = 0
+ID_SIZE = 3
+MAX_ID = 1 << 8 * ID_SIZE
+
+CHUNK_SIZE = 1000000
+
+
+def get_rule(form, lemma):
+    """Return ``(cut, suffix)`` rule turning form into lemma."""
+    prefix = os.path.commonprefix([form, lemma])
+    return len(form) - len(prefix), lemma[len(prefix):]
+
+
+def apply_rule(form, rule):
+    cut, suffix = rule
+    return (form[:-cut] if cut else form) + suffix
+
+
+class State(object):
+    __slots__ = ('transitions',)
+
+    def __init__(self):
+        self.transitions = dict()
+
+    def signature(self):
+        return tuple(
+            (label, id(state))
+            for label, state in sorted(self.transitions.items())
+        )
+
+
+class Builder(object):
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.rules = dict()
+        self.tags = dict()
+        self.chunk_size = chunk_size
+        self.chunk = set()
+        self.runs = []
+        self.errors = []
+
+    def get_id(self, table, value):
+        try:
+            return table[value]
+        except KeyError:
+            if len(table) >= MAX_ID:
+                raise ValueError('Too many distinct rules or tags.')
+            i = table[value] = len(table)
+            return i
+
+    def add(self, form, lemma, pos, symbols):
+        rule = self.get_id(self.rules, get_rule(form, lemma))
+        tag = self.get_id(self.tags, (pos, tuple(symbols.items())))
+        self.chunk.add(b''.join([
+            form.encode('utf-8'), bytes([SEP]),
+            rule.to_bytes(ID_SIZE, 'big'), tag.to_bytes(ID_SIZE, 'big'),
+        ]))
+        if len(self.chunk) >= self.chunk_size:
+            self.spill()
+
+    def add_lexeme(self, lexeme):
+        lemma = lexeme.get_lemma()
+        for form, symbols in lexeme.surface_forms():
+            self.add(form, lemma, lexeme.pos.name, symbols)
+
+    def spill(self):
+        """Write sorted keys of current chunk to a temporary file."""
+        run = tempfile.TemporaryFile()
+        for key in sorted(self.chunk):
+            run.write(KEY_SIZE.pack(len(key)))
+            run.write(key)
+        run.seek(0)
+        self.runs.append(run)
+        self.chunk = set()
+
+    def read_run(self, run):
+        while True:
+            size = run.read(KEY_SIZE.size)
+            if not size:
+                return
+            yield run.read(KEY_SIZE.unpack(size)[0])
+
+    def keys(self):
+        """Yield all distinct keys in sorted order."""
+        runs = [self.read_run(run) for run in self.runs]
+        runs.append(iter(sorted(self.chunk)))
+        previous = None
+        for key in heapq.merge(*runs):
+            if key != previous:
+                yield key
+                previous = key
+
+    def minimize(self, register, unchecked, depth):
+        while len(unchecked) > depth:
+            parent, label, child = unchecked.pop()
+            signature = child.signature()
+            if signature in register:
+                parent.transitions[label] = register[signature]
+            else:
+                register[signature] = child
+
+    def build_automaton(self):
+        """Return start state of minimal automaton of all keys."""
+        root = State()
+        register = dict()
+        unchecked = []
+        previous = b''
+        for key in self.keys():
+            common = len(os.path.commonprefix([previous, key]))
+            self.minimize(register, unchecked, common)
+            state = unchecked[-1][2] if unchecked else root
+            for label in key[common:]:
+                child = State()
+                state.transitions[label] = child
+                unchecked.append((state, label, child))
+                state = child
+            previous = key
+        self.minimize(register, unchecked, 0)
+        return root
+
+    def build(self):
+        """Return compiled automaton as bytes."""
+        try:
+            root = self.build_automaton()
+        finally:
+            for run in self.runs:
+                run.close()
+            self.runs = []
+            self.chunk = set()
+
+        ids = {id(root): 0}
+        order = [root]
+        for state in order:
+            for label, child in sorted(state.transitions.items()):
+                if id(child) not in ids:
+                    ids[id(child)] = len(order)
+                    order.append(child)
+
+        states = array.array('I', [0])
+        labels = bytearray()
+        targets = array.array('I')
+        for state in order:
+            for label, child in sorted(state.transitions.items()):
+                labels.append(label)
+                targets.append(ids[id(child)])
+            states.append(len(labels))
+        labels.extend(b'\0' * (-len(labels) % 4))
+
+        if sys.byteorder != 'little':
+            states.byteswap()
+            targets.byteswap()
+
+        meta = json.dumps(dict(
+            rules=sorted(self.rules, key=self.rules.get),
+            tags=sorted(self.tags, key=self.tags.get),
+        ), ensure_ascii=False).encode('utf-8')
+
+        header = HEADER.pack(DAWG_MAGIC, DAWG_VERSION, len(order),
+                             len(targets), len(meta))
+        return b''.join([
+            header, states.tobytes(), bytes(labels), targets.tobytes(), meta,
+        ])
+
+
+class Dawg(object):
+    def __init__(self, buf):
+        self.buf = buf
+        magic, version, nstates, ntransitions, meta_size = \
+            HEADER.unpack_from(buf, 0)
+        if magic != DAWG_MAGIC or version != DAWG_VERSION:
+            raise ValueError('Not a compiled morfologija automaton.')
+        self.states_offset = HEADER.size
+        self.labels_offset = self.states_offset + (nstates + 1) * INDEX.size
+        self.targets_offset = (
+            self.labels_offset + ntransitions + (-ntransitions % 4)
+        )
+        meta_offset = self.targets_offset + ntransitions * INDEX.size
+        meta = json.loads(
+            bytes(buf[meta_offset:meta_offset + meta_size]).decode('utf-8')
+        )
+        self.rules = [tuple(rule) for rule in meta['rules']]
+        self.tags = [
+            (pos, tuple(tuple(symbol) for symbol in symbols))
+            for pos, symbols in meta['tags']
+        ]
+        self.nstates = nstates
+        self.ntransitions = ntransitions
+
+    def get_range(self, state):
+        offset = self.states_offset + state * INDEX.size
+        start, end = struct.unpack_from('<II', self.buf, offset)
+        return self.labels_offset + start, self.labels_offset + end
+
+    def get_target(self, position):
+        index = position - self.labels_offset
+        return INDEX.unpack_from(self.buf,
+                                 self.targets_offset + index * INDEX.size)[0]
+
+    def next(self, state, label):
+        """Return target of ``label`` transition of state or None."""
+        start, end = self.get_range(state)
+        position = self.buf.find(bytes([label]), start, end)
+        if position < 0:
+            return None
+        return self.get_target(position)
+
+    def transitions(self, state):
+        """Return list of ``(label, target)`` of given state."""
+        start, end = self.get_range(state)
+        return [
+            (self.buf[position], self.get_target(position))
+            for position in range(start, end)
+        ]
+
+    def walk(self, key, state=0):
+        for label in key:
+            state = self.next(state, label)
+            if state is None:
+                return None
+        return state
+
+    def payloads(self, state, size=ID_SIZE * 2):
+        """Yield all byte strings of given size following state."""
+        stack = [(state, b'')]
+        while stack:
+            state, path = stack.pop()
+            if len(path) == size:
+                yield path
+                continue
+            for label, target in reversed(self.transitions(state)):
+                stack.append((target, path + bytes([label])))
+
+    def readings(self, form, state):
+        result = []
+        for payload in self.payloads(state):
+            rule = self.rules[int.from_bytes(payload[:ID_SIZE], 'big')]
+            pos, symbols = self.tags[int.from_bytes(payload[ID_SIZE:], 'big')]
+            result.append(Reading(apply_rule(form, rule), pos, symbols))
+        return tuple(result)
+
+    def analyze(self, form):
+        """Return tuple of all ``Reading``'s of given word form."""
+        state = self.walk(form.encode('utf-8') + bytes([SEP]))
+        if state is None:
+            return ()
+        return self.readings(form, state)
+
+    def __contains__(self, form):
+        return self.walk(form.encode('utf-8') + bytes([SEP])) is not None
+
+    def items(self, prefix=''):
+        """Yield sorted ``(form, readings)`` of forms starting with prefix."""
+        key = prefix.encode('utf-8')
+        state = self.walk(key)
+        if state is None:
+            return
+        stack = [(state, key, False)]
+        while stack:
+            state, key, complete = stack.pop()
+            if complete:
+                form = key.decode('utf-8')
+                yield form, self.readings(form, state)
+                continue
+            for label, target in reversed(self.transitions(state)):
+                if label == SEP:
+                    stack.append((target, key, True))
+                else:
+                    stack.append((target, key + bytes([label]), False))
+
+    def forms(self, prefix=''):
+        """Yield sorted forms starting with prefix."""
+        for form, readings in self.items(prefix):
+            yield form
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+
+
+def build(model, lines, chunk_size=CHUNK_SIZE):
+    """Build automaton from ``lexemes.txt`` lines.
+
+    Returns ``(data, errors)``, where ``data`` is compiled automaton and
+    ``errors`` is a list of ``(line number, message)`` pairs of skipped
+    lines.
+
+    """
+    builder = Builder(chunk_size)
+    for i, line in iterlines(lines):
+        try:
+            lexeme = Lexeme(model.grammar, model.paradigms, model.sources,
+                            line).resolve()
+            builder.add_lexeme(lexeme)
+        except LexemeError as e:
+            builder.errors.append((i, str(e)))
+    return builder.build(), builder.errors
+
+
+def compile(model, data_dir, dawg_file=DAWG_FILE):
+    """Build automaton from ``lexemes.txt`` and save it to data directory.
+
+    Returns list of errors, see ``build``.
+
+    """
+    with open(os.path.join(data_dir, 'lexemes.txt'), encoding='utf-8') as f:
+        data, errors = build(model, f)
+    path = os.path.join(data_dir, dawg_file)
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return errors
+
+
+def load(data_dir, dawg_file=DAWG_FILE):
+    """Open compiled automaton, returns None if it is not compiled."""
+    try:
+        with open(os.path.join(data_dir, dawg_file), 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        return Dawg(buf)
+    except (ValueError, struct.error):
+        buf.close()
+        return None
@@ -0,0 +1,161 @@
+"""Full lexicon generation.
+
+Generates every word form of every ``lexemes.txt`` entry. Lexicon is split
+into chunks of lines, chunks are processed by a pool of worker processes and
+formatted results are written to output in the same order as input lines, as
+soon as they are ready. Only a few chunks per worker are in flight at any
+time, so neither lexicon nor generated forms are held in memory.
+
+Each output row has line number of the lexeme, word form, lemma, part of
+speech name and symbols. Two output formats are supported:
+
+tsv
+    Tab separated columns, symbols are space separated ``key=symbol`` pairs.
+
+jsonl
+    One JSON object per line.
+
+"""
+
+import os
+import json
+import time
+import itertools
+import collections
+import multiprocessing
+
+from . import model
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import iterlines
+
+FORMATS = ('tsv', 'jsonl')
+
+Stats = collections.namedtuple('Stats', 'lines forms errors seconds')
+
+
+def format_tsv(lineno, form, lemma, pos, symbols):
+    symbols = ' '.join('%s=%s' % (k, v) for k, v in symbols.items())
+    return '%d\t%s\t%s\t%s\t%s\n' % (lineno, form, lemma, pos, symbols)
+
+
+def format_jsonl(lineno, form, lemma, pos, symbols):
+    return json.dumps(dict(
+        line=lineno, form=form, lemma=lemma, pos=pos, symbols=symbols,
+    ), ensure_ascii=False) + '\n'
+
+
+formatters = dict(
+    tsv=format_tsv,
+    jsonl=format_jsonl,
+)
+
+
+def genrows(mdl, lineno, line):
+    """Yield output rows of a single ``lexemes.txt`` line."""
+    lexeme = Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, line).resolve()
+    lemma = lexeme.get_lemma()
+    for form, symbols in lexeme.surface_forms():
+        yield lineno, form, lemma, lexeme.pos.name, symbols
+
+
+def generate_chunk(mdl, fmt, chunk):
+    """Return formatted output, numbers of lines and forms and errors."""
+    formatter = formatters[fmt]
+    output = []
+    errors = []
+    for lineno, line in chunk:
+        try:
+            rows = [formatter(*row) for row in genrows(mdl, lineno, line)]
+        except LexemeError as e:
+            errors.append((lineno, str(e)))
+        else:
+            output.extend(rows)
+    return ''.join(output), len(chunk), len(output), errors
+
+
+_worker_model = None
+
+
+def _init_worker(data_dir):
+    global _worker_model
+    _worker_model = model.load(data_dir)
+
+
+def _call_worker(args):
+    func, args = args
+    return func(_worker_model, *args)
+
+
+def chunks(iterable, size):
+    iterable = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterable, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_window(pool, func, iterable, window):
+    """Ordered ``pool.imap`` with at most ``window`` tasks in flight."""
+    pending = collections.deque()
+    for args in iterable:
+        pending.append(pool.apply_async(func, (args,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def imap_model(data_dir, func, tasks, processes):
+    """Yield ``func(model, *args)`` for each ``args`` of tasks, in order.
+
+    With more than one process, tasks are run by a pool of worker processes,
+    each of them loads model of ``data_dir`` once. ``func`` must be a module
+    level function, so that it can be sent to workers.
+
+    """
+    if processes == 1:
+        mdl = model.load(data_dir)
+        for args in tasks:
+            yield func(mdl, *args)
+        return
+
+    pool = multiprocessing.Pool(processes, _init_worker, (data_dir,))
+    try:
+        tasks = ((func, args) for args in tasks)
+        yield from imap_window(pool, _call_worker, tasks, processes * 4)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def generate(data_dir, lines, output, fmt='tsv', processes=None,
+             chunksize=500, errors=None):
+    """Generate forms of ``lines`` and write them to ``output`` file object.
+
+    ``errors`` is an optional list, where ``(line number, message)`` pairs of
+    lines, that can not be turned into lexemes, are added.
+
+    Returns ``Stats`` of the run.
+
+    """
+    if fmt not in formatters:
+        raise ValueError('Unknown format %r, use one of: %s.' % (
+            fmt, ', '.join(FORMATS)
+        ))
+    processes = processes or os.cpu_count() or 1
+    started = time.time()
+    nlines = nforms = nerrors = 0
+    tasks = ((fmt, chunk) for chunk in chunks(iterlines(lines), chunksize))
+    results = imap_model(data_dir, generate_chunk, tasks, processes)
+
+    for text, chunk_lines, chunk_forms, chunk_errors in results:
+        output.write(text)
+        nlines += chunk_lines
+        nforms += chunk_forms
+        nerrors += len(chunk_errors)
+        if errors is not None:
+            errors.extend(chunk_errors)
+
+    return Stats(nlines, nforms, nerrors, time.time() - started)
@@ -5,12 +5,13 @@ class GrammarExecption(Exception): pass
 
 
 class Value(object):
-    def __init__(self, field, name, node):
+    def __init__(self, field, name, node, path_labels=()):
         self.field = field
         self.name = name
         self.node = node
         self.code = node.code
         self.label = node.label
+        self.path_labels = path_labels
 
 
 class Field(object):
@@ -21,15 +22,14 @@ class Field(object):
         self.code = node.code
         self.label = node.label
         self.values = collections.OrderedDict()
+        self.values_by_code = dict()
 
     def get_default_value(self):
         for key, val in self.values.items():
             return val
 
     def get_value_by_code(self, code):
-        for value in self.values.values():
-            if value.code == code:
-                return value
+        return self.values_by_code.get(code)
 
 
 class POS(object):
@@ -39,22 +39,47 @@ class POS(object):
         self.code = node.code
         self.label = node.label
         self.fields = collections.OrderedDict()
+        self.fields_by_code = dict()
 
 
 class Grammar(object):
+    """Grammar specification indexed by names and codes.
+
+    Grammar tree is traversed once, depth first, and each leaf node together
+    with the path to it is turned into part of speech, field and value. Codes
+    are indexed, so that decoding lexeme parameters is plain dict lookups:
+
+    - ``poses_by_code[pos_code]`` gives ``POS``,
+
+    - ``pos.fields_by_code[field_code]`` gives ``Field``,
+
+    - ``field.values_by_code[value_code]`` gives ``Value``.
+
+    """
+
     def __init__(self, node):
         self.node = node
         self.poses = collections.OrderedDict()
+        self.poses_by_code = dict()
+        self.signatures = dict()
+        self.pardef_selectors = dict()
         self.init_poses()
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['signatures'] = dict()
+        state['pardef_selectors'] = dict()
+        return state
+
     def init_poses(self):
-        for value in self.node.query(nodes__isempty=True):
-            named_nodes = self.get_named_nodes(value)
+        for path in self.iter_paths(self.node.nodes, ()):
+            named_nodes = self.get_named_nodes(path)
+            path_labels = self.get_path_labels(path)
             if len(named_nodes) != 3:
                 raise GrammarExecption(
                     'Eeach tree node must have exactly three named nodes, '
                     'but this [%s] node has only %d.' % (
-                        ' - '.join(self.get_path_labels(value)),
+                        ' - '.join(path_labels),
                         len(named_nodes),
                     )
                 )
@@ -65,19 +90,32 @@ class Grammar(object):
 
             if pos_name not in self.poses:
                 self.poses[pos_name] = POS(pos_name, pos)
+                self.poses_by_code.setdefault(pos.code, self.poses[pos_name])
             pos = self.poses[pos_name]
 
             if field_name not in pos.fields:
                 pos.fields[field_name] = Field(pos, field_name, field)
+                pos.fields_by_code.setdefault(field.code,
+                                              pos.fields[field_name])
             field = pos.fields[field_name]
 
             if value_name not in field.values:
-                field.values[value_name] = Value(field, value_name, value)
+                field.values[value_name] = Value(field, value_name, value,
+                                                 path_labels)
+                field.values_by_code.setdefault(value.code,
+                                                field.values[value_name])
 
-    def get_named_nodes(self, node):
-        names = []
-        nodes = reversed([node] + list(node.parents())[:-1])
+    def iter_paths(self, nodes, path):
+        """Yield paths from the top of grammar tree to each leaf node."""
         for node in nodes:
+            if node.nodes:
+                yield from self.iter_paths(node.nodes, path + (node,))
+            else:
+                yield path + (node,)
+
+    def get_named_nodes(self, path):
+        names = []
+        for node in path:
             if node.name:
                 names.append((node.name, node))
             elif node.symbol:
@@ -86,10 +124,9 @@ class Grammar(object):
                 names.append((node.code, node))
         return names
 
-    def get_path_labels(self, node):
+    def get_path_labels(self, path):
         labels = []
-        nodes = reversed([node] + list(node.parents())[:-1])
-        for node in nodes:
+        for node in path:
             if node.label:
                 labels.append(node.label)
             elif node.name:
@@ -100,9 +137,7 @@ class Grammar(object):
                 labels.append(node.code)
             else:
                 labels.append('(unknown)')
-        return labels
+        return tuple(labels)
 
     def get_pos_by_code(self, code):
-        for pos in self.poses.values():
-            if pos.code == code:
-                return pos
+        return self.poses_by_code.get(code)
@@ -0,0 +1,493 @@
+"""Incremental regeneration of compiled outputs.
+
+Full form list written by ``generation`` and compiled ``analyzer`` are
+updated after changes of data files by regenerating only affected lexemes.
+Digests of ``lexemes.txt`` lines, of paradigms and of signatures used by
+the lexicon at the last update are saved to a state file in data
+directory, so next update compares them with current data files.
+
+Lexemes affected by changes are found with ``DependencyGraph``:
+
+- paradigm keys extending each paradigm key (``extends`` chains) and
+  defining forms of its symbols (``define``),
+
+- grammar value nodes, which have each paradigm key in ``pardefs``,
+
+- signatures of lexicon lines, that have each grammar value node.
+
+A changed paradigm affects paradigms extending it, nodes referencing any of
+them and of lexemes with these nodes, only the ones that select one of
+these paradigms. Grammar changes are found by comparing digests of
+resolved signatures in old and new grammar.
+
+Old and new ``lexemes.txt`` lines are matched by digests of their content,
+see ``match_lines``, so added, removed or moved lines shift line numbers of
+other lines, but do not make them affected. Lines without a match are
+affected.
+
+Form list rows of affected lines are replaced by streaming the old file
+into a new one, other rows are copied, with new line numbers if their
+lines moved. Only rows, that differ between old and new rows of affected
+lines, change analyzer readings, readings still found in the new form
+list are kept.
+
+If there is no state file or output file or format is different,
+everything is regenerated.
+
+"""
+
+import os
+import json
+import time
+import bisect
+import difflib
+import hashlib
+import collections
+
+from . import __version__
+from . import model
+from . import analyzer
+from . import generation
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import get_signature
+from .lexemes import iterlines
+from .utils import dump
+from .utils import undump
+
+STATE_FILE = 'update.state'
+STATE_VERSION = 2
+STATE_HEADER = ('morfologija.update', __version__, STATE_VERSION)
+
+DIGEST_SIZE = 8
+JSONL_PREFIX = '{"line": '
+
+Stats = collections.namedtuple('Stats', 'lines affected paradigms full seconds')
+
+
+class State(object):
+    def __init__(self, output, fmt, digests, paradigms, signatures):
+        self.output = output
+        self.fmt = fmt
+        self.digests = b''.join(digests)
+        self.paradigms = paradigms
+        self.signatures = signatures
+
+    def get_digests(self):
+        """Return list of line digests."""
+        return [
+            self.digests[i:i + DIGEST_SIZE]
+            for i in range(0, len(self.digests), DIGEST_SIZE)
+        ]
+
+
+def get_digest(value):
+    """Return digest of a string or of ``repr`` of other values."""
+    if not isinstance(value, str):
+        value = repr(value)
+    return hashlib.blake2b(value.encode('utf-8'),
+                           digest_size=DIGEST_SIZE).digest()
+
+
+def pardef_keys(pardefs):
+    """Yield all paradigm keys of a node ``pardefs`` property."""
+    for pardef in pardefs or ():
+        if isinstance(pardef, list):
+            for item in pardef:
+                yield item['key']
+        else:
+            yield pardef
+
+
+def get_signature_key(line):
+    """Return ``(pos code, params)`` of a line or None if line is invalid."""
+    fields = line.split()
+    try:
+        return int(fields[3]), tuple(map(int, fields[4:]))
+    except (IndexError, ValueError):
+        return None
+
+
+def describe_signature(grammar, key):
+    """Return everything of a signature, that generated forms depend on."""
+    try:
+        signature = get_signature(grammar, *key)
+    except LexemeError as e:
+        return str(e)
+    return (
+        signature.pos.name,
+        tuple(signature.names.items()),
+        tuple(signature.symbols.items()),
+        signature.filters,
+        tuple(
+            (value.field.node.lemma, value.node.pardefs)
+            for value in signature.properties
+        ),
+    )
+
+
+def describe_signatures(grammar, keys):
+    """Return ``{signature key: digest}`` of given signature keys."""
+    return {key: get_digest(describe_signature(grammar, key)) for key in keys}
+
+
+def describe_paradigm(paradigm):
+    return {k: v for k, v in vars(paradigm).items() if k != 'paradigms'}
+
+
+def describe_paradigms(paradigms):
+    """Return ``{paradigm key: digest}`` of all paradigms."""
+    return {
+        key: get_digest(describe_paradigm(paradigm))
+        for key, paradigm in paradigms.paradigms.items()
+    }
+
+
+def changed_paradigms(old, new):
+    """Return set of paradigm keys added, removed or changed.
+
+    ``old`` and ``new`` are paradigm digests, see ``describe_paradigms``.
+
+    """
+    keys = set(old) ^ set(new)
+    for key in set(old) & set(new):
+        if old[key] != new[key]:
+            keys.add(key)
+    return keys
+
+
+class LineMap(object):
+    """Mapping of old line numbers to new ones, see ``match_lines``.
+
+    ``blocks`` is a sorted list of ``(old line number, new line number,
+    size)`` of matching line ranges.
+
+    """
+
+    def __init__(self, blocks, identity=False):
+        self.blocks = blocks
+        self.starts = [block[0] for block in blocks]
+        self.identity = identity
+
+    def get(self, lineno):
+        """Return new line number of old line or None if it has no match."""
+        i = bisect.bisect_right(self.starts, lineno) - 1
+        if i >= 0:
+            old, new, size = self.blocks[i]
+            if lineno < old + size:
+                return new + lineno - old
+        return None
+
+    def unmatched(self, count):
+        """Return set of new line numbers without a match."""
+        result = set()
+        lineno = 1
+        for old, new, size in self.blocks + [(None, count + 1, 0)]:
+            result.update(range(lineno, new))
+            lineno = new + size
+        return result
+
+
+def match_lines(old, new):
+    """Match old and new line digests, return ``LineMap``.
+
+    Common head and tail are matched directly and only lines between them
+    are matched with ``difflib``, so small edits of a large lexicon are
+    cheap.
+
+    """
+    if old == new:
+        return LineMap([(1, 1, len(new))] if new else [], identity=True)
+    size = min(len(old), len(new))
+    head = 0
+    while head < size and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < size - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+
+    blocks = [(1, 1, head)] if head else []
+    matcher = difflib.SequenceMatcher(None, old[head:len(old) - tail],
+                                      new[head:len(new) - tail],
+                                      autojunk=False)
+    for a, b, n in matcher.get_matching_blocks():
+        if n:
+            blocks.append((head + a + 1, head + b + 1, n))
+    if tail:
+        blocks.append((len(old) - tail + 1, len(new) - tail + 1, tail))
+    return LineMap(blocks)
+
+
+class DependencyGraph(object):
+    def __init__(self, model, lines):
+        """Build graph of model and ``lexemes.txt`` lines."""
+        self.model = model
+        self.lines = lines
+        self.extended_by = collections.defaultdict(set)
+        self.referenced_by = collections.defaultdict(set)
+        self.node_signatures = collections.defaultdict(set)
+        self.signatures = collections.defaultdict(list)
+
+        for key, paradigm in model.paradigms.paradigms.items():
+            for extension in paradigm.extends:
+                keys = extension['keys']
+                for base in (keys if isinstance(keys, list) else [keys]):
+                    self.extended_by[base].add(key)
+            for affixes in paradigm.define.values():
+                for symkey in affixes:
+                    self.extended_by[symkey].add(key)
+
+        for pos in model.grammar.poses.values():
+            for field in pos.fields.values():
+                for value in field.values.values():
+                    for key in pardef_keys(value.node.pardefs):
+                        self.referenced_by[key].add(value.node)
+
+        for lineno, line in iterlines(lines):
+            key = get_signature_key(line)
+            if key is not None:
+                self.signatures[key].append(lineno)
+
+        for key in self.signatures:
+            try:
+                signature = get_signature(model.grammar, *key)
+            except LexemeError:
+                continue
+            for value in signature.properties:
+                self.node_signatures[value.node].add(key)
+
+    def dependents(self, keys):
+        """Return given paradigm keys and all keys extending or using them."""
+        result = set()
+        pending = list(keys)
+        while pending:
+            key = pending.pop()
+            if key not in result:
+                result.add(key)
+                pending.extend(self.extended_by.get(key, ()))
+        return result
+
+    def paradigm_lines(self, keys):
+        """Return line numbers of lexemes selecting any of given paradigms."""
+        keys = self.dependents(keys)
+        signatures = set()
+        for key in keys:
+            for node in self.referenced_by.get(key, ()):
+                signatures.update(self.node_signatures.get(node, ()))
+
+        mdl = self.model
+        result = set()
+        for signature in signatures:
+            for lineno in self.signatures[signature]:
+                lexeme = Lexeme(mdl.grammar, mdl.paradigms, mdl.sources,
+                                self.lines[lineno - 1])
+                for value in lexeme.properties:
+                    if keys.intersection(lexeme.get_pardefs(value.node)):
+                        result.add(lineno)
+                        break
+        return result
+
+    def grammar_lines(self, signatures):
+        """Return line numbers of lexemes with signatures changed in grammar.
+
+        ``signatures`` are signature digests of old grammar, see
+        ``describe_signatures``.
+
+        """
+        grammar = self.model.grammar
+        result = set()
+        for key, linenos in self.signatures.items():
+            if signatures.get(key) != get_digest(describe_signature(grammar,
+                                                                    key)):
+                result.update(linenos)
+        return result
+
+
+def get_lineno(fmt, row):
+    if fmt == 'jsonl':
+        return int(row[len(JSONL_PREFIX):row.index(',')])
+    return int(row[:row.index('\t')])
+
+
+def set_lineno(fmt, row, lineno):
+    prefix = JSONL_PREFIX if fmt == 'jsonl' else ''
+    return '%s%d%s' % (prefix, lineno, get_row_key(fmt, row))
+
+
+def get_row_key(fmt, row):
+    """Return row without line number, same keys mean same reading."""
+    return row[row.index(',' if fmt == 'jsonl' else '\t'):]
+
+
+def parse_row(fmt, row):
+    """Return ``(form, lemma, pos, symbols)`` of a form list row."""
+    if fmt == 'jsonl':
+        row = json.loads(row)
+        return row['form'], row['lemma'], row['pos'], row['symbols']
+    lineno, form, lemma, pos, symbols = row.rstrip('\n').split('\t')
+    symbols = dict(symbol.split('=', 1) for symbol in symbols.split())
+    return form, lemma, pos, symbols
+
+
+def generate_rows(mdl, fmt, lines, linenos, errors):
+    """Return ``{line number: list of formatted rows}`` of given lines."""
+    formatter = generation.formatters[fmt]
+    rows = dict()
+    for lineno in linenos:
+        try:
+            rows[lineno] = [
+                formatter(*row) for row in generation.genrows(
+                    mdl, lineno, lines[lineno - 1]
+                )
+            ]
+        except LexemeError as e:
+            errors.append((lineno, str(e)))
+    return rows
+
+
+def patch_output(path, fmt, linemap, linenos, rows):
+    """Rewrite form list for new lines, with new ``rows`` of ``linenos``.
+
+    Rows of other lines are copied, renumbered if their line moved. Returns
+    list of removed rows, of lines that were removed or regenerated.
+
+    """
+    pending = sorted(linenos, reverse=True)
+    removed = []
+    old = lineno = None
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(path, encoding='utf-8') as f, \
+                open(tmp, 'w', encoding='utf-8') as out:
+            for row in f:
+                if get_lineno(fmt, row) != old:
+                    old = get_lineno(fmt, row)
+                    lineno = linemap.get(old)
+                if lineno is None or lineno in linenos:
+                    removed.append(row)
+                    continue
+                while pending and pending[-1] < lineno:
+                    out.writelines(rows.get(pending.pop(), ()))
+                out.write(row if lineno == old else
+                          set_lineno(fmt, row, lineno))
+            while pending:
+                out.writelines(rows.get(pending.pop(), ()))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return removed
+
+
+def patch_analyzer(anl, path, fmt, linemap, linenos, rows, errors, removed):
+    """Update analyzer from removed and regenerated form list rows.
+
+    Only rows, that differ between ``removed`` and new ``rows``, are parsed.
+    A reading of a removed row is kept, if patched form list ``path`` still
+    has the same row of another line. ``errors`` are new errors of
+    ``linenos``.
+
+    """
+    old = {get_row_key(fmt, row): row for row in removed}
+    new = set()
+    for line in rows.values():
+        for row in line:
+            key = get_row_key(fmt, row)
+            if key not in old and key not in new:
+                form, lemma, pos, symbols = parse_row(fmt, row)
+                anl.add(form, anl.reading(lemma, pos, symbols))
+            new.add(key)
+
+    gone = {key: row for key, row in old.items() if key not in new}
+    if gone:
+        with open(path, encoding='utf-8') as f:
+            for row in f:
+                gone.pop(get_row_key(fmt, row), None)
+    for row in gone.values():
+        form, lemma, pos, symbols = parse_row(fmt, row)
+        anl.remove(form, anl.reading(lemma, pos, symbols))
+
+    anl.errors = sorted(errors + [
+        (linemap.get(i), error) for i, error in anl.errors
+        if linemap.get(i) is not None and linemap.get(i) not in linenos
+    ])
+
+
+def regenerate(data_dir, mdl, lines, output, fmt, processes=None):
+    """Regenerate form list and analyzer, if it is compiled, from scratch."""
+    errors = []
+    tmp = '%s.%d.tmp' % (output, os.getpid())
+    try:
+        with open(tmp, 'w', encoding='utf-8') as out:
+            generation.generate(data_dir, lines, out, fmt, processes,
+                                errors=errors)
+        os.replace(tmp, output)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    if analyzer.load(data_dir) is not None:
+        analyzer.compile(mdl, data_dir)
+    return errors
+
+
+def update(data_dir, output, fmt='tsv', processes=None, errors=None,
+           state_file=STATE_FILE):
+    """Bring form list ``output`` and analyzer up to date with data files.
+
+    ``errors`` is an optional list, where ``(line number, message)`` pairs of
+    regenerated lines, that can not be turned into lexemes, are added.
+
+    Returns ``Stats`` of the run.
+
+    """
+    if fmt not in generation.formatters:
+        raise ValueError('Unknown format %r, use one of: %s.' % (
+            fmt, ', '.join(generation.FORMATS)
+        ))
+    started = time.time()
+    errors = [] if errors is None else errors
+    output = os.path.abspath(output)
+    state_path = os.path.join(data_dir, state_file)
+    with open(os.path.join(data_dir, 'lexemes.txt'), encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    digests = [get_digest(line) for line in lines]
+    new = model.load(data_dir)
+    graph = DependencyGraph(new, lines)
+    state = undump(state_path, STATE_HEADER)
+    nlines = sum(1 for i, line in iterlines(lines))
+
+    if (
+        state is None or state.output != output or state.fmt != fmt or
+        not os.path.exists(output)
+    ):
+        errors.extend(regenerate(data_dir, new, lines, output, fmt,
+                                 processes))
+        stats = Stats(nlines, nlines, None, True, 0)
+    else:
+        linemap = match_lines(state.get_digests(), digests)
+        paradigms = changed_paradigms(state.paradigms,
+                                      describe_paradigms(new.paradigms))
+        linenos = (
+            graph.paradigm_lines(paradigms) |
+            graph.grammar_lines(state.signatures) |
+            {i for i in linemap.unmatched(len(lines)) if lines[i - 1]}
+        )
+        if linenos or not linemap.identity:
+            line_errors = []
+            rows = generate_rows(new, fmt, lines, sorted(linenos),
+                                 line_errors)
+            removed = patch_output(output, fmt, linemap, linenos, rows)
+            anl = analyzer.load(data_dir)
+            if anl is not None:
+                patch_analyzer(anl, output, fmt, linemap, linenos, rows,
+                               line_errors, removed)
+                dump(os.path.join(data_dir, analyzer.ANALYZER_FILE),
+                     analyzer.ANALYZER_HEADER, anl)
+            errors.extend(line_errors)
+        stats = Stats(nlines, len(linenos), len(paradigms), False, 0)
+
+    dump(state_path, STATE_HEADER, State(
+        output, fmt, digests, describe_paradigms(new.paradigms),
+        describe_signatures(new.grammar, graph.signatures),
+    ))
+    return stats._replace(seconds=time.time() - started)
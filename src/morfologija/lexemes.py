@@ -1,10 +1,13 @@
+import types
+import functools
 import collections
 
-from .utils import first
-from .soundchanges import affrication
 from .syllabification import syllabificate
 
 
+class LexemeError(Exception): pass
+
+
 class Lexeme(object):
     """Morphological database entry.
 
@@ -26,68 +29,86 @@ class Lexeme(object):
     names
         Dictionary of flattened property and value names for this lexeme.
 
+    signature
+        ``Signature`` shared by all lexemes with the same part of speech and
+        property codes. ``pos``, ``properties``, ``names``, ``symbols`` and
+        ``filters`` are taken from it.
+
+    Constructing a lexeme only tokenizes the line and raises ``LexemeError``
+    if it has less than ``MIN_FIELDS`` fields. ``source``, ``signature`` and
+    all fields taken from it and ``stem`` are computed on first access and
+    cached, so other invalid lines raise ``LexemeError`` only when these
+    fields are used. Call ``resolve`` to compute all of them at once.
+
     """
 
     CheckNumber = collections.namedtuple('CheckNumber', 'eq gt lt gte lte')
     CheckNumber_defaults = CheckNumber(eq=None, gt=None, lt=None, gte=None,
                                        lte=None)
 
+    MIN_FIELDS = 4
+
     def __init__(self, grammar, paradigms, sources, line):
-        fields = line.split()
-        params = list(map(int, fields[4:]))
-        self.lexeme, source, lemma, pos = fields[:4]
+        self.fields = line.split()
+        if len(self.fields) < self.MIN_FIELDS:
+            raise LexemeError('Line has %d fields, at least %d are required.' %
+                              (len(self.fields), self.MIN_FIELDS))
+        self.lexeme, lemma = self.fields[0], self.fields[2]
+        self.grammar = grammar
         self.paradigms = paradigms
-        self.source = sources.get(code=int(source))
+        self.sources = sources
         self.lemma = None if lemma == '-' else lemma
-        self.pos = grammar.get_pos_by_code(int(pos))
-        assert self.pos is not None
-        self.properties = []
-        for field, value_code in zip(self.pos.fields.values(), params):
-            value = field.get_value_by_code(value_code)
-            if value is None:
-                for value in field.values.values():
-                    print('value.label: %s' % value.label)
-                    print('value.code: %s' % value.code)
-                    if value.code == value_code:
-                        print('  returing...')
-                raise Exception(
-                    'Unknown value {val} for field {fld} ({label}) in {line}.'.
-                    format(val=value_code, fld=field.code, line=line,
-                           label=field.label)
-                )
-            self.properties.append(value)
-        self.names = dict(self.get_names())
-        self.symbols = dict(self.get_symbols())
-        self.stem = self.get_stem()
-        self.filters = self.get_filters()
 
-    def get_names(self):
-        for value in self.properties:
-            if value.node.value is not None:
-                key = first(value.node.parents(name__isnull=False)).name
-                if isinstance(value.node.value, list):
-                    val = value.node.value
-                else:
-                    val = [value.node.value]
-                yield key, val
-            elif value.node.name is not None:
-                key = first(value.node.parents(name__isnull=False)).name
-                val = value.node.name
-                yield key, [val]
+    @functools.cached_property
+    def source(self):
+        try:
+            code = int(self.fields[1])
+        except ValueError:
+            raise LexemeError('Invalid source code %s.' % self.fields[1])
+        return self.sources.get(code=code)
 
-    def get_symbols(self):
-        for value in self.properties:
-            if value.node.symbol is not None:
-                key = first(value.node.parents(name__isnull=False)).name
-                val = value.node.symbol
-                yield key, val
+    @functools.cached_property
+    def signature(self):
+        try:
+            pos, params = int(self.fields[3]), tuple(map(int, self.fields[4:]))
+        except ValueError:
+            raise LexemeError('Invalid signature %s.' %
+                              ' '.join(self.fields[3:]))
+        return get_signature(self.grammar, pos, params)
 
-    def get_filters(self):
-        filters = []
-        for value in self.properties:
-            if value.node.restrict:
-                filters.append(('restrict', value.node.restrict))
-        return filters
+    @functools.cached_property
+    def pos(self):
+        return self.signature.pos
+
+    @functools.cached_property
+    def properties(self):
+        return self.signature.properties
+
+    @functools.cached_property
+    def names(self):
+        return self.signature.names
+
+    @functools.cached_property
+    def symbols(self):
+        return self.signature.symbols
+
+    @functools.cached_property
+    def filters(self):
+        return self.signature.filters
+
+    @functools.cached_property
+    def stem(self):
+        return self.get_stem()
+
+    def resolve(self):
+        """Compute all lazy fields now and return this lexeme.
+
+        Raises ``LexemeError`` if lexeme can not be resolved.
+
+        """
+        for name in ('source', 'signature', 'stem'):
+            getattr(self, name)
+        return self
 
     def check_properties(self, properties):
         for k, v in properties.items():
@@ -95,7 +116,7 @@ class Lexeme(object):
                 return False
 
             names = self.names[k]
-            names = names if isinstance(names, list) else [names]
+            names = names if isinstance(names, (list, tuple)) else [names]
             if v not in names:
                 return False
         return True
@@ -164,29 +185,206 @@ class Lexeme(object):
         syllables
             Checks if lexeme has specified numbe of syllables.
 
+        Returns tuple of keys. Selection is compiled and cached per node, see
+        ``PardefSelector``.
+
         """
-        for pardef in node.pardefs:
+        return get_pardef_selector(self.grammar, node).select(self)
+
+    def prepare_forms(self, forms):
+        """Yield ``(stem, suffixes)`` of compiled forms, see ``variants``."""
+        stem = self.stem
+        for cut, replacement, suffixes in forms:
+            yield stem[:len(stem) - cut] + replacement, suffixes
+
+    def affixes(self, value, paradigm, kind):
+        for forms, symbols in paradigm.variants(kind, self.stem[-1:]):
+            symbols = dict(symbols)
+            if self.check_filters(self.filters, value, forms, symbols):
+                if paradigm.override_symbols:
+                    symbols.update(self.symbols)
+                forms = self.prepare_forms(forms)
+                yield forms, symbols
+
+    def get_lemma_suffix(self):
+        """Return lemma suffix of the first paradigm of lemma property."""
+        for value in self.properties:
+            if not value.field.node.lemma: continue
+            for pardef in self.get_pardefs(value.node):
+                paradigm = self.paradigms.get(pardef)
+                for forms, symbols in paradigm.table('suffixes'):
+                    return ''.join(forms[0])
+
+        raise LexemeError('Can not find lemma for %s.' % self.pos.label)
+
+    def get_stem(self):
+        return self.lexeme[:-len(self.get_lemma_suffix())]
+
+    def get_lemma(self):
+        return self.lemma or self.lexeme
+
+    def genforms(self):
+        for value in self.properties:
+            for pardef in self.get_pardefs(value.node):
+                paradigm = self.paradigms.get(pardef)
+                for forms, symbols in self.affixes(value, paradigm, 'suffixes'):
+                    lexeme = [
+                        '%s/%s' % (stem, '/'.join(suffix))
+                        for stem, suffix in forms
+                    ]
+                    yield lexeme, symbols
+
+    def surface_forms(self):
+        """Yield ``(form, symbols)`` pairs of all generated word forms.
+
+        Unlike ``genforms``, each form variant is yielded separately and
+        without affix separators.
+
+        """
+        for forms, symbols in self.genforms():
+            for form in forms:
+                yield form.replace('/', ''), symbols
+
+
+class Signature(object):
+    """Grammar properties shared by all lexemes with the same parameters.
+
+    Whole lexicon has only a few thousand distinct ``(pos code, params)``
+    combinations, so part of speech, property values, names, symbols and
+    filters are resolved once per combination and shared by all lexemes.
+    Signature is read-only, since it is shared.
+
+    """
+
+    def __init__(self, grammar, pos, params):
+        self.key = (pos, params)
+        self.pos = grammar.get_pos_by_code(pos)
+        if self.pos is None:
+            raise LexemeError('Unknown part of speech code %s.' % pos)
+        properties = []
+        for field, value_code in zip(self.pos.fields.values(), params):
+            value = field.get_value_by_code(value_code)
+            if value is None:
+                raise LexemeError(
+                    'Unknown value {val} for field {fld} ({label}) in '
+                    'signature {key}.'.format(val=value_code, fld=field.code,
+                                              label=field.label, key=self.key)
+                )
+            properties.append(value)
+        self.properties = tuple(properties)
+        self.names = types.MappingProxyType(dict(self.get_names()))
+        self.symbols = types.MappingProxyType(dict(self.get_symbols()))
+        self.filters = tuple(self.get_filters())
+
+    def get_names(self):
+        for value in self.properties:
+            if value.node.flat_name is not None:
+                yield value.node.flat_name
+
+    def get_symbols(self):
+        for value in self.properties:
+            if value.node.flat_symbol is not None:
+                yield value.node.flat_symbol
+
+    def get_filters(self):
+        for value in self.properties:
+            if value.node.restrict:
+                yield 'restrict', value.node.restrict
+
+
+class PardefSelector(object):
+    """Compiled paradigm definition selection of a grammar node.
+
+    Pardefs selected by ``Lexeme.get_pardefs`` depend only on lexeme
+    signature, on which of node ``endswith`` endings lexeme has, on number
+    of syllables, if node has ``syllables`` conditions, and on lemma, if it
+    is listed in node ``lemmas`` conditions. These inputs are the cache key
+    of selection results, so most lexemes get their pardefs with a single
+    dict lookup.
+
+    All endings a lexeme has are suffixes of the longest one, so only the
+    longest ending is part of the key. It is found by walking a trie of
+    reversed endings from the end of lexeme.
+
+    """
+
+    def __init__(self, node):
+        self.pardefs = node.pardefs
+        self.trie = dict()
+        self.syllables = False
+        self.lemmas = set()
+        self.cache = dict()
+        for pardef in self.pardefs:
+            if isinstance(pardef, list):
+                for item in pardef:
+                    if 'endswith' in item:
+                        self.add_ending(item['endswith'])
+                    if 'syllables' in item:
+                        self.syllables = True
+                    if 'lemmas' in item:
+                        self.lemmas.update(item['lemmas'])
+
+    def add_ending(self, ending):
+        node = self.trie
+        for char in reversed(ending):
+            node = node.setdefault(char, dict())
+        node[None] = ending
+
+    def get_ending(self, word):
+        """Return longest node ending given word ends with."""
+        ending = ''
+        node = self.trie
+        for char in reversed(word):
+            node = node.get(char)
+            if node is None:
+                break
+            ending = node.get(None, ending)
+        return ending
+
+    def get_key(self, lexeme):
+        lemma = lexeme.lemma or lexeme.lexeme
+        return (
+            lexeme.signature.key,
+            self.get_ending(lexeme.lexeme),
+            len(syllabificate(lexeme.lexeme)) if self.syllables else None,
+            lemma if lemma in self.lemmas else None,
+        )
+
+    def select(self, lexeme):
+        """Return tuple of pardef keys of given lexeme."""
+        key = self.get_key(lexeme)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pardefs = self.cache[key] = tuple(self.evaluate(lexeme))
+            return pardefs
+
+    def evaluate(self, lexeme):
+        """Yield pardef keys of given lexeme, without cache."""
+        for pardef in self.pardefs:
             if isinstance(pardef, list):
                 for item in pardef:
                     if (
                         'properties' in item and
-                        not self.check_properties(item['properties'])
+                        not lexeme.check_properties(item['properties'])
                     ):
                         continue
                     if (
                         'endswith' in item and
-                        not self.lexeme.endswith(item['endswith'])
+                        not lexeme.lexeme.endswith(item['endswith'])
                     ):
                         continue
                     if (
                         'syllables' in item and
-                        not self.check_number(len(syllabificate(self.lexeme)),
-                                              item['syllables'])
+                        not lexeme.check_number(
+                            len(syllabificate(lexeme.lexeme)),
+                            item['syllables'],
+                        )
                     ):
                         continue
                     if (
                         'lemmas' in item and
-                        (self.lemma or self.lexeme) not in item['lemmas']
+                        (lexeme.lemma or lexeme.lexeme) not in item['lemmas']
                     ):
                         continue
                     yield item['key']
@@ -194,38 +392,29 @@ class Lexeme(object):
             else:
                 yield pardef
 
-    def prepare_forms(self, forms):
-        for suffixes in forms:
-            stem, suffixes = affrication(self.stem, suffixes)
-            yield stem, suffixes
 
-    def affixes(self, value, paradigm, kind):
-        for forms, symbols in paradigm.affixes(kind):
-            if self.check_filters(self.filters, value, forms, symbols):
-                if paradigm.override_symbols:
-                    symbols = dict(symbols, **self.symbols)
-                forms = self.prepare_forms(forms)
-                yield forms, symbols
+def get_pardef_selector(grammar, node):
+    """Return shared ``PardefSelector`` of given grammar node."""
+    try:
+        return grammar.pardef_selectors[node]
+    except KeyError:
+        selector = grammar.pardef_selectors[node] = PardefSelector(node)
+        return selector
 
-    def get_stem(self):
-        for value in self.properties:
-            if not value.field.node.lemma: continue
-            for pardef in self.get_pardefs(value.node):
-                paradigm = self.paradigms.get(pardef)
-                for forms, symbols in paradigm.affixes('suffixes'):
-                    suffix = ''.join(forms[0])
-                    stem = self.lexeme[:-len(suffix)]
-                    return stem
 
-        raise Exception('Can not find lemma for %s.' % self.pos.label)
+def get_signature(grammar, pos, params):
+    """Return shared ``Signature`` for given pos code and params tuple."""
+    key = (pos, params)
+    try:
+        return grammar.signatures[key]
+    except KeyError:
+        signature = grammar.signatures[key] = Signature(grammar, pos, params)
+        return signature
 
-    def genforms(self):
-        for value in self.properties:
-            for pardef in self.get_pardefs(value.node):
-                paradigm = self.paradigms.get(pardef)
-                for forms, symbols in self.affixes(value, paradigm, 'suffixes'):
-                    lexeme = [
-                        '%s/%s' % (stem, '/'.join(suffix))
-                        for stem, suffix in forms
-                    ]
-                    yield lexeme, symbols
+
+def iterlines(lines):
+    """Yield ``(line number, line)`` of non-empty ``lexemes.txt`` lines."""
+    for i, line in enumerate(lines, 1):
+        line = line.strip()
+        if line:
+            yield i, line
@@ -0,0 +1,209 @@
+"""Compact in-memory lexicon.
+
+``Lexeme`` objects are convenient, but too large to keep whole
+``lexemes.txt`` in memory. ``Lexicon`` stores all entries in a few flat
+columns instead:
+
+words
+    UTF-8 encoded lexemes, concatenated into a single byte array, with an
+    array of offsets.
+
+lemmas
+    Only the few entries having a lemma different from lexeme are stored,
+    as interned strings.
+
+sources, signatures and line numbers
+    Small integer arrays. Signature is an index into a list of shared
+    ``Signature`` objects, so part of speech and property codes of all
+    entries with the same parameters are stored once.
+
+Items of a lexicon are ``Entry`` views having only a reference to the
+lexicon and an index. ``names``, ``symbols`` and other grammar properties
+of an entry are taken from its shared signature and a full ``Lexeme`` is
+built only on request.
+
+"""
+
+import sys
+import array
+
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import get_signature
+from .lexemes import iterlines
+
+
+class Entry(object):
+    """Read-only view of a single lexicon entry."""
+
+    __slots__ = ('lexicon', 'index')
+
+    def __init__(self, lexicon, index):
+        self.lexicon = lexicon
+        self.index = index
+
+    def __repr__(self):
+        return '<Entry %d: %s>' % (self.lineno, self.to_line())
+
+    @property
+    def lexeme(self):
+        return self.lexicon.get_word(self.index)
+
+    @property
+    def lemma(self):
+        return self.lexicon.lemmas.get(self.index)
+
+    @property
+    def lineno(self):
+        return self.lexicon.linenos[self.index]
+
+    @property
+    def source_code(self):
+        return self.lexicon.sources[self.index]
+
+    @property
+    def source(self):
+        return self.lexicon.model.sources.get(code=self.source_code)
+
+    @property
+    def signature(self):
+        return self.lexicon.signatures[self.lexicon.signature_ids[self.index]]
+
+    @property
+    def params(self):
+        return self.signature.key[1]
+
+    @property
+    def pos(self):
+        return self.signature.pos
+
+    @property
+    def properties(self):
+        return self.signature.properties
+
+    @property
+    def names(self):
+        return self.signature.names
+
+    @property
+    def symbols(self):
+        return self.signature.symbols
+
+    @property
+    def filters(self):
+        return self.signature.filters
+
+    def get_lemma(self):
+        return self.lemma or self.lexeme
+
+    def to_line(self):
+        """Return ``lexemes.txt`` line of this entry."""
+        return '%s %d %s %d %s' % (
+            self.lexeme, self.source_code, self.lemma or '-', self.pos.code,
+            ' '.join(map(str, self.params)),
+        )
+
+    def get_lexeme(self):
+        """Return full ``Lexeme`` of this entry."""
+        mdl = self.lexicon.model
+        return Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, self.to_line())
+
+
+class Lexicon(object):
+    def __init__(self, model):
+        self.model = model
+        self.words = bytearray()
+        self.offsets = array.array('I', [0])
+        self.lemmas = dict()
+        self.sources = array.array('H')
+        self.signature_ids = array.array('I')
+        self.linenos = array.array('I')
+        self.signatures = []
+        self.signature_index = dict()
+        self.errors = []
+
+    def __len__(self):
+        return len(self.linenos)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Entry(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Entry(self, i)
+
+    def get_word(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.words[start:end].decode('utf-8')
+
+    def get_signature_id(self, pos, params):
+        """Return index of shared signature of ``pos`` and ``params`` strings.
+
+        Signatures are looked up by raw strings, so that no integer tuples
+        are built for known signatures.
+
+        """
+        key = (pos, params)
+        try:
+            return self.signature_index[key]
+        except KeyError:
+            pass
+        signature = get_signature(self.model.grammar, int(pos),
+                                  tuple(map(int, params.split())))
+        i = self.signature_index[signature.key] = self.signature_index.get(
+            signature.key, len(self.signatures),
+        )
+        if i == len(self.signatures):
+            self.signatures.append(signature)
+        self.signature_index[key] = i
+        return i
+
+    def add(self, lineno, line):
+        """Add a ``lexemes.txt`` line, raises ``LexemeError`` if invalid."""
+        fields = line.split(None, 4)
+        if len(fields) < Lexeme.MIN_FIELDS:
+            raise LexemeError('Line has %d fields, at least %d are required.' %
+                              (len(fields), Lexeme.MIN_FIELDS))
+        lexeme, source, lemma, pos = fields[:4]
+        params = fields[4] if len(fields) > 4 else ''
+        try:
+            source = int(source)
+        except ValueError:
+            raise LexemeError('Invalid source code %s.' % source)
+        if not 0 <= source < 2 ** (8 * self.sources.itemsize):
+            raise LexemeError('Source code %d is out of range.' % source)
+        try:
+            signature_id = self.get_signature_id(pos, params)
+        except ValueError:
+            raise LexemeError('Invalid signature %s.' %
+                              ' '.join([pos] + params.split()))
+
+        index = len(self)
+        if lemma != '-':
+            self.lemmas[index] = sys.intern(lemma)
+        self.words.extend(lexeme.encode('utf-8'))
+        self.offsets.append(len(self.words))
+        self.sources.append(source)
+        self.signature_ids.append(signature_id)
+        self.linenos.append(lineno)
+        return Entry(self, index)
+
+
+def load(model, lines):
+    """Build lexicon from ``lexemes.txt`` lines.
+
+    Invalid lines are skipped and listed in ``errors`` as ``(line number,
+    error message)`` pairs.
+
+    """
+    lexicon = Lexicon(model)
+    for i, line in iterlines(lines):
+        try:
+            lexicon.add(i, line)
+        except LexemeError as e:
+            lexicon.errors.append((i, str(e)))
+    return lexicon
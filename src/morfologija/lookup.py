@@ -0,0 +1,166 @@
+"""Sidecar lookup index of ``lexemes.txt`` file.
+
+Index maps lexeme string to line numbers and byte offsets of all lines with
+that lexeme, including ``lexeme(...)`` variant entries. Index is written
+next to lexicon file, as ``lexemes.txt.idx``, and is rebuilt automatically
+if modification time or size of lexicon file changes.
+
+Lookup of a lexeme returns all its variants, lookup of ``lexeme(...)``
+returns only lines of that exact variant.
+
+Index file layout, all integers are little endian:
+
+header
+    Magic bytes, format version, lexicon file modification time in
+    nanoseconds, lexicon file size and number of records.
+
+records
+    Fixed size ``(key offset, key length, line number, line offset)``
+    records, sorted by key and line number.
+
+keys
+    UTF-8 encoded keys, referenced by records.
+
+Index file is memory mapped and looked up using binary search, so a lookup
+reads only a few pages of index and lexicon files.
+
+"""
+
+import os
+import mmap
+import struct
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'MRFLXIDX'
+INDEX_VERSION = 1
+
+HEADER = struct.Struct('<8sIqqI')
+RECORD = struct.Struct('<IIIQ')
+
+
+def get_key(line):
+    """Return index key of a ``lexemes.txt`` line."""
+    return line.split(None, 1)[0].split(b'(', 1)[0]
+
+
+def build(path):
+    """Build index of lexicon file and return it as bytes."""
+    stat = os.stat(path)
+    entries = []
+    with open(path, 'rb') as f:
+        offset = 0
+        for lineno, line in enumerate(f, 1):
+            if line.strip():
+                entries.append((get_key(line), lineno, offset))
+            offset += len(line)
+    entries.sort()
+
+    keys = []
+    records = []
+    key_offset = 0
+    last_key = None
+    for key, lineno, offset in entries:
+        if key != last_key:
+            keys.append(key)
+            last_key, last_offset = key, key_offset
+            key_offset += len(key)
+        records.append(RECORD.pack(last_offset, len(key), lineno, offset))
+
+    header = HEADER.pack(INDEX_MAGIC, INDEX_VERSION, stat.st_mtime_ns,
+                         stat.st_size, len(records))
+    return b''.join([header] + records + keys)
+
+
+class LexemeIndex(object):
+    def __init__(self, path, buf):
+        self.path = path
+        self.buf = buf
+        magic, version, mtime, size, count = HEADER.unpack_from(buf, 0)
+        self.count = count
+        self.keys_offset = HEADER.size + count * RECORD.size
+
+    def record(self, i):
+        return RECORD.unpack_from(self.buf, HEADER.size + i * RECORD.size)
+
+    def key(self, i):
+        key_offset, key_length, lineno, offset = self.record(i)
+        start = self.keys_offset + key_offset
+        return self.buf[start:start + key_length]
+
+    def bisect(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def offsets(self, lexeme):
+        """Yield ``(line number, byte offset)`` of lines of given lexeme."""
+        key = lexeme.encode('utf-8')
+        i = self.bisect(key)
+        while i < self.count and self.key(i) == key:
+            key_offset, key_length, lineno, offset = self.record(i)
+            yield lineno, offset
+            i += 1
+
+    def lookup(self, lexeme):
+        """Yield ``(line number, line)`` of lines of given lexeme or variant."""
+        key = lexeme.split('(', 1)[0]
+        offsets = list(self.offsets(key))
+        if not offsets:
+            return
+        with open(self.path, 'rb') as f:
+            for lineno, offset in offsets:
+                f.seek(offset)
+                line = f.readline().decode('utf-8').strip()
+                if key == lexeme or line.split(None, 1)[0] == lexeme:
+                    yield lineno, line
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+
+
+def is_fresh(path, index_path):
+    try:
+        with open(index_path, 'rb') as f:
+            header = f.read(HEADER.size)
+        magic, version, mtime, size, count = HEADER.unpack(header)
+    except (OSError, struct.error):
+        return False
+    stat = os.stat(path)
+    return (
+        magic == INDEX_MAGIC and version == INDEX_VERSION and
+        mtime == stat.st_mtime_ns and size == stat.st_size
+    )
+
+
+def compile(path):
+    """Build index of lexicon file and write it next to lexicon file."""
+    index_path = path + INDEX_SUFFIX
+    data = build(path)
+    tmp = '%s.%d.tmp' % (index_path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, index_path)
+    return data
+
+
+def load(path):
+    """Open index of given lexicon file, rebuilding it if it is stale.
+
+    If index file can not be written, index is built in memory.
+
+    """
+    index_path = path + INDEX_SUFFIX
+    if not is_fresh(path, index_path):
+        try:
+            compile(path)
+        except OSError:
+            return LexemeIndex(path, build(path))
+    with open(index_path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return LexemeIndex(path, buf)
@@ -0,0 +1,86 @@
+"""Morphology model loading.
+
+Model consists of grammar, sources and paradigms, all built from YAML files
+found in data directory. Parsing YAML files and building grammar tree takes
+most of the time of a single lookup, so fully built model is serialized to a
+binary cache file next to the data files.
+
+Cache file is used only if it is newer than all YAML source files and was
+written by the same cache format version, otherwise model is built from YAML
+files again and the cache file is rewritten.
+
+"""
+
+import os
+import yaml
+
+from . import __version__
+from .nodes import Node
+from .grammar import Grammar
+from .paradigms import ParadigmCollection
+from .utils import dump
+from .utils import undump
+
+CACHE_FILE = 'model.cache'
+CACHE_VERSION = 8
+CACHE_HEADER = ('morfologija.model', __version__, CACHE_VERSION)
+
+SOURCE_FILES = ('grammar.yaml', 'sources.yaml', 'paradigms.yaml')
+
+
+class Model(object):
+    def __init__(self, grammar, sources, paradigms):
+        self.grammar = grammar
+        self.sources = sources
+        self.paradigms = paradigms
+
+
+def read_yaml(path):
+    with open(path, encoding='utf-8') as f:
+        return yaml.load(f)
+
+
+def build(data_dir):
+    """Build model from YAML files."""
+    data = lambda name: os.path.join(data_dir, name)
+    grammar = Grammar(Node(dict(nodes=read_yaml(data('grammar.yaml')))))
+    sources = Node(dict(nodes=read_yaml(data('sources.yaml'))))
+    paradigms = ParadigmCollection(read_yaml(data('paradigms.yaml')))
+    paradigms.compile('suffixes')
+    return Model(grammar, sources, paradigms)
+
+
+def is_fresh(data_dir, cache_file=CACHE_FILE):
+    """Return True if cache file is newer than all YAML source files."""
+    try:
+        mtime = os.stat(os.path.join(data_dir, cache_file)).st_mtime_ns
+    except OSError:
+        return False
+    return all(
+        os.stat(os.path.join(data_dir, name)).st_mtime_ns <= mtime
+        for name in SOURCE_FILES
+    )
+
+
+def compile(data_dir, cache_file=CACHE_FILE):
+    """Build model from YAML files and write it to the cache file."""
+    model = build(data_dir)
+    dump(os.path.join(data_dir, cache_file), CACHE_HEADER, model)
+    return model
+
+
+def load(data_dir, cache_file=CACHE_FILE):
+    """Load model from cache file, rebuilding the cache if it is stale.
+
+    If cache file can not be written, for example if data directory is
+    read-only, model is still built and returned.
+
+    """
+    if is_fresh(data_dir, cache_file):
+        model = undump(os.path.join(data_dir, cache_file), CACHE_HEADER)
+        if model is not None:
+            return model
+    try:
+        return compile(data_dir, cache_file)
+    except OSError:
+        return build(data_dir)
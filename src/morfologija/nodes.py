@@ -68,6 +68,20 @@ class Node(object):
     Here we see, that *Noun specialness* is omitted because this node does not
     have ``code`` property and only used for classification.
 
+    These attributes are precomputed when the tree is built:
+
+    named_parent
+        Nearest ancestor node with ``name`` property or None.
+
+    flat_name
+        ``(key, values)`` pair, where ``key`` is name of ``named_parent`` and
+        ``values`` is tuple of this node values or name. None if node does not
+        have neither ``value`` nor ``name``.
+
+    flat_symbol
+        ``(key, symbol)`` pair, where ``key`` is name of ``named_parent``. None
+        if node does not have ``symbol``.
+
     """
 
     def check_isnull(node, k, v):
@@ -96,9 +110,33 @@ class Node(object):
         self.lemma = node.get('lemma', False)
         self.restrict = node.get('restrict', [])
         self.parent = parent
+        self.named_parent = self._get_named_parent()
+        self.flat_name = self._get_flat_name()
+        self.flat_symbol = self._get_flat_symbol()
         self.nodes = []
         self._init_nodes(node.get('nodes', []))
 
+    def _get_named_parent(self):
+        if self.parent is None or self.parent.name is not None:
+            return self.parent
+        return self.parent.named_parent
+
+    def _get_flat_name(self):
+        if self.named_parent is None:
+            return None
+        if self.value is not None:
+            if isinstance(self.value, list):
+                return self.named_parent.name, tuple(self.value)
+            return self.named_parent.name, (self.value,)
+        if self.name is not None:
+            return self.named_parent.name, (self.name,)
+        return None
+
+    def _get_flat_symbol(self):
+        if self.named_parent is None or self.symbol is None:
+            return None
+        return self.named_parent.name, self.symbol
+
     def _init_nodes(self, nodes):
         for node in nodes:
             self.nodes.append(Node(node, self))
@@ -1,5 +1,8 @@
 from .utils import assign
+from .lexemes import LexemeError
 from .utils import getnested
+from .soundchanges import compile_forms
+from .soundchanges import get_endings
 
 
 class Symbol(object):
@@ -89,16 +92,88 @@ class Paradigm(object):
         for forms, symbols in self.extensions(kind, ext):
             yield forms, symbols
 
+    def compile(self, kind):
+        """Resolve all extensions and return affixes as flat table.
 
+        Table is a tuple of ``(forms, symbols)`` rows, where ``forms`` is tuple
+        of affix tuples and ``symbols`` is tuple of ``(key, symbol)`` pairs.
+
+        """
+        return tuple(
+            (
+                tuple(tuple(affix) for affix in forms),
+                tuple(symbols.items()),
+            )
+            for forms, symbols in self.affixes(kind)
+        )
+
+    def table(self, kind):
+        """Return compiled affixes table of this paradigm."""
+        return self.paradigms.table(self.key, kind)
+
+    def variants(self, kind, ending):
+        """Return affixes table with sound changes for given stem ending."""
+        return self.paradigms.variants(self.key, kind, ending)
 
 
 class ParadigmCollection(object):
+    """Paradigms by key.
+
+    Resolving paradigm ``extends`` chains is slow, so each paradigm is
+    resolved only once for each kind, to a flat immutable table of ``(forms,
+    symbols)`` rows. Tables are part of the collection and are built again
+    only when the collection is built from changed paradigm data.
+
+    Sound changes depend only on the last letter of stem, so tables are
+    also compiled to ``variants`` with sound changes already applied, once
+    for each stem ending changed by sound changes and once for all other
+    endings, see ``soundchanges.compile_forms``.
+
+    """
+
     def __init__(self, paradigms):
         self.paradigms = dict()
+        self.tables = dict()
+        self.variant_tables = dict()
+        self.endings = get_endings()
         for paradigm in paradigms:
             key = paradigm.get('key')
             assert key is not None
             self.paradigms[key] = Paradigm(self, paradigm)
 
     def get(self, key):
-        return self.paradigms[key]
+        """Return paradigm of given key, raise ``LexemeError`` if unknown."""
+        try:
+            return self.paradigms[key]
+        except KeyError:
+            raise LexemeError('Unknown paradigm %s.' % key)
+
+    def table(self, key, kind):
+        try:
+            return self.tables[key, kind]
+        except KeyError:
+            table = self.tables[key, kind] = self.get(key).compile(kind)
+            return table
+
+    def variants(self, key, kind, ending):
+        if ending not in self.endings:
+            ending = ''
+        try:
+            return self.variant_tables[key, kind, ending]
+        except KeyError:
+            table = self.variant_tables[key, kind, ending] = \
+                self.compile_variants(key, kind, ending)
+            return table
+
+    def compile_variants(self, key, kind, ending):
+        """Apply sound changes to table rows, for given stem ending."""
+        return tuple(
+            (compile_forms(forms, ending), symbols)
+            for forms, symbols in self.table(key, kind)
+        )
+
+    def compile(self, kind):
+        """Build tables and variants of all paradigms for given kind."""
+        for key in self.paradigms:
+            for ending in ('',) + self.endings:
+                self.variants(key, kind, ending)
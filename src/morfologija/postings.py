@@ -0,0 +1,194 @@
+"""Inverted index of numeric ``lexemes.txt`` columns.
+
+For each numeric column (source, part of speech and all parameters) and for
+each value of that column, index has a bitmap of rows having that value.
+Bitmaps are plain Python integers, so conjunctive queries are evaluated as
+bitwise operations, without parsing the lexicon file.
+
+Columns are numbered same way as fields in a ``lexemes.txt`` line, starting
+from zero: 1 is source, 3 is part of speech and 4 and following columns are
+parameters. Query is a list of conditions, all of them must match::
+
+    3=1 5=2 9!=0 7=2..4 8>=3
+
+Supported operators are ``=``, ``!=``, ``<``, ``<=``, ``>`` and ``>=``.
+Value of ``=`` and ``!=`` can also be a comma separated list of values or an
+inclusive ``from..to`` range.
+
+Index is saved next to the lexicon file, as ``lexemes.txt.postings``, and is
+rebuilt automatically when modification time or size of lexicon file
+changes.
+
+"""
+
+import os
+import re
+import array
+import operator
+
+from . import __version__
+from .utils import dump
+from .utils import undump
+
+POSTINGS_SUFFIX = '.postings'
+POSTINGS_VERSION = 1
+
+CODE_COLUMNS = (1,)
+FIRST_PARAM_COLUMN = 3
+
+OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+CONDITION_RE = re.compile(
+    r'^(\d+)(!=|<=|>=|=|<|>)(-?\d+\.\.-?\d+|-?\d+(?:,-?\d+)*)$'
+)
+
+
+class QueryError(Exception): pass
+
+
+class Condition(object):
+    def __init__(self, column, op, values):
+        self.column = column
+        self.op = op
+        self.values = values
+
+    def match(self, value):
+        if isinstance(self.values, (range, frozenset)):
+            found = value in self.values
+            return found if self.op == '=' else not found
+        return OPERATORS[self.op](value, self.values)
+
+
+def parse_condition(condition):
+    match = CONDITION_RE.match(condition)
+    if match is None:
+        raise QueryError('Invalid condition: %s' % condition)
+    column, op, values = match.groups()
+    if '..' in values:
+        start, stop = values.split('..')
+        values = range(int(start), int(stop) + 1)
+    elif ',' in values:
+        values = frozenset(map(int, values.split(',')))
+    else:
+        values = int(values)
+    if not isinstance(values, int) and op not in ('=', '!='):
+        raise QueryError('Lists and ranges can only be used with = and !=: '
+                         '%s' % condition)
+    return Condition(int(column), op, values)
+
+
+def parse_query(conditions):
+    return [parse_condition(condition) for condition in conditions]
+
+
+def bitmap(rows, size):
+    """Return integer bitmap with given row bits set."""
+    data = bytearray((size + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, 'little')
+
+
+class PostingsIndex(object):
+    def __init__(self):
+        self.bitmaps = dict()
+        self.offsets = array.array('Q')
+        self.linenos = array.array('I')
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def select(self, condition):
+        """Return bitmap of rows matching given condition."""
+        result = 0
+        for value, bits in self.bitmaps.get(condition.column, {}).items():
+            if condition.match(value):
+                result |= bits
+        return result
+
+    def query(self, conditions):
+        """Return bitmap of rows matching all conditions."""
+        result = (1 << len(self)) - 1
+        for condition in conditions:
+            result &= self.select(condition)
+            if not result:
+                break
+        return result
+
+    def rows(self, bitmap):
+        """Yield row numbers of set bits in bitmap."""
+        data = bitmap.to_bytes((len(self) + 7) // 8, 'little')
+        for i, byte in enumerate(data):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield i * 8 + bit
+
+    def count(self, conditions):
+        return bin(self.query(conditions)).count('1')
+
+
+def build(path):
+    index = PostingsIndex()
+    postings = dict()
+    with open(path, 'rb') as f:
+        offset = 0
+        for lineno, line in enumerate(f, 1):
+            fields = line.split()
+            if fields:
+                row = len(index.offsets)
+                index.offsets.append(offset)
+                index.linenos.append(lineno)
+                columns = CODE_COLUMNS + tuple(range(FIRST_PARAM_COLUMN,
+                                                     len(fields)))
+                for column in columns:
+                    try:
+                        value = int(fields[column])
+                    except (IndexError, ValueError):
+                        continue
+                    values = postings.setdefault(column, dict())
+                    values.setdefault(value, []).append(row)
+            offset += len(line)
+
+    for column, values in postings.items():
+        index.bitmaps[column] = {
+            value: bitmap(rows, len(index))
+            for value, rows in values.items()
+        }
+    return index
+
+
+def get_header(path):
+    stat = os.stat(path)
+    return ('morfologija.postings', __version__, POSTINGS_VERSION,
+            stat.st_mtime_ns, stat.st_size)
+
+
+def load(path):
+    """Load index of given lexicon file, rebuilding it if it is stale."""
+    header = get_header(path)
+    index = undump(path + POSTINGS_SUFFIX, header)
+    if index is None:
+        index = build(path)
+        try:
+            dump(path + POSTINGS_SUFFIX, header, index)
+        except OSError:
+            pass
+    return index
+
+
+def query(path, conditions):
+    """Yield ``(line number, line)`` of lexicon lines matching conditions."""
+    index = load(path)
+    rows = index.rows(index.query(parse_query(conditions)))
+    with open(path, 'rb') as f:
+        for row in rows:
+            f.seek(index.offsets[row])
+            yield index.linenos[row], f.readline().decode('utf-8').strip()
@@ -0,0 +1,203 @@
+"""Opt-in profiling of main processing stages.
+
+Profiling is enabled by ``--profile`` command line flag or by setting
+``MORFOLOGIJA_PROFILE`` environment variable to a non-empty value before
+``morfologija`` package is imported. Library code can also call ``enable``.
+
+When enabled, functions and methods listed in ``PROBES`` are replaced by
+wrappers counting calls, generated items and cumulative time. Nothing is
+replaced while profiling is disabled, so there is no overhead at all.
+
+Stage times are inclusive, for example ``Lexeme`` includes ``get_stem``,
+which includes ``get_pardefs``. Time of a generator stage is the time spent
+producing its items, not the time spent by consumer of the items.
+
+At exit a per-stage breakdown and cache hit rates are printed to standard
+error. Only stages run in the current process are counted, so command line
+tool runs commands using worker processes in a single process, when
+profiling is enabled.
+
+"""
+
+import os
+import sys
+import time
+import atexit
+import inspect
+import importlib
+import functools
+
+ENV_VAR = 'MORFOLOGIJA_PROFILE'
+
+# (module, attribute path, stage name)
+PROBES = (
+    ('lexemes', ('get_signature',), 'signature'),
+    ('lexemes', ('Signature', '__init__'), 'signature.build'),
+    ('lexemes', ('Lexeme', '__init__'), 'Lexeme'),
+    ('lexemes', ('Lexeme', 'get_stem'), 'get_stem'),
+    ('lexemes', ('Lexeme', 'get_pardefs'), 'get_pardefs'),
+    ('lexemes', ('Lexeme', 'genforms'), 'genforms'),
+    ('lexemes', ('Lexeme', 'affixes'), 'affixes'),
+    ('lexemes', ('syllabificate',), 'syllabificate'),
+    ('paradigms', ('ParadigmCollection', 'table'), 'paradigm.table'),
+    ('paradigms', ('Paradigm', 'compile'), 'paradigm.compile'),
+    ('paradigms', ('ParadigmCollection', 'variants'), 'paradigm.variants'),
+    ('lexemes', ('Lexeme', 'prepare_forms'), 'sound changes'),
+    ('lexemes', ('PardefSelector', 'evaluate'), 'get_pardefs.evaluate'),
+    ('generation', ('formatters', 'tsv'), 'format'),
+    ('generation', ('formatters', 'jsonl'), 'format'),
+)
+
+# (cache name, stage of all lookups, stage of misses)
+CACHES = (
+    ('signatures', 'signature', 'signature.build'),
+    ('paradigm tables', 'paradigm.table', 'paradigm.compile'),
+    ('pardef selection', 'get_pardefs', 'get_pardefs.evaluate'),
+)
+
+
+class Stage(object):
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.items = 0
+        self.seconds = 0.0
+
+
+stages = dict()
+patched = []
+
+
+def get_stage(name):
+    if name not in stages:
+        stages[name] = Stage(name)
+    return stages[name]
+
+
+def wrap_function(func, stage):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stage.seconds += time.perf_counter() - start
+            stage.calls += 1
+    return wrapper
+
+
+def wrap_generator(func, stage):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stage.calls += 1
+        items = func(*args, **kwargs)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                stage.seconds += time.perf_counter() - start
+            stage.items += 1
+            yield item
+    return wrapper
+
+
+def wrap(func, stage):
+    if inspect.isgeneratorfunction(func):
+        return wrap_generator(func, stage)
+    else:
+        return wrap_function(func, stage)
+
+
+def getitem(obj, name):
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+def setitem(obj, name, value):
+    if isinstance(obj, dict):
+        obj[name] = value
+    else:
+        setattr(obj, name, value)
+
+
+def get_container(module, path):
+    obj = importlib.import_module('%s.%s' % (__package__, module))
+    for name in path[:-1]:
+        obj = getitem(obj, name)
+    return obj
+
+
+def is_enabled():
+    return bool(patched)
+
+
+def enable(report_at_exit=True):
+    """Install probes, does nothing if profiling is already enabled."""
+    if is_enabled():
+        return
+    for module, path, name in PROBES:
+        container = get_container(module, path)
+        func = getitem(container, path[-1])
+        setitem(container, path[-1], wrap(func, get_stage(name)))
+        patched.append((container, path[-1], func))
+    if report_at_exit:
+        atexit.register(report)
+
+
+def disable():
+    """Remove all probes and restore original functions."""
+    while patched:
+        container, name, func = patched.pop()
+        setitem(container, name, func)
+
+
+def reset():
+    stages.clear()
+
+
+def get_cache_rates():
+    """Yield ``(cache name, lookups, hits)`` of each known cache."""
+    for name, lookups, misses in CACHES:
+        lookups = stages.get(lookups)
+        misses = stages.get(misses)
+        if lookups is not None and lookups.calls:
+            yield name, lookups.calls, lookups.calls - (
+                misses.calls if misses is not None else 0
+            )
+
+    from .syllabification import syllabificate
+    info = syllabificate.cache_info()
+    if info.hits or info.misses:
+        yield 'syllabificate', info.hits + info.misses, info.hits
+
+
+def report(output=None):
+    """Print per-stage breakdown and cache hit rates."""
+    output = output or sys.stderr
+    print('{:20} {:>10} {:>10} {:>10} {:>12}'.format(
+        'stage', 'calls', 'items', 'seconds', 'us/call',
+    ), file=output)
+    for stage in sorted(stages.values(), key=lambda s: -s.seconds):
+        if not stage.calls:
+            continue
+        print('{:20} {:10} {:10} {:10.4f} {:12.2f}'.format(
+            stage.name, stage.calls, stage.items, stage.seconds,
+            stage.seconds / stage.calls * 1e6,
+        ), file=output)
+
+    rates = list(get_cache_rates())
+    if rates:
+        print(file=output)
+        print('{:20} {:>10} {:>10} {:>10}'.format(
+            'cache', 'lookups', 'hits', 'hit rate',
+        ), file=output)
+        for name, lookups, hits in rates:
+            print('{:20} {:10} {:10} {:9.1f}%'.format(
+                name, lookups, hits, hits / lookups * 100,
+            ), file=output)
+
+
+if os.environ.get(ENV_VAR):
+    enable()
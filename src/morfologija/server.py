@@ -0,0 +1,267 @@
+"""Long running morphology server.
+
+Grammar, sources, paradigms, lexicon lookup index and analyzer are loaded
+once and kept in memory, so each request costs only the lookup itself.
+
+Server speaks JSON over HTTP, on TCP or on Unix socket. Each endpoint
+accepts ``POST`` request with JSON body, which is either a single word or an
+array of words, and returns a result or an array of results in the same
+order:
+
+``/lookup``
+    Lexicon entries of a lexeme.
+
+``/generate``
+    All forms of all lexicon entries of a lexeme.
+
+``/analyze``
+    All readings of a word form, requires compiled analyzer.
+
+``GET /<endpoint>?word=<word>`` is also accepted for a single word.
+
+Unknown endpoints return status 404, invalid requests 400, missing lexicon
+or analyzer 503 and unexpected errors 500, all with JSON ``error`` message.
+
+Small requests are handled in server thread, large ``/lookup`` and
+``/generate`` batches are split into chunks and processed by a pool of
+worker processes. Workers load only model and lookup index, analyzer is
+kept only in server process, because analysis is a single dict access.
+
+"""
+
+import os
+import json
+import traceback
+import socketserver
+import urllib.parse
+import concurrent.futures
+
+from http.server import HTTPServer
+from http.server import BaseHTTPRequestHandler
+
+from . import model
+from . import lookup
+from . import analyzer
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+
+ENDPOINTS = ('lookup', 'generate', 'analyze')
+POOL_ENDPOINTS = ('lookup', 'generate')
+
+BATCH_CHUNK_SIZE = 64
+
+
+class ServiceUnavailable(Exception): pass
+
+
+class Service(object):
+    """Morphology operations over loaded data."""
+
+    def __init__(self, data_dir, load_analyzer=True):
+        self.data_dir = data_dir
+        self.lexicon = os.path.join(data_dir, 'lexemes.txt')
+        self.model = model.load(data_dir)
+        self.index = None
+        if os.path.exists(self.lexicon):
+            self.index = lookup.load(self.lexicon)
+        self.analyzer = analyzer.load(data_dir) if load_analyzer else None
+
+    def lexemes(self, word):
+        if self.index is None:
+            raise ServiceUnavailable('Lexicon %s not found.' % self.lexicon)
+        for i, line in self.index.lookup(word):
+            try:
+                yield i, Lexeme(self.model.grammar, self.model.paradigms,
+                                self.model.sources, line).resolve()
+            except LexemeError as e:
+                yield i, e
+
+    def lookup(self, word):
+        result = []
+        for i, lexeme in self.lexemes(word):
+            if isinstance(lexeme, LexemeError):
+                result.append(dict(line=i, error=str(lexeme)))
+                continue
+            result.append(dict(
+                line=i,
+                lexeme=lexeme.lexeme,
+                lemma=lexeme.get_lemma(),
+                pos=lexeme.pos.name,
+                source=lexeme.source.code if lexeme.source else None,
+                names={k: list(v) for k, v in lexeme.names.items()},
+                symbols=dict(lexeme.symbols),
+            ))
+        return result
+
+    def generate(self, word):
+        result = []
+        for i, lexeme in self.lexemes(word):
+            if isinstance(lexeme, LexemeError):
+                result.append(dict(line=i, error=str(lexeme)))
+                continue
+            try:
+                forms = [
+                    dict(form=form, symbols=symbols)
+                    for form, symbols in lexeme.surface_forms()
+                ]
+            except LexemeError as e:
+                result.append(dict(line=i, error=str(e)))
+                continue
+            result.append(dict(
+                line=i,
+                lemma=lexeme.get_lemma(),
+                pos=lexeme.pos.name,
+                forms=forms,
+            ))
+        return result
+
+    def analyze(self, word):
+        if self.analyzer is None:
+            raise ServiceUnavailable('Analyzer is not compiled.')
+        return [
+            dict(lemma=r.lemma, pos=r.pos, symbols=dict(r.symbols))
+            for r in self.analyzer.analyze(word)
+        ]
+
+    def batch(self, endpoint, words):
+        method = getattr(self, endpoint)
+        return [method(word) for word in words]
+
+
+_worker_service = None
+
+
+def _init_worker(data_dir):
+    global _worker_service
+    _worker_service = Service(data_dir, load_analyzer=False)
+
+
+def _batch(endpoint, words):
+    return _worker_service.batch(endpoint, words)
+
+
+class Server(object):
+    def __init__(self, data_dir, processes=None):
+        self.service = Service(data_dir)
+        self.processes = processes or os.cpu_count() or 1
+        self.pool = None
+        if self.processes > 1:
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                self.processes, initializer=_init_worker,
+                initargs=(data_dir,),
+            )
+
+    def handle(self, endpoint, words):
+        if endpoint not in ENDPOINTS:
+            raise ValueError('Unknown endpoint %s.' % endpoint)
+        if self.pool is None or endpoint not in POOL_ENDPOINTS or \
+                len(words) <= BATCH_CHUNK_SIZE:
+            return self.service.batch(endpoint, words)
+        futures = [
+            self.pool.submit(_batch, endpoint,
+                             words[i:i + BATCH_CHUNK_SIZE])
+            for i in range(0, len(words), BATCH_CHUNK_SIZE)
+        ]
+        result = []
+        for future in futures:
+            result.extend(future.result())
+        return result
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.service.index is not None:
+            self.service.index.close()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return self.server.server_address
+
+    def respond(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def process(self, endpoint, data):
+        if endpoint not in ENDPOINTS:
+            return self.respond(404, dict(error='Unknown endpoint.'))
+        single = isinstance(data, str)
+        words = [data] if single else data
+        if not isinstance(words, list) or \
+                not all(isinstance(w, str) for w in words):
+            return self.respond(400, dict(
+                error='Expected a word or an array of words.'))
+        try:
+            result = self.server.morfologija.handle(endpoint, words)
+        except ServiceUnavailable as e:
+            return self.respond(503, dict(error=str(e)))
+        except Exception:
+            self.log_error('%s', traceback.format_exc())
+            return self.respond(500, dict(error='Internal server error.'))
+        self.respond(200, result[0] if single else result)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        if 'word' not in query:
+            return self.respond(400, dict(error='Missing word parameter.'))
+        self.process(url.path.strip('/'), query['word'][0])
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            return self.respond(400, dict(error='Invalid JSON.'))
+        self.process(self.path.strip('/'), data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    verbose = False
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn,
+                              socketserver.UnixStreamServer):
+    daemon_threads = True
+    verbose = False
+
+
+def create_server(morfologija, host='127.0.0.1', port=8000, socket=None):
+    if socket is not None:
+        if os.path.exists(socket):
+            os.remove(socket)
+        httpd = ThreadingUnixHTTPServer(socket, RequestHandler)
+    else:
+        httpd = ThreadingHTTPServer((host, port), RequestHandler)
+    httpd.morfologija = morfologija
+    return httpd
+
+
+def serve(data_dir, host='127.0.0.1', port=8000, socket=None, processes=None,
+          verbose=False):
+    morfologija = Server(data_dir, processes)
+    httpd = create_server(morfologija, host, port, socket)
+    httpd.verbose = verbose
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        morfologija.close()
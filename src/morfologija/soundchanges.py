@@ -1,21 +1,63 @@
-from .utils import first
-from .sounds import iter_vowels
+"""Sound changes at morpheme boundaries.
+
+Sound changes are declared as ``SoundChange`` rules in ``RULES`` list. Each
+rule replaces the last letter of the left morpheme, if the right morpheme
+starts with one of rule triggers. Rules are applied in order, to the
+boundary between the last two morphemes of a form.
+
+Result of rules depends only on the last letter of the stem and only
+letters changed by some rule, see ``get_endings``, give different results.
+So paradigm tables are compiled by ``compile_forms`` once for each of these
+endings and once for all other endings, when model is built, see
+``ParadigmCollection.variants``, and generating forms of a lexeme needs no
+rule matching at all. New rules are added to ``RULES`` list and, because
+compiled tables are cached, ``model.CACHE_VERSION`` is increased.
+
+"""
+
 from .sounds import BACK_VOWELS
 
 
+class SoundChange(object):
+    def __init__(self, name, changes, triggers):
+        self.name = name
+        self.changes = changes
+        self.triggers = tuple(triggers)
 
-def affricate(left, right):
-    left_ending = left[-1]
-    changes = {'d': 'dž', 't': 'č'}
-    vowels = (first(iter_vowels(right)) or '')[:2]
-    triggers = ['i' + s for s in BACK_VOWELS]
-    if left_ending in ('d', 't') and vowels in triggers:
-        return left[:-len(left_ending)] + changes[left_ending]
-    else:
+    def apply(self, left, right):
+        """Return left morpheme changed by this rule."""
+        if left[-1:] in self.changes and right.startswith(self.triggers):
+            return left[:-1] + self.changes[left[-1]]
         return left
 
 
+RULES = [
+    SoundChange('affrication', {'d': 'dž', 't': 'č'},
+                ['i' + s for s in BACK_VOWELS]),
+]
+
+
+def apply_rules(left, right, rules=None):
+    for rule in (RULES if rules is None else rules):
+        left = rule.apply(left, right)
+    return left
+
+
+def get_endings(rules=None):
+    """Return tuple of stem endings changed by any of rules."""
+    return tuple(sorted({
+        letter
+        for rule in (RULES if rules is None else rules)
+        for letter in rule.changes
+    }))
+
+
+def affricate(left, right):
+    return apply_rules(left, right)
+
+
 def affrication(stem, suffixes):
+    suffixes = list(suffixes)
     if len(suffixes) > 1:
         left, right = suffixes[-2], suffixes[-1]
         left = affricate(left, right)
@@ -25,3 +67,25 @@ def affrication(stem, suffixes):
         left = affricate(left, right)
         stem = left
     return stem, suffixes
+
+
+def compile_forms(forms, ending, rules=None):
+    """Apply rules to forms of a paradigm table row, for a stem ending.
+
+    ``forms`` is a tuple of suffix tuples, ``ending`` is the last letter of
+    stem. Returns tuple of ``(cut, replacement, suffixes)``, where stem of
+    each form is ``stem[:len(stem) - cut] + replacement``.
+
+    """
+    result = []
+    for suffixes in forms:
+        cut, replacement = 0, ''
+        if len(suffixes) > 1:
+            left = apply_rules(suffixes[-2], suffixes[-1], rules)
+            suffixes = suffixes[:-2] + (left, suffixes[-1])
+        elif len(suffixes) == 1:
+            left = apply_rules(ending, suffixes[0], rules)
+            if left != ending:
+                cut, replacement = len(ending), left
+        result.append((cut, replacement, suffixes))
+    return tuple(result)
@@ -1,30 +1,104 @@
+"""Sound segmentation.
+
+Words are split into sounds using precompiled regular expressions. Each
+distinct sound is interned into sound table and gets a small integer ID, so
+a word can be represented as a tuple of sound IDs. Sound class of each ID is
+precomputed:
+
+V
+    Vowel.
+
+S
+    Sibilant, ``szšž``.
+
+T
+    Stop or affricate, ``pbtdkgcč``, ``dz`` and ``dž``.
+
+R
+    Sonorant, ``lmnrvj``.
+
+?
+    Any other sound.
+
+"""
+
+import re
+
 VOWELS = 'aąeęėiįyouųū'
 FRON_VOWELS = 'iįyeęė'
 BACK_VOWELS = 'aąouųū'
 
+S = set('szšž')
+T = set('pbtdkgcč') | {'dz', 'dž'}
+R = set('lmnrvj')
+
+SOUND_RE = re.compile(r'd[zž]|.', re.DOTALL)
+NON_VOWEL_RE = re.compile('[^%s]' % VOWELS)
+LEADING_VOWELS_RE = re.compile('[%s]*' % VOWELS)
+
+SOUNDS = []
+SOUND_IDS = {}
+SOUND_CLASSES = []
+
+
+def get_sound_class(sound):
+    if sound in VOWELS:
+        return 'V'
+    if sound in S:
+        return 'S'
+    if sound in T:
+        return 'T'
+    if sound in R:
+        return 'R'
+    return '?'
+
+
+def intern_sound(sound):
+    """Return ID of given sound, adding it to sound table if needed."""
+    try:
+        return SOUND_IDS[sound]
+    except KeyError:
+        SOUND_IDS[sound] = len(SOUNDS)
+        SOUNDS.append(sound)
+        SOUND_CLASSES.append(get_sound_class(sound))
+        return SOUND_IDS[sound]
+
+
+list(map(intern_sound, sorted(set(VOWELS) | S | T | R)))
+
+
+def segment(word):
+    """Return tuple of sound IDs of given word."""
+    ids = SOUND_IDS
+    return tuple(
+        ids[sound] if sound in ids else intern_sound(sound)
+        for sound in SOUND_RE.findall(word)
+    )
+
+
+def join_sounds(ids):
+    return ''.join([SOUNDS[i] for i in ids])
+
 
 def iter_vowels(chars):
+    """Yield vowel group preceding each non-vowel and trailing vowels."""
+    groups = NON_VOWEL_RE.split(chars)
+    yield from groups[:-1]
+    if groups[-1]:
+        yield groups[-1]
+
+
+def leading_vowels(word):
+    """Return vowels at the beginning of a word or of a tuple of sound IDs."""
+    if isinstance(word, str):
+        return LEADING_VOWELS_RE.match(word).group()
     vowels = []
-    for c in chars:
-        vowel = c in VOWELS
-        if vowel:
-            vowels.append(c)
-        else:
-            yield ''.join(vowels)
-            vowels = []
-    if vowels:
-        yield ''.join(vowels)
+    for i in word:
+        if SOUND_CLASSES[i] != 'V':
+            break
+        vowels.append(SOUNDS[i])
+    return ''.join(vowels)
 
 
 def split_sounds(word):
-    last = ''
-    for char in word:
-        if char in {'z', 'ž'} and last == 'd':
-            yield last + char
-            last = ''
-            continue
-        if last:
-            yield last
-        last = char
-    if last:
-        yield last
+    return SOUND_RE.findall(word)
@@ -0,0 +1,227 @@
+"""Grouped counts of lexicon lines.
+
+Lines of ``lexemes.txt`` are counted by values of given keys. Key is either
+a column number, same as in ``postings`` (1 is source, 3 is part of speech
+and 4 and following are parameters), or a derived attribute:
+
+pos
+    Part of speech name.
+
+pardef
+    Paradigm definition key used to derive stem of lexeme.
+
+pardefs
+    All paradigm definition keys selected for lexeme, joined by ``+``.
+
+<field name>
+    Name of lexeme value of a part of speech field, for example
+    ``properness``.
+
+Without keys, lines are counted by signature, part of speech and all
+parameter columns, same as in ``lmdb-counts.txt``.
+
+If all keys are columns, counts are computed from ``columns`` store. Derived
+attributes need lexemes, so lines are counted in a single pass, split into
+chunks and counted by a pool of worker processes. Derived attributes of
+lines, which can not be turned into lexemes, are None.
+
+Counts are written in ``lmdb-counts.txt`` format, one group per line::
+
+    value1 value2 ...,count
+
+sorted by count, or as JSON.
+
+"""
+
+import os
+import json
+import time
+import collections
+
+from . import model
+from . import columns
+from .generation import chunks
+from .generation import imap_model
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import iterlines
+
+ATTRIBUTES = ('pos', 'pardef', 'pardefs')
+
+Stats = collections.namedtuple('Stats', 'keys counts lines errors seconds')
+
+
+class StatsError(Exception): pass
+
+
+def get_field_names(grammar):
+    return {
+        name for pos in grammar.poses.values() for name in pos.fields
+    }
+
+
+def parse_keys(keys, grammar):
+    """Return list of column numbers and attribute names."""
+    result = []
+    field_names = None
+    for key in keys:
+        if key.isdigit():
+            key = int(key)
+            if columns.get_column_index(key) is None:
+                raise StatsError('Column %d is not a numeric column.' % key)
+        elif key not in ATTRIBUTES:
+            if field_names is None:
+                field_names = get_field_names(grammar)
+            if key not in field_names:
+                raise StatsError('Unknown key: %s' % key)
+        result.append(key)
+    return result
+
+
+def get_pardef(lexeme):
+    for value in lexeme.properties:
+        if value.field.node.lemma:
+            for pardef in lexeme.get_pardefs(value.node):
+                return pardef
+    return None
+
+
+def get_pardefs(lexeme):
+    return '+'.join(
+        pardef
+        for value in lexeme.properties
+        for pardef in lexeme.get_pardefs(value.node)
+    )
+
+
+def get_field(lexeme, name):
+    for value in lexeme.properties:
+        if value.field.name == name:
+            return value.name
+    return None
+
+
+def get_attribute(lexeme, key):
+    if key == 'pos':
+        return lexeme.pos.name
+    if key == 'pardef':
+        return get_pardef(lexeme)
+    if key == 'pardefs':
+        return get_pardefs(lexeme)
+    return get_field(lexeme, key)
+
+
+def get_values(mdl, keys, line):
+    """Return tuple of key values of a line and True if line has errors."""
+    fields = line.split()
+    values = [
+        columns.parse_int(fields, key) if isinstance(key, int) else None
+        for key in keys
+    ]
+    try:
+        lexeme = Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, line)
+        for i, key in enumerate(keys):
+            if not isinstance(key, int):
+                values[i] = get_attribute(lexeme, key)
+    except LexemeError:
+        return tuple(values), True
+    return tuple(values), False
+
+
+def count_chunk(mdl, keys, chunk):
+    """Return counts, number of lines and errors of a chunk."""
+    counts = collections.Counter()
+    errors = 0
+    for lineno, line in chunk:
+        values, error = get_values(mdl, keys, line)
+        counts[values] += 1
+        errors += error
+    return counts, len(chunk), errors
+
+
+def count_lines(data_dir, lines, keys, processes=None, chunksize=2000):
+    """Count ``lines`` by given keys, returns ``Stats``."""
+    processes = processes or os.cpu_count() or 1
+    started = time.time()
+    counts = collections.Counter()
+    nlines = nerrors = 0
+    tasks = ((keys, chunk) for chunk in chunks(iterlines(lines), chunksize))
+    results = imap_model(data_dir, count_chunk, tasks, processes)
+
+    for chunk_counts, chunk_lines, chunk_errors in results:
+        counts.update(chunk_counts)
+        nlines += chunk_lines
+        nerrors += chunk_errors
+
+    return Stats(keys, counts, nlines, nerrors, time.time() - started)
+
+
+def count_columns(path, keys=None):
+    """Count lines of lexicon file by columns, using ``columns`` store.
+
+    Lines are counted by signature if no columns are given.
+
+    """
+    started = time.time()
+    store = columns.load(path)
+    try:
+        if keys is None:
+            keys = [key for key in store.columns() if key != 1]
+        known = [key for key in keys if key in store.columns()]
+        counts = store.group_by(known)
+        if len(known) != len(keys):
+            # Columns no line has, are missing in all lines.
+            counts = collections.Counter({
+                tuple(
+                    values[known.index(key)] if key in known
+                    else columns.MISSING
+                    for key in keys
+                ): count
+                for values, count in counts.items()
+            })
+        nlines = len(store)
+    finally:
+        store.close()
+    return Stats(keys, counts, nlines, 0, time.time() - started)
+
+
+def count(data_dir, keys=(), processes=None):
+    """Count ``lexemes.txt`` lines by given keys, returns ``Stats``."""
+    path = os.path.join(data_dir, 'lexemes.txt')
+    if not keys:
+        return count_columns(path)
+    if all(key.isdigit() for key in keys):
+        return count_columns(path, parse_keys(keys, None))
+    keys = parse_keys(keys, model.load(data_dir).grammar)
+    with open(path, encoding='utf-8') as f:
+        return count_lines(data_dir, f, keys, processes)
+
+
+def sorted_counts(counts):
+    """Return ``(values, count)`` pairs, most common first."""
+    return sorted(counts.items(), key=lambda item: (-item[1], [
+        (value is None, '' if value is None else value) for value in item[0]
+    ]))
+
+
+def format_value(value):
+    return '?' if value is None else str(value)
+
+
+def write_counts(counts, output):
+    """Write counts in ``lmdb-counts.txt`` format."""
+    for values, n in sorted_counts(counts):
+        output.write('%s,%d\n' % (' '.join(map(format_value, values)), n))
+
+
+def write_json(stats, output):
+    json.dump(collections.OrderedDict([
+        ('keys', stats.keys),
+        ('lines', stats.lines),
+        ('errors', stats.errors),
+        ('groups', [
+            collections.OrderedDict([('values', values), ('count', n)])
+            for values, n in sorted_counts(stats.counts)
+        ]),
+    ]), output, indent=2, ensure_ascii=False)
+    output.write('\n')
@@ -1,14 +1,18 @@
+import functools
 import collections
+import multiprocessing
 
-from .sounds import VOWELS
-from .sounds import split_sounds
-
-S = set('szšž')
-T = set('pbtdkgcč') | {'dz', 'dž'}
-R = set('lmnrvj')
+from .sounds import S
+from .sounds import T
+from .sounds import R
+from .sounds import SOUNDS
+from .sounds import SOUND_CLASSES
+from .sounds import segment
 
 STRULES = {'STR', 'ST', 'SR', 'TR'}
 
+CACHE_SIZE = 2 ** 16
+
 Template = collections.namedtuple('Template', 'template example')
 
 SYLLABIFICATION_TEMPLATES = [
@@ -17,6 +21,12 @@ SYLLABIFICATION_TEMPLATES = [
 
 
 def tostr(sound):
+    """Return ``S``, ``T`` or ``R`` class of a consonant, ``?`` otherwise.
+
+    Kept for callers of this module, ``syllabificate`` uses precomputed
+    ``sounds.SOUND_CLASSES`` instead.
+
+    """
     if sound in S:
         return 'S'
     if sound in T:
@@ -47,16 +57,30 @@ def tostr(sound):
 #        t
 
 
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def syllabificate(word):
+    """Return tuple of syllables of given word.
+
+    Word can be given as a string or as a tuple of sound IDs, see
+    ``sounds.segment``.
+
+    Results are kept in a bounded LRU cache, ``syllabificate.cache_info()``
+    gives number of cache hits and misses.
+
+    """
     syllables = []
     consonants = []
     syllable = ''
     STR = ''
     is_vowel = False
-    for sound in split_sounds(word):
-        if sound in VOWELS and is_vowel:
+    if isinstance(word, str):
+        word = segment(word)
+    for i in word:
+        sound = SOUNDS[i]
+        sound_class = SOUND_CLASSES[i]
+        if sound_class == 'V' and is_vowel:
             syllable += sound
-        elif sound in VOWELS:
+        elif sound_class == 'V':
             carry_consonants = (
                 (consonants and len(syllables) == 0) or
                 (len(consonants) == 1) or
@@ -81,14 +105,38 @@ def syllabificate(word):
             consonants = []
             syllable += sound
         else:
-            STR += tostr(sound)
+            STR += sound_class
             consonants.append(sound)
             if len(STR) > 3:
                 syllable += consonants.pop(0)
                 STR = STR[1:]
-        is_vowel = sound in VOWELS
+        is_vowel = sound_class == 'V'
     if syllable:
         syllables.append(syllable + ''.join(consonants))
     elif consonants and syllables:
         syllables[-1] += ''.join(consonants)
-    return list(filter(None, syllables))
+    return tuple(filter(None, syllables))
+
+
+def syllabificate_all(words, processes=1, chunksize=1000):
+    """Return list of syllables of each given word.
+
+    Each distinct word is syllabified once. If ``processes`` is greater than
+    one, words are syllabified by a pool of worker processes.
+
+    """
+    words = list(words)
+    unique = list(dict.fromkeys(words))
+    if processes == 1:
+        results = map(syllabificate, unique)
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(syllabificate, unique, chunksize)
+    results = dict(zip(unique, results))
+    return [results[word] for word in words]
+
+
+def syllabificate_column(lines, column=0, processes=1, chunksize=1000):
+    """Return syllables of given column of each non-empty lexicon line."""
+    words = (line.split()[column] for line in lines if line.strip())
+    return syllabificate_all(words, processes, chunksize)
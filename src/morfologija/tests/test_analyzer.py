@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import analyzer
+from ..analyzer import Reading
+
+from .utils import mdl
+from .utils import create_line
+
+
+class AnalyzerTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('miltai', 'noun', declension=1, number='plural'),
+            '',
+            create_line('geras', 'adjective'),
+        ]
+
+    def test_analyze(self):
+        anl = analyzer.build(mdl, self.lines)
+        self.assertEqual(anl.analyze('vyro'), (
+            Reading('vyras', 'noun', (
+                ('gender', 'm'), ('number', 'sg'), ('case', 'gen'),
+            )),
+        ))
+        self.assertEqual(
+            [r.symbols[-1] for r in anl.analyze('vyre')],
+            [('case', 'loc'), ('case', 'voc')],
+        )
+        self.assertEqual(anl.analyze('miltų')[0].lemma, 'miltai')
+        self.assertEqual(anl.analyze('nėra'), ())
+
+    def test_errors(self):
+        anl = analyzer.build(mdl, self.lines)
+        self.assertEqual(anl.errors, [
+            (4, 'Can not find lemma for Būdvardis.'),
+        ])
+
+    def test_invalid_lines(self):
+        anl = analyzer.build(mdl, self.lines + ['vyras 1', 'šuo 1 - x'])
+        self.assertEqual(anl.errors, [
+            (4, 'Can not find lemma for Būdvardis.'),
+            (5, 'Line has 2 fields, at least 4 are required.'),
+            (6, 'Invalid signature x.'),
+        ])
+        self.assertEqual(anl.analyze('vyro')[0].lemma, 'vyras')
+
+    def test_compile(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(data_dir, 'lexemes.txt'), 'w') as f:
+                f.write('\n'.join(self.lines))
+            self.assertIsNone(analyzer.load(data_dir))
+            analyzer.compile(mdl, data_dir)
+            anl = analyzer.load(data_dir)
+            self.assertEqual(anl.analyze('vyrą')[0].lemma, 'vyras')
+        finally:
+            shutil.rmtree(data_dir)
@@ -0,0 +1,66 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+import collections
+
+from .. import benchmarks
+
+from .utils import mdl
+from .utils import data_dir
+from .utils import create_line
+
+counts = os.path.join(data_dir, '..', benchmarks.COUNTS_FILE)
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_read_counts(self):
+        signature = next(benchmarks.read_counts(counts))
+        self.assertEqual(signature.pos, 1)
+        self.assertEqual(len(signature.params), 19)
+        self.assertEqual(signature.count, 5199)
+
+    def test_synthetic_lexicon(self):
+        signatures = [
+            benchmarks.Signature(1, (1, 1, 1, 3), 3),
+            benchmarks.Signature(1, (1, 1, 1, 1), 1),
+        ]
+        lines = benchmarks.synthetic_lexicon(mdl, signatures, 200)
+        self.assertEqual(lines, benchmarks.synthetic_lexicon(mdl, signatures,
+                                                             200))
+        counter = collections.Counter(lines)
+        self.assertEqual(counter['Jonas 1 - 1 1 1 1 1'] +
+                         counter['arklys 1 - 1 1 1 1 3'], 200)
+        self.assertGreater(counter['arklys 1 - 1 1 1 1 3'],
+                           counter['Jonas 1 - 1 1 1 1 1'])
+
+    def test_run(self):
+        results = benchmarks.run(data_dir, counts, size=50, repeat=1,
+                                 names=['Lexeme', 'lookup'])
+        self.assertEqual(list(results['benchmarks']), ['Lexeme', 'lookup'])
+        self.assertEqual(results['lexicon']['lines'], 50)
+        self.assertTrue(results['lexicon']['synthetic'])
+        self.assertEqual(results['benchmarks']['Lexeme']['n'], 50)
+
+        output = io.StringIO()
+        benchmarks.write(results, output)
+        self.assertEqual(json.loads(output.getvalue())['repeat'], 1)
+
+    def test_invalid_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lexicon = os.path.join(tmp, 'lexemes.txt')
+            with open(lexicon, 'w', encoding='utf-8') as f:
+                f.write('\n'.join([
+                    create_line('vyras', 'noun', declension=1),
+                    'vyras 1',
+                    'šuo 1 - x 1',
+                    'x y - 1 1 1 1 1',
+                ]))
+            ctx = benchmarks.Context(data_dir, lexicon, False)
+            results = benchmarks.run_context(ctx, repeat=2, names=[
+                'Lexeme', 'Lexeme.get_pardefs', 'Lexeme.get_stem',
+            ])
+        self.assertEqual(results['lexicon']['errors'], 3)
+        self.assertEqual(ctx.poses, ['1', 'x'])
+        self.assertEqual(results['benchmarks']['Lexeme.get_stem']['n'], 1)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import columns
+from .. import postings
+
+LEXEMES = """\
+vyras 1 - 1 1 1 1 1 1 0
+Jonas 1 - 1 2 1 1 1 1 0
+
+geras 2 gerasis 2 0 0 3
+martis 1 - 1 1 1 1 4 2 1
+ratas 3 - 1 1 1 1 1 1 0
+šuo 1 - x
+"""
+
+QUERIES = [
+    ['3=1'], ['1=2'], ['3=1', '4=2'], ['3=5'], ['12=0'], ['2=1'],
+    ['4!=1'], ['7=1,4'], ['7!=1,4'], ['9=0..1'], ['6>=1', '8<2'],
+]
+
+
+class ColumnStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'lexemes.txt')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(LEXEMES)
+        self.store = columns.load(self.path)
+        self.numpy = columns.numpy
+
+    def tearDown(self):
+        columns.numpy = self.numpy
+        self.store.close()
+        shutil.rmtree(self.tmp)
+
+    def select(self, *conditions):
+        return [self.store.lexeme(row) for row in self.store.select(conditions)]
+
+    def test_rows(self):
+        store = self.store
+        self.assertEqual(len(store), 6)
+        self.assertEqual(list(store.linenos), [1, 2, 4, 5, 6, 7])
+        self.assertEqual(store.columns(), [1, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(list(store.column(3)), [1, 1, 2, 1, 1, -1])
+        self.assertEqual(list(store.column(7)), [1, 1, -1, 4, 1, -1])
+        self.assertEqual([store.lexeme(i) for i in range(len(store))],
+                         ['vyras', 'Jonas', 'geras', 'martis', 'ratas', 'šuo'])
+        self.assertEqual(store.lemma(2), 'gerasis')
+        self.assertEqual(store.lemma(5), 'šuo')
+        self.assertRaises(KeyError, store.column, 2)
+
+    def test_fresh(self):
+        self.assertTrue(columns.is_fresh(self.path))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('namas 1 - 1 1 1 1 1 1 0\n')
+        self.assertFalse(columns.is_fresh(self.path))
+        store = columns.load(self.path)
+        self.assertEqual(len(store), 7)
+        store.close()
+
+    def test_select(self):
+        self.assertEqual(self.select('3=1'),
+                         ['vyras', 'Jonas', 'martis', 'ratas'])
+        self.assertEqual(self.select('3=1', '4=2'), ['Jonas'])
+        self.assertEqual(self.select('7!=1'), ['martis'])
+        self.assertEqual(self.select('12=0'), [])
+        self.assertEqual(self.store.count(['1=1']), 4)
+
+    def test_same_as_postings(self):
+        index = postings.load(self.path)
+        for query in QUERIES:
+            rows = index.rows(index.query(postings.parse_query(query)))
+            self.assertEqual(list(self.store.select(query)), list(rows),
+                             query)
+
+    def test_group_by(self):
+        self.assertEqual(self.store.group_by([1]), {
+            (1,): 4, (2,): 1, (3,): 1,
+        })
+        rows = self.store.select(['1=1'])
+        self.assertEqual(self.store.group_by([3, 4], rows), {
+            (1, 1): 2, (1, 2): 1, (-1, -1): 1,
+        })
+        self.assertEqual(self.store.signature_counts()[
+            (1, 1, 1, 1, 1, 1, 0)
+        ], 2)
+
+    def test_without_numpy(self):
+        expected = [
+            (list(self.store.select(query)), dict(self.store.group_by([3, 7])))
+            for query in QUERIES
+        ]
+        columns.numpy = None
+        store = columns.load(self.path)
+        result = [
+            (list(store.select(query)), dict(store.group_by([3, 7])))
+            for query in QUERIES
+        ]
+        store.close()
+        self.assertEqual(result, expected)
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import completion
+from ..completion import Completion
+
+from .utils import mdl
+from .utils import create_line
+
+
+class VarintTests(unittest.TestCase):
+    def test_varint(self):
+        data = bytearray()
+        for number in (0, 127, 128, 300, 2 ** 32):
+            completion.write_varint(data, number)
+        offset = 0
+        numbers = []
+        while offset < len(data):
+            number, offset = completion.read_varint(data, offset)
+            numbers.append(number)
+        self.assertEqual(numbers, [0, 127, 128, 300, 2 ** 32])
+
+
+class CompletionTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('vėjas', 'noun', declension=2),
+            create_line('vyrai', 'noun', declension=1, number='plural'),
+            create_line('geras', 'adjective'),
+            create_line('ratas', 'noun', declension=1),
+            create_line('namas', 'noun', declension=1),
+        ]
+        self.index, self.errors = completion.build(mdl, self.lines)
+
+    def forms(self, prefix, limit=10, index=None):
+        index = index or self.index
+        return [item.form for item in index.complete(prefix, limit)]
+
+    def test_complete(self):
+        self.assertEqual(self.index.complete('vėjui'), [
+            Completion('vėjui', ('vėjas',), None),
+        ])
+        self.assertEqual(self.forms('vyra'),
+                         ['vyrai', 'vyrais', 'vyrams', 'vyras'])
+        self.assertEqual(self.index.complete('vyrai')[0].lemmas,
+                         ('vyrai', 'vyras'))
+        self.assertEqual(self.forms('vyra', 2), ['vyrai', 'vyrais'])
+        self.assertEqual(self.forms('x'), [])
+        self.assertEqual(self.forms('vyra', 0), [])
+
+    def test_lexemes_without_forms(self):
+        self.assertEqual(self.forms('ger'), ['geras'])
+        self.assertEqual(self.errors, [(4, 'Can not find lemma for Būdvardis.')])
+
+    def test_invalid_lines(self):
+        index, errors = completion.build(mdl, ['vyras 1', 'šuo 1 - x 1'])
+        self.assertEqual(errors, [
+            (1, 'Line has 2 fields, at least 4 are required.'),
+            (2, 'Invalid signature x 1.'),
+        ])
+        self.assertEqual([item.form for item in index.complete('')], ['šuo'])
+
+    def test_all_words(self):
+        forms = self.forms('', len(self.index))
+        self.assertEqual(len(forms), len(self.index))
+        self.assertGreater(len(forms), completion.BLOCK_SIZE * 2)
+        self.assertEqual(forms, sorted(forms, key=lambda w: w.encode()))
+        for i in range(1, len(forms)):
+            prefix = forms[i][:3]
+            self.assertEqual(self.forms(prefix, len(forms)),
+                             [f for f in forms if f.startswith(prefix)])
+
+    def test_frequencies(self):
+        frequencies = completion.read_frequencies([
+            'vyro 10', '', 'vyrams 20', 'vėjo 5', 'vyro 15',
+        ])
+        self.assertEqual(frequencies['vyro'], 25)
+        index, errors = completion.build(mdl, self.lines, frequencies)
+        self.assertEqual(self.forms('v', 4, index),
+                         ['vyro', 'vyrams', 'vėjo', 'vyrai'])
+        self.assertEqual(index.complete('vyro')[0].frequency, 25)
+
+
+class CompiledCompletionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        with open(os.path.join(self.tmp, 'lexemes.txt'), 'w') as f:
+            f.write(create_line('vyras', 'noun', declension=1) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_compile(self):
+        self.assertIsNone(completion.load(self.tmp))
+        completion.compile(mdl, self.tmp)
+        index = completion.load(self.tmp)
+        self.assertEqual(index.complete('vyro')[0].lemmas, ('vyras',))
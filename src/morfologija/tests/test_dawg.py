@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import dawg
+from .. import analyzer
+
+from .utils import mdl
+from .utils import data
+from .utils import create_line
+
+
+class RuleTests(unittest.TestCase):
+    def test_rules(self):
+        self.assertEqual(dawg.get_rule('vyro', 'vyras'), (1, 'as'))
+        self.assertEqual(dawg.get_rule('vyras', 'vyras'), (0, ''))
+        self.assertEqual(dawg.apply_rule('vyro', (1, 'as')), 'vyras')
+        self.assertEqual(dawg.apply_rule('vyras', (0, '')), 'vyras')
+
+
+class DawgTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('ratas', 'noun', declension=1),
+            create_line('vėjas', 'noun', declension=2),
+            create_line('miltai', 'noun', declension=1, number='plural'),
+            create_line('geras', 'adjective'),
+        ]
+        buf, self.errors = dawg.build(mdl, self.lines)
+        self.dawg = dawg.Dawg(buf)
+        self.analyzer = analyzer.build(mdl, self.lines)
+
+    def test_analyze(self):
+        for form in self.analyzer.forms:
+            self.assertEqual(sorted(self.dawg.analyze(form)),
+                             sorted(self.analyzer.analyze(form)))
+        self.assertEqual(self.dawg.analyze('vyr'), ())
+        self.assertEqual(self.dawg.analyze('nėra'), ())
+        self.assertIn('vėjui', self.dawg)
+        self.assertNotIn('vėj', self.dawg)
+        self.assertEqual(self.errors, [(5, 'Can not find lemma for Būdvardis.')])
+
+    def test_minimal(self):
+        # vyras and ratas have the same paradigm, so state after "rat" is
+        # the same as state after "vyr" and only "r" and "ra" are added.
+        buf, errors = dawg.build(mdl, self.lines[:1])
+        vyras = dawg.Dawg(buf)
+        buf, errors = dawg.build(mdl, self.lines[:2])
+        both = dawg.Dawg(buf)
+        self.assertEqual(both.nstates - vyras.nstates, 2)
+
+    def test_invalid_lines(self):
+        buf, errors = dawg.build(mdl, self.lines[:1] + ['vyras 1',
+                                                        'šuo 1 - x 1'])
+        self.assertEqual(errors, [
+            (2, 'Line has 2 fields, at least 4 are required.'),
+            (3, 'Invalid signature x 1.'),
+        ])
+        self.assertIn('vyro', dawg.Dawg(buf))
+
+    def test_chunks(self):
+        expected, errors = dawg.build(mdl, self.lines)
+        for chunk_size in (1, 7, 100):
+            buf, errors = dawg.build(mdl, self.lines, chunk_size)
+            self.assertEqual(buf, expected)
+
+    def test_prefix(self):
+        forms = list(self.dawg.forms())
+        self.assertEqual(forms, sorted(self.analyzer.forms,
+                                       key=lambda f: f.encode('utf-8')))
+        self.assertEqual(list(self.dawg.forms('vyra')),
+                         ['vyrai', 'vyrais', 'vyrams', 'vyras'])
+        self.assertEqual(list(self.dawg.forms('x')), [])
+
+        form, readings = next(self.dawg.items('ratu'))
+        self.assertEqual(form, 'ratu')
+        self.assertEqual(readings, self.dawg.analyze('ratu'))
+
+
+class CompiledDawgTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        with open(os.path.join(self.tmp, 'lexemes.txt'), 'w') as f:
+            f.write(create_line('vyras', 'noun', declension=1) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_compile(self):
+        self.assertIsNone(dawg.load(self.tmp))
+        self.assertEqual(dawg.compile(mdl, self.tmp), [])
+        automaton = dawg.load(self.tmp)
+        try:
+            self.assertEqual(automaton.analyze('vyro')[0].lemma, 'vyras')
+        finally:
+            automaton.close()
@@ -0,0 +1,78 @@
+import io
+import json
+import unittest
+
+from .. import generation
+from ..lexemes import LexemeError
+
+from .utils import data_dir
+from .utils import create_line
+
+
+class GenerationTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('geras', 'adjective'),
+            create_line('vėjas', 'noun', declension=2),
+            create_line('miltai', 'noun', declension=1, number='plural'),
+        ]
+
+    def generate(self, **kwargs):
+        output = io.StringIO()
+        errors = []
+        stats = generation.generate(data_dir, self.lines, output,
+                                    errors=errors, **kwargs)
+        return output.getvalue(), stats, errors
+
+    def test_tsv(self):
+        output, stats, errors = self.generate(processes=1)
+        rows = [line.split('\t') for line in output.splitlines()]
+        self.assertEqual(rows[1], [
+            '1', 'vyro', 'vyras', 'noun', 'gender=m number=sg case=gen',
+        ])
+        self.assertEqual([row[0] for row in rows], (
+            ['1'] * 14 + ['3'] * 14 + ['4'] * 6
+        ))
+        self.assertEqual((stats.lines, stats.forms, stats.errors), (4, 34, 1))
+        self.assertEqual(errors, [(2, 'Can not find lemma for Būdvardis.')])
+
+    def test_jsonl(self):
+        output, stats, errors = self.generate(processes=1, fmt='jsonl')
+        row = json.loads(output.splitlines()[-1])
+        self.assertEqual(row, {
+            'line': 4, 'form': 'miltuose', 'lemma': 'miltai', 'pos': 'noun',
+            'symbols': {'gender': 'm', 'number': 'pl', 'case': 'loc'},
+        })
+
+    def test_parallel_order(self):
+        serial = self.generate(processes=1)
+        parallel = self.generate(processes=2, chunksize=1)
+        self.assertEqual(serial[0], parallel[0])
+        self.assertEqual(serial[2], parallel[2])
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, self.generate, fmt='xml')
+
+    def test_invalid_lines(self):
+        self.lines[1:2] = ['vyras 1', 'šuo 1 - x']
+        output, stats, errors = self.generate(processes=1)
+        self.assertEqual((stats.lines, stats.forms, stats.errors), (5, 34, 2))
+        self.assertEqual(errors, [
+            (2, 'Line has 2 fields, at least 4 are required.'),
+            (3, 'Invalid signature x.'),
+        ])
+
+    def test_partial_line(self):
+        def genrows(mdl, lineno, line):
+            yield lineno, 'vyras', 'vyras', 'noun', {}
+            raise LexemeError('Broken paradigm.')
+        original = generation.genrows
+        generation.genrows = genrows
+        try:
+            output, stats, errors = self.generate(processes=1)
+        finally:
+            generation.genrows = original
+        self.assertEqual(output, '')
+        self.assertEqual(stats.forms, 0)
+        self.assertEqual(errors, [(i, 'Broken paradigm.') for i in range(1, 5)])
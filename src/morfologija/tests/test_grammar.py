@@ -2,6 +2,7 @@ import yaml
 import unittest
 
 from ..nodes import Node
+from ..grammar import Grammar
 
 from .utils import genlexemes
 
@@ -39,6 +40,52 @@ class NodeTests(unittest.TestCase):
         symbol = self.grammar.query(code__isnull=False).get(code=2).symbol
         self.assertEqual(symbol, 'b')
 
+    def test_named_parent(self):
+        node = Node(yaml.load("""\
+        name: number
+        nodes:
+        - label: Unnamed
+          nodes:
+          - code: 1
+            name: singular
+            symbol: sg
+          - code: 2
+            value: [singular, plural]
+          - code: 3
+        """))
+        sg, both, none = node.nodes[0].nodes
+        self.assertIsNone(node.named_parent)
+        self.assertIs(sg.named_parent, node)
+        self.assertEqual(sg.flat_name, ('number', ('singular',)))
+        self.assertEqual(sg.flat_symbol, ('number', 'sg'))
+        self.assertEqual(both.flat_name, ('number', ('singular', 'plural')))
+        self.assertIsNone(both.flat_symbol)
+        self.assertIsNone(none.flat_name)
+
+
+class GrammarIndexTests(unittest.TestCase):
+    def setUp(self):
+        data = yaml.load(grammar)
+        self.grammar = Grammar(Node(dict(nodes=[
+            dict(code=1, symbol='pos', label='POS', nodes=data),
+        ])))
+
+    def test_code_indexes(self):
+        pos = self.grammar.get_pos_by_code(1)
+        self.assertIs(pos, self.grammar.poses['pos'])
+        self.assertIsNone(self.grammar.get_pos_by_code(2))
+        field = pos.fields_by_code[2]
+        self.assertEqual(field.name, 'b')
+        self.assertEqual(field.get_value_by_code(1).name, 'ba')
+        self.assertIsNone(field.get_value_by_code(2))
+
+    def test_path_labels(self):
+        pos = self.grammar.poses['pos']
+        value = pos.fields['b'].values['ba']
+        self.assertEqual(value.path_labels, (
+            'POS', 'Category', 'Subcategory', 'b', 'ba',
+        ))
+
 
 class GrammarTests(unittest.TestCase):
     def test_restrict(self):
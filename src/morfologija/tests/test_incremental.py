@@ -0,0 +1,222 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import model
+from .. import analyzer
+from .. import generation
+from .. import incremental
+
+from .utils import mdl
+from .utils import data
+from .utils import create_line
+
+
+class DependencyGraphTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('Jonas', 'noun', declension=1, properness='name'),
+            create_line('vėjas', 'noun', declension=2),
+            'bad line',
+        ]
+        self.graph = incremental.DependencyGraph(mdl, self.lines)
+
+    def test_dependents(self):
+        keys = self.graph.dependents({'vyr/as'})
+        self.assertIn('vyr/as', keys)
+        self.assertIn('Jon/as', keys)
+        self.assertNotIn('vėj/as', keys)
+
+    def test_symbols_dependents(self):
+        keys = self.graph.dependents({'case'})
+        self.assertIn('vyr/as', keys)
+        self.assertIn('Jon/as', keys)
+        self.assertIn('vėj/as', keys)
+        self.assertEqual(self.graph.paradigm_lines({'case'}), {1, 2, 3})
+
+    def test_paradigm_lines(self):
+        self.assertEqual(self.graph.paradigm_lines({'vyr/as'}), {1, 2})
+        self.assertEqual(self.graph.paradigm_lines({'Jon/as'}), {2})
+        self.assertEqual(self.graph.paradigm_lines({'vėj/as'}), {3})
+        self.assertEqual(self.graph.paradigm_lines({'nėra'}), set())
+
+    def test_grammar_lines(self):
+        signatures = incremental.describe_signatures(mdl.grammar,
+                                                     self.graph.signatures)
+        self.assertEqual(self.graph.grammar_lines(signatures), set())
+        signatures[next(iter(signatures))] = b''
+        self.assertEqual(len(self.graph.grammar_lines(signatures)), 1)
+
+
+class MatchLinesTests(unittest.TestCase):
+    def match(self, old, new):
+        return incremental.match_lines(list(old), list(new))
+
+    def test_match_lines(self):
+        linemap = self.match('abcdef', 'abXcdf')
+        self.assertEqual([linemap.get(i) for i in range(1, 7)],
+                         [1, 2, 4, 5, None, 6])
+        self.assertEqual(linemap.unmatched(6), {3})
+        self.assertFalse(linemap.identity)
+
+        linemap = self.match('abc', 'abc')
+        self.assertTrue(linemap.identity)
+        self.assertEqual(linemap.unmatched(3), set())
+
+        linemap = self.match('abc', 'cab')
+        self.assertEqual([linemap.get(i) for i in range(1, 4)],
+                         [2, 3, None])
+        self.assertEqual(linemap.unmatched(3), {1})
+        self.assertEqual(self.match('', 'ab').unmatched(2), {1, 2})
+
+
+class UpdateTests(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        for name in model.SOURCE_FILES:
+            shutil.copy(data(name), self.data_dir)
+        self.output = self.path('forms.tsv')
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('Jonas', 'noun', declension=1, properness='name'),
+            create_line('vėjas', 'noun', declension=2),
+            create_line('geras', 'adjective'),
+        ]
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        analyzer.compile(model.load(self.data_dir), self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    def write(self, name, text):
+        with open(self.path(name), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def replace(self, name, old, new):
+        with open(self.path(name), encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn(old, text)
+        self.write(name, text.replace(old, new, 1))
+        # Make sure model cache is stale.
+        mtime = os.stat(self.path(model.CACHE_FILE)).st_mtime_ns + 10**9
+        os.utime(self.path(name), ns=(mtime, mtime))
+
+    def update(self):
+        errors = []
+        stats = incremental.update(self.data_dir, self.output, processes=1,
+                                   errors=errors)
+        return stats, errors
+
+    def assertUpToDate(self):
+        output = io.StringIO()
+        with open(self.path('lexemes.txt'), encoding='utf-8') as f:
+            generation.generate(self.data_dir, f, output, processes=1)
+        with open(self.output, encoding='utf-8') as f:
+            self.assertEqual(f.read(), output.getvalue())
+
+        expected = analyzer.build(model.load(self.data_dir), self.lines)
+        anl = analyzer.load(self.data_dir)
+        self.assertEqual(
+            {form: set(readings) for form, readings in anl.forms.items()},
+            {form: set(readings) for form, readings in expected.forms.items()},
+        )
+        self.assertEqual(anl.errors, expected.errors)
+
+    def test_update(self):
+        stats, errors = self.update()
+        self.assertTrue(stats.full)
+        self.assertEqual(errors, [(4, 'Can not find lemma for Būdvardis.')])
+        self.assertUpToDate()
+
+        stats, errors = self.update()
+        self.assertFalse(stats.full)
+        self.assertEqual((stats.affected, stats.paradigms), (0, 0))
+
+        self.replace('paradigms.yaml', '      - [e, ai]\n', '      - [e, a]\n')
+        stats, errors = self.update()
+        self.assertEqual((stats.affected, stats.paradigms), (2, 1))
+        self.assertUpToDate()
+        readings = analyzer.load(self.data_dir).analyze('vyra')
+        self.assertEqual([dict(r.symbols)['case'] for r in readings], ['voc'])
+
+    def test_lexicon_change(self):
+        self.update()
+        self.lines[2] = create_line('vėjas', 'noun', declension=1)
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        stats, errors = self.update()
+        self.assertEqual(stats.affected, 1)
+        self.assertUpToDate()
+
+        self.lines.append(create_line('ratas', 'noun', declension=1))
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        stats, errors = self.update()
+        self.assertFalse(stats.full)
+        self.assertEqual(stats.affected, 1)
+        self.assertUpToDate()
+
+        self.lines.insert(1, create_line('namas', 'noun', declension=1))
+        self.lines.insert(2, '')
+        del self.lines[4]
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        stats, errors = self.update()
+        self.assertEqual(stats.affected, 1)
+        self.assertEqual(errors, [])
+        self.assertUpToDate()
+
+    def test_shared_readings(self):
+        self.lines.append(self.lines[0])
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        self.update()
+        del self.lines[0]
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        stats, errors = self.update()
+        self.assertEqual(stats.affected, 0)
+        self.assertUpToDate()
+        self.assertEqual(len(analyzer.load(self.data_dir).analyze('vyro')), 1)
+
+    def test_jsonl(self):
+        self.output = self.path('forms.jsonl')
+        incremental.update(self.data_dir, self.output, 'jsonl', processes=1)
+        self.lines[0:1] = [create_line('ratas', 'noun', declension=1)] * 2
+        self.write('lexemes.txt', '\n'.join(self.lines) + '\n')
+        stats = incremental.update(self.data_dir, self.output, 'jsonl',
+                                   processes=1)
+        self.assertEqual(stats.affected, 2)
+        output = io.StringIO()
+        with open(self.path('lexemes.txt'), encoding='utf-8') as f:
+            generation.generate(self.data_dir, f, output, 'jsonl',
+                                processes=1)
+        with open(self.output, encoding='utf-8') as f:
+            self.assertEqual(f.read(), output.getvalue())
+
+    def test_symbols_change(self):
+        self.update()
+        self.replace('paradigms.yaml', '  - gen\n', '  - GEN\n')
+        stats, errors = self.update()
+        self.assertEqual(stats.affected, 3)
+        self.assertUpToDate()
+        readings = analyzer.load(self.data_dir).analyze('vyro')
+        self.assertEqual([dict(r.symbols)['case'] for r in readings], ['GEN'])
+
+    def test_removed_paradigm(self):
+        self.update()
+        self.replace('paradigms.yaml', (
+            '- key: Jon/as\n'
+            '  extends:\n'
+            '  - keys: vyr/as\n'
+            '    replace:\n'
+            '      suffixes:\n'
+            '        case:\n'
+            '          voc: ai\n'
+        ), '')
+        stats, errors = self.update()
+        self.assertEqual(stats.affected, 1)
+        self.assertEqual(errors, [(2, 'Unknown paradigm Jon/as.')])
+        self.assertUpToDate()
+        self.assertEqual(analyzer.load(self.data_dir).analyze('Jono'), ())
@@ -5,6 +5,8 @@ import collections
 from ..nodes import Node
 from ..grammar import Grammar
 from ..lexemes import Lexeme
+from ..lexemes import LexemeError
+from ..lexemes import get_pardef_selector
 from ..paradigms import ParadigmCollection
 
 RES = dict(
@@ -280,6 +282,67 @@ class NodeTests(unittest.TestCase):
             ([['ėse' ]], {'case': 'loc', 'gender': 'm', 'number': 'pl'}),
         ])
 
+    def test_shared_signature(self):
+        vyras = self.lexeme('vyras')
+        elnias = self.lexeme('elnias')
+        jonas = self.lexeme('Jonas', properness='name')
+        self.assertIs(vyras.signature, elnias.signature)
+        self.assertIsNot(vyras.signature, jonas.signature)
+        self.assertEqual(vyras.signature.key, (1, (1, 1, 1, 1)))
+        self.assertEqual(dict(jonas.names), {
+            'properness': ('name',),
+            'number': ('singular, plurar',),
+        })
+        self.assertEqual(dict(jonas.symbols), {'gender': 'm'})
+        self.assertEqual((vyras.stem, elnias.stem), ('vyr', 'elni'))
+
+    def test_pardef_selector(self):
+        vyras = self.lexeme('vyras', declension=2)
+        node = vyras.properties[0].node
+        selector = get_pardef_selector(self.grammar, node)
+        self.assertIs(selector, get_pardef_selector(self.grammar, node))
+        self.assertEqual(selector.get_ending('elnias'), 'ias')
+        self.assertEqual(selector.get_ending('vėjas'), '')
+
+        selector.cache.clear()
+        self.assertEqual(self.pardefs('vėjas', declension=2),
+                         ['vėj/as', 'vyr/ai'])
+        self.assertEqual(self.pardefs('ratas', declension=2),
+                         ['vėj/as', 'vyr/ai'])
+        self.assertEqual(self.pardefs('elnias', declension=2),
+                         ['eln/ias', 'vyr/ai'])
+        self.assertEqual(len(selector.cache), 2)
+
+    def test_lazy_fields(self):
+        vyras = self.lexeme('vyras')
+        self.assertNotIn('stem', vars(vyras))
+        self.assertEqual(vyras.stem, 'vyr')
+        self.assertIn('stem', vars(vyras))
+        self.assertIs(vyras.resolve(), vyras)
+
+        lexeme = Lexeme(self.grammar, self.paradigms, self.source,
+                        'word 1 - 99 1')
+        self.assertEqual(lexeme.lexeme, 'word')
+        self.assertRaises(LexemeError, lexeme.resolve)
+
+    def test_invalid_line(self):
+        with self.assertRaisesRegex(LexemeError, 'Line has 2 fields'):
+            Lexeme(self.grammar, self.paradigms, self.source, 'vyras 1')
+        lexeme = Lexeme(self.grammar, self.paradigms, self.source,
+                        'šuo 1 - x 1')
+        with self.assertRaisesRegex(LexemeError, 'Invalid signature x 1'):
+            lexeme.resolve()
+        lexeme = Lexeme(self.grammar, self.paradigms, self.source,
+                        'šuo y - 1 1')
+        with self.assertRaisesRegex(LexemeError, 'Invalid source code y'):
+            lexeme.resolve()
+
+    def test_unknown_value(self):
+        lexeme = Lexeme(self.grammar, self.paradigms, self.source,
+                        'word 1 - 1 99 1 1 1')
+        with self.assertRaisesRegex(LexemeError, 'Unknown value 99'):
+            lexeme.resolve()
+
     def test_check_restrict(self):
         lexeme = self.lexeme('word')
         restrictions = [{'symbols': {'number': 'pl'}}]
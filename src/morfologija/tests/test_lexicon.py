@@ -0,0 +1,90 @@
+import unittest
+import tracemalloc
+
+from .. import lexicon
+from ..lexemes import Lexeme
+
+from .utils import mdl
+from .utils import create_line
+
+
+class LexiconTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            '',
+            'geras 1 - x 1',
+            create_line('vėjas', 'noun', declension=2),
+            create_line('Jonas', 'noun', declension=1,
+                        properness='name').replace(' - ', ' Jonas(2) '),
+        ]
+        self.lexicon = lexicon.load(mdl, self.lines)
+
+    def test_entries(self):
+        self.assertEqual(len(self.lexicon), 3)
+        self.assertEqual([e.lexeme for e in self.lexicon],
+                         ['vyras', 'vėjas', 'Jonas'])
+        self.assertEqual([e.lineno for e in self.lexicon], [1, 4, 5])
+        self.assertEqual(self.lexicon.errors[0][0], 3)
+
+        entry = self.lexicon[-1]
+        self.assertEqual(entry.lemma, 'Jonas(2)')
+        self.assertEqual(entry.get_lemma(), 'Jonas(2)')
+        self.assertEqual(entry.source.code, 1)
+        self.assertEqual(entry.pos.name, 'noun')
+        self.assertEqual(entry.names['properness'], ('name',))
+        self.assertIsNone(self.lexicon[0].lemma)
+
+    def test_invalid_lines(self):
+        lexicon_ = lexicon.load(mdl, [
+            'x 70000 - 1 1 1 1 1',
+            'x -1 - 1 1 1 1 1',
+            'x y - 1 1 1 1 1',
+            'x 1',
+            self.lines[2],
+            self.lines[0],
+        ])
+        self.assertEqual(len(lexicon_), 1)
+        self.assertEqual(lexicon_.errors, [
+            (1, 'Source code 70000 is out of range.'),
+            (2, 'Source code -1 is out of range.'),
+            (3, 'Invalid source code y.'),
+            (4, 'Line has 2 fields, at least 4 are required.'),
+            (5, 'Invalid signature x 1.'),
+        ])
+
+    def test_shared_signature(self):
+        lexicon_ = lexicon.load(mdl, [self.lines[0]] * 3)
+        self.assertEqual(len(lexicon_.signatures), 1)
+        self.assertIs(lexicon_[0].symbols, lexicon_[2].symbols)
+
+    def test_to_line(self):
+        for entry, line in zip(self.lexicon, [self.lines[0]] + self.lines[3:]):
+            self.assertEqual(entry.to_line(), line)
+
+    def test_get_lexeme(self):
+        lexeme = self.lexicon[0].get_lexeme()
+        self.assertIsInstance(lexeme, Lexeme)
+        self.assertEqual(lexeme.stem, 'vyr')
+
+    def test_memory(self):
+        lines = [self.lines[0], self.lines[3]] * 500
+
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            lexemes = [
+                Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, line)
+                for line in lines
+            ]
+            lexemes_size = tracemalloc.get_traced_memory()[0] - start
+            del lexemes
+
+            start = tracemalloc.get_traced_memory()[0]
+            lexicon_ = lexicon.load(mdl, lines)
+            lexicon_size = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(lexicon_), 1000)
+        self.assertLess(lexicon_size * 10, lexemes_size)
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import lookup
+
+LEXEMES = """\
+vyras 1 - 1 1 1 1 1 1 0 0 0 1 0 0 0 0 0 0 0 0 0 0
+ąžuolas 1 - 1 1 1 1 1 1 0 0 0 1 0 0 0 0 0 0 0 0 0 0
+
+vyrai 1 - 1 1 1 1 1 1 0 0 0 2 0 0 0 0 0 0 0 0 0 0
+vyras(2) 2 - 1 1 1 1 1 1 0 0 0 1 0 0 0 0 0 0 0 0 0 0
+vyr 1 - 1 1 1 1 1 1 0 0 0 1 0 0 0 0 0 0 0 0 0 0
+"""
+
+
+class LookupTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'lexemes.txt')
+        self.write(LEXEMES)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, content):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def lookup(self, query):
+        index = lookup.load(self.path)
+        try:
+            return [(i, line.split()[0]) for i, line in index.lookup(query)]
+        finally:
+            index.close()
+
+    def test_lookup(self):
+        self.assertEqual(self.lookup('vyras'), [(1, 'vyras'), (5, 'vyras(2)')])
+        self.assertEqual(self.lookup('vyras(2)'), [(5, 'vyras(2)')])
+        self.assertEqual(self.lookup('vyras(3)'), [])
+        self.assertEqual(self.lookup('ąžuolas'), [(2, 'ąžuolas')])
+        self.assertEqual(self.lookup('vyr'), [(6, 'vyr')])
+        self.assertEqual(self.lookup('vyrasis'), [])
+        self.assertEqual(self.lookup('a'), [])
+        self.assertEqual(self.lookup('žz'), [])
+        self.assertTrue(os.path.exists(self.path + lookup.INDEX_SUFFIX))
+
+    def test_rebuild(self):
+        self.assertEqual(self.lookup('ąžuolas'), [(2, 'ąžuolas')])
+        self.write('ąžuolas 1 - 1 1\n' + LEXEMES)
+        self.assertFalse(lookup.is_fresh(self.path,
+                                         self.path + lookup.INDEX_SUFFIX))
+        self.assertEqual(self.lookup('ąžuolas'), [(1, 'ąžuolas'),
+                                                   (3, 'ąžuolas')])
+
+    def test_in_memory(self):
+        index = lookup.LexemeIndex(self.path, lookup.build(self.path))
+        self.assertEqual([i for i, line in index.lookup('vyrai')], [4])
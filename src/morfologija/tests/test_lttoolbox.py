@@ -0,0 +1,74 @@
+import io
+import unittest
+import xml.etree.ElementTree as ET
+
+from .. import model
+from ..converters.lttoolbox import Converter
+from ..paradigms import ParadigmCollection
+
+from .utils import mdl
+from .utils import data
+from .utils import create_line
+
+
+class ConverterTests(unittest.TestCase):
+    def convert(self, lines, paradigms=mdl.paradigms):
+        converter = Converter(mdl.grammar, paradigms, mdl.sources, lines)
+        output = io.StringIO()
+        converter.write(output)
+        return converter, ET.fromstring(output.getvalue())
+
+    def test_dix(self):
+        converter, dix = self.convert([
+            create_line('vyras', 'noun', declension=1),
+            create_line('geras', 'adjective'),
+            create_line('ratas', 'noun', declension=1),
+            create_line('Jonas', 'noun', declension=1, properness='name'),
+        ])
+
+        self.assertEqual(converter.errors, [
+            (2, 'Can not find lemma for Būdvardis.'),
+        ])
+
+        entries = [
+            (e.get('lm'), e.find('i').text, e.find('par').get('n'))
+            for e in dix.find('section')
+        ]
+        self.assertEqual(entries, [
+            ('vyras', 'vyr', 'vyr/as__n'),
+            ('ratas', 'rat', 'vyr/as__n'),
+            ('Jonas', 'Jon', 'Jon/as__n'),
+        ])
+
+        pardefs = dix.find('pardefs')
+        self.assertEqual([p.get('n') for p in pardefs],
+                         ['vyr/as__n', 'Jon/as__n'])
+        e = pardefs[0][1].find('p')
+        self.assertEqual(e.find('l').text, 'o')
+        self.assertEqual(e.find('r').text, 'as')
+        self.assertEqual([s.get('n') for s in e.find('r')],
+                         ['n', 'm', 'sg', 'gen'])
+
+        sdefs = {s.get('n'): s.get('c') for s in dix.find('sdefs')}
+        self.assertEqual(sdefs['gen'], 'Kilmininkas')
+        self.assertEqual(sdefs['n'], 'Daiktavaris')
+        self.assertIn('ant', sdefs)
+
+    def test_invalid_lines(self):
+        paradigms = ParadigmCollection([
+            paradigm for paradigm in model.read_yaml(data('paradigms.yaml'))
+            if paradigm['key'] != 'Jon/as'
+        ])
+        converter, dix = self.convert([
+            'vyras 1',
+            'šuo 1 - x 1',
+            create_line('Jonas', 'noun', declension=1, properness='name'),
+            create_line('vyras', 'noun', declension=1),
+        ], paradigms)
+        self.assertEqual(converter.errors, [
+            (1, 'Line has 2 fields, at least 4 are required.'),
+            (2, 'Invalid signature x 1.'),
+            (3, 'Unknown paradigm Jon/as.'),
+        ])
+        self.assertEqual([e.get('lm') for e in dix.find('section')],
+                         ['vyras'])
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import model
+from ..grammar import Grammar
+from ..utils import undump
+
+from .utils import data
+
+
+class ModelCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        for name in model.SOURCE_FILES:
+            shutil.copy(data(name), self.data_dir)
+        self.cache = os.path.join(self.data_dir, model.CACHE_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def touch(self, name, mtime):
+        path = os.path.join(self.data_dir, name)
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_compile(self):
+        self.assertFalse(model.is_fresh(self.data_dir))
+        mdl = model.compile(self.data_dir)
+        self.assertTrue(os.path.exists(self.cache))
+        self.assertTrue(model.is_fresh(self.data_dir))
+        self.assertIsInstance(mdl.grammar, Grammar)
+
+    def test_load_from_cache(self):
+        model.compile(self.data_dir)
+        mdl = model.load(self.data_dir)
+        self.assertEqual(list(mdl.grammar.poses), [
+            'noun', 'adjective', 'numeral', 'pronoun', 'verb', 'adverb',
+            'particle', 'preposition', 'conjungtion', 'interjection',
+            'verbal-interjection',
+        ])
+        self.assertEqual(mdl.paradigms.get('vyr/as').key, 'vyr/as')
+        self.assertEqual(mdl.sources.get(code=1).label, 'DLKŽ72')
+
+    def test_stale_cache(self):
+        model.compile(self.data_dir)
+        mtime = os.stat(self.cache).st_mtime_ns
+        self.touch(model.CACHE_FILE, mtime - 10**9)
+        self.assertFalse(model.is_fresh(self.data_dir))
+        model.load(self.data_dir)
+        self.assertTrue(model.is_fresh(self.data_dir))
+
+    def test_cache_version(self):
+        model.compile(self.data_dir)
+        header = ('morfologija.model', '0.0', 0)
+        self.assertIsNone(undump(self.cache, header))
+        self.assertIsNotNone(undump(self.cache, model.CACHE_HEADER))
@@ -3,6 +3,7 @@ import unittest
 
 from ..paradigms import Paradigm
 from ..paradigms import ParadigmCollection
+from ..lexemes import LexemeError
 
 RES = dict(
     paradigms = """\
@@ -209,6 +210,27 @@ class NodeTests(unittest.TestCase):
             ([['ait', 'i', 'uose']], {'case': 'loc', 'gender': 'm', 'number': 'pl'}),
         ])
 
+    def test_table(self):
+        paradigm = self.paradigms.get('brol/el/is')
+        table = paradigm.table('suffixes')
+        self.assertIs(table, self.paradigms.table('brol/el/is', 'suffixes'))
+        self.assertEqual(table[:2], (
+            ((('el', 'is'),), (('gender', 'm'), ('number', 'sg'), ('case', 'nom'))),
+            ((('el', 'io'),), (('gender', 'm'), ('number', 'sg'), ('case', 'gen'))),
+        ))
+        self.assertEqual(
+            [(list(map(list, forms)), dict(symbols)) for forms, symbols in table],
+            list(paradigm.affixes('suffixes')),
+        )
+
+    def test_unknown_paradigm(self):
+        with self.assertRaisesRegex(LexemeError, 'Unknown paradigm nėra'):
+            self.paradigms.get('nėra')
+        paradigms = ParadigmCollection([
+            dict(key='a', extends=[dict(keys='nėra')]),
+        ])
+        self.assertRaises(LexemeError, paradigms.table, 'a', 'suffixes')
+
 
 class ParadigmPrefixMethodTests(unittest.TestCase):
     """
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import postings
+
+LEXEMES = """\
+vyras 1 - 1 1 1 1 1 1 0
+Jonas 1 - 1 2 1 1 1 1 0
+
+geras 2 - 2 0 0 3
+martis 1 - 1 1 1 1 4 2 1
+ratas 3 - 1 1 1 1 1 1 0
+"""
+
+
+class PostingsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'lexemes.txt')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(LEXEMES)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def query(self, *conditions):
+        return [
+            line.split()[0]
+            for i, line in postings.query(self.path, conditions)
+        ]
+
+    def test_equal(self):
+        self.assertEqual(self.query('3=1'),
+                         ['vyras', 'Jonas', 'martis', 'ratas'])
+        self.assertEqual(self.query('1=2'), ['geras'])
+        self.assertEqual(self.query('3=1', '4=2'), ['Jonas'])
+        self.assertEqual(self.query('3=5'), [])
+        self.assertEqual(self.query('12=0'), [])
+
+    def test_not_equal(self):
+        self.assertEqual(self.query('3=1', '9!=0'), ['martis'])
+        self.assertEqual(self.query('4!=1'), ['Jonas', 'geras'])
+
+    def test_ranges(self):
+        self.assertEqual(self.query('8>=2'), ['martis'])
+        self.assertEqual(self.query('1=2..3'), ['geras', 'ratas'])
+        self.assertEqual(self.query('1=1,3', '4<2'),
+                         ['vyras', 'martis', 'ratas'])
+        self.assertEqual(self.query('1!=1..2'), ['ratas'])
+
+    def test_line_numbers(self):
+        lines = list(postings.query(self.path, ['6=3']))
+        self.assertEqual(lines, [(4, 'geras 2 - 2 0 0 3')])
+
+    def test_invalid(self):
+        self.assertRaises(postings.QueryError, self.query, '3')
+        self.assertRaises(postings.QueryError, self.query, '3>1,2')
+
+    def test_cache(self):
+        self.query('3=1')
+        cache = self.path + postings.POSTINGS_SUFFIX
+        self.assertTrue(os.path.exists(cache))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('vėjas 1 - 1 1 1 1 2 1 0\n')
+        self.assertEqual(self.query('7=2'), ['vėjas'])
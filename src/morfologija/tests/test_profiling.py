@@ -0,0 +1,47 @@
+import io
+import unittest
+
+from .. import lexemes
+from .. import profiling
+
+from .utils import create_lexeme
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self):
+        profiling.reset()
+        profiling.enable(report_at_exit=False)
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_stages(self):
+        lexeme = create_lexeme('vyras', 'noun', declension=1)
+        forms = list(lexeme.genforms())
+        stages = profiling.stages
+        self.assertEqual(stages['Lexeme'].calls, 1)
+        self.assertEqual(stages['get_stem'].calls, 1)
+        self.assertEqual(stages['genforms'].calls, 1)
+        self.assertEqual(stages['genforms'].items, len(forms))
+        self.assertGreater(stages['Lexeme'].seconds, 0)
+        self.assertGreater(stages['sound changes'].items, 0)
+
+        create_lexeme('ratas', 'noun', declension=1).get_stem()
+        rates = {name: (lookups, hits)
+                 for name, lookups, hits in profiling.get_cache_rates()}
+        self.assertEqual(rates['pardef selection'][0],
+                         stages['get_pardefs'].calls)
+        self.assertGreater(rates['pardef selection'][1], 0)
+
+        output = io.StringIO()
+        profiling.report(output)
+        self.assertIn('genforms', output.getvalue())
+        self.assertIn('paradigm tables', output.getvalue())
+
+    def test_disable(self):
+        self.assertTrue(profiling.is_enabled())
+        self.assertTrue(hasattr(lexemes.Lexeme.get_stem, '__wrapped__'))
+        profiling.disable()
+        self.assertFalse(profiling.is_enabled())
+        self.assertFalse(hasattr(lexemes.Lexeme.get_stem, '__wrapped__'))
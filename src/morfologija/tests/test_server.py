@@ -0,0 +1,113 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import http.client
+
+from .. import model
+from .. import server
+from .. import analyzer
+
+from .utils import data
+from .utils import create_line
+
+
+class ServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data_dir = tempfile.mkdtemp()
+        for name in model.SOURCE_FILES:
+            shutil.copy(data(name), cls.data_dir)
+        with open(os.path.join(cls.data_dir, 'lexemes.txt'), 'w') as f:
+            f.write('\n'.join([
+                create_line('vyras', 'noun', declension=1),
+                create_line('geras', 'adjective'),
+            ]) + '\n')
+        analyzer.compile(model.load(cls.data_dir), cls.data_dir)
+
+        cls.morfologija = server.Server(cls.data_dir, processes=1)
+        cls.httpd = server.create_server(cls.morfologija, port=0)
+        cls.thread = threading.Thread(target=cls.httpd.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        cls.thread.join()
+        cls.morfologija.close()
+        shutil.rmtree(cls.data_dir)
+
+    def request(self, method, path, data=None):
+        host, port = self.httpd.server_address
+        conn = http.client.HTTPConnection(host, port)
+        body = None if data is None else json.dumps(data)
+        conn.request(method, path, body)
+        response = conn.getresponse()
+        result = response.status, json.loads(response.read().decode('utf-8'))
+        conn.close()
+        return result
+
+    def test_analyze(self):
+        status, result = self.request('POST', '/analyze', 'vyro')
+        self.assertEqual(status, 200)
+        self.assertEqual(result, [{
+            'lemma': 'vyras', 'pos': 'noun',
+            'symbols': {'gender': 'm', 'number': 'sg', 'case': 'gen'},
+        }])
+
+    def test_batch(self):
+        status, result = self.request('POST', '/analyze', ['vyrai', 'nėra'])
+        self.assertEqual(status, 200)
+        self.assertEqual([len(r) for r in result], [2, 0])
+
+    def test_get(self):
+        status, result = self.request('GET', '/lookup?word=vyras')
+        self.assertEqual(status, 200)
+        self.assertEqual(result[0]['line'], 1)
+        self.assertEqual(result[0]['pos'], 'noun')
+
+    def test_generate(self):
+        status, result = self.request('POST', '/generate', ['vyras', 'geras'])
+        self.assertEqual(status, 200)
+        vyras, geras = result
+        self.assertEqual(vyras[0]['forms'][1], {
+            'form': 'vyro',
+            'symbols': {'gender': 'm', 'number': 'sg', 'case': 'gen'},
+        })
+        self.assertEqual(geras, [{
+            'line': 2, 'error': 'Can not find lemma for Būdvardis.',
+        }])
+
+    def test_errors(self):
+        self.assertEqual(self.request('POST', '/nothing', 'vyras')[0], 404)
+        self.assertEqual(self.request('POST', '/lookup', 42)[0], 400)
+        self.assertEqual(self.request('GET', '/lookup')[0], 400)
+
+    def test_internal_error(self):
+        def analyze(word):
+            raise KeyError(word)
+        service = self.morfologija.service
+        service.analyze = analyze
+        try:
+            status, result = self.request('POST', '/analyze', 'vyro')
+        finally:
+            del service.analyze
+        self.assertEqual(status, 500)
+        self.assertEqual(result, {'error': 'Internal server error.'})
+        self.assertEqual(self.request('POST', '/analyze', 'vyro')[0], 200)
+
+    def test_pool(self):
+        service = server.Service(self.data_dir, load_analyzer=False)
+        self.assertIsNone(service.analyzer)
+        self.assertEqual(service.lookup('vyras')[0]['line'], 1)
+
+        morfologija = server.Server(self.data_dir, processes=2)
+        try:
+            words = ['vyras', 'nėra'] * server.BATCH_CHUNK_SIZE
+            self.assertEqual(morfologija.handle('lookup', words),
+                             self.morfologija.handle('lookup', words))
+        finally:
+            morfologija.close()
@@ -1,6 +1,11 @@
 import unittest
 
+from ..paradigms import ParadigmCollection
+from ..soundchanges import SoundChange
 from ..soundchanges import affrication
+from ..soundchanges import apply_rules
+from ..soundchanges import compile_forms
+from ..soundchanges import get_endings
 
 
 class AffricationTests(unittest.TestCase):
@@ -25,3 +30,79 @@ class AffricationTests(unittest.TestCase):
         self.assertAffrication('šird/ių',        'širdž/ių')
 
         self.assertAffrication('ąžuol/ait/iai',  'ąžuol/aič/iai')
+
+
+class CompileFormsTests(unittest.TestCase):
+    def test_stem(self):
+        forms = (('i',), ('ios',), ('ių',))
+        self.assertEqual(compile_forms(forms, 't'), (
+            (0, '', ('i',)),
+            (1, 'č', ('ios',)),
+            (1, 'č', ('ių',)),
+        ))
+        self.assertEqual(compile_forms(forms, 'l'), (
+            (0, '', ('i',)),
+            (0, '', ('ios',)),
+            (0, '', ('ių',)),
+        ))
+
+    def test_suffixes(self):
+        forms = (('ait', 'iai'), ('ait', 'is'))
+        self.assertEqual(compile_forms(forms, 'l'), (
+            (0, '', ('aič', 'iai')),
+            (0, '', ('ait', 'is')),
+        ))
+
+    def test_rules(self):
+        rules = [SoundChange('test', {'k': 'č'}, ['e'])]
+        self.assertEqual(compile_forms((('e',), ('a',)), 'k', rules), (
+            (1, 'č', ('e',)),
+            (0, '', ('a',)),
+        ))
+        self.assertEqual(apply_rules('rank', 'e', rules), 'ranč')
+        self.assertEqual(apply_rules('rank', 'e'), 'rank')
+
+
+class VariantsTests(unittest.TestCase):
+    def test_variants(self):
+        paradigms = ParadigmCollection([
+            dict(key='case', type='symbols', symbols=['nom', 'gen']),
+            dict(key='šird/is', symbols=dict(number='sg'), define=dict(
+                suffixes=dict(case=['is', 'ies']),
+            )),
+            dict(key='šird/ys', symbols=dict(number='pl'), define=dict(
+                suffixes=dict(case=['ys', 'ių']),
+            )),
+        ])
+        paradigm = paradigms.get('šird/ys')
+        table = paradigm.variants('suffixes', 'd')
+        self.assertEqual([forms for forms, symbols in table], [
+            ((0, '', ('ys',)),),
+            ((1, 'dž', ('ių',)),),
+        ])
+        self.assertIs(paradigm.variants('suffixes', 'd'), table)
+        self.assertEqual([forms for forms, symbols in
+                          paradigm.variants('suffixes', 'l')], [
+            ((0, '', ('ys',)),),
+            ((0, '', ('ių',)),),
+        ])
+        self.assertIs(paradigm.variants('suffixes', 'l'),
+                      paradigm.variants('suffixes', 'r'))
+
+    def test_compile(self):
+        self.assertEqual(get_endings(), ('d', 't'))
+        paradigms = ParadigmCollection([
+            dict(key='case', type='symbols', symbols=['nom', 'gen']),
+            dict(key='šird/ys', define=dict(
+                suffixes=dict(case=['ys', 'ių']),
+            )),
+        ])
+        paradigms.compile('suffixes')
+        self.assertEqual(sorted(paradigms.variant_tables), [
+            ('case', 'suffixes', ''),
+            ('case', 'suffixes', 'd'),
+            ('case', 'suffixes', 't'),
+            ('šird/ys', 'suffixes', ''),
+            ('šird/ys', 'suffixes', 'd'),
+            ('šird/ys', 'suffixes', 't'),
+        ])
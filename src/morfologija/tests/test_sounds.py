@@ -1,5 +1,10 @@
 import unittest
 
+from ..sounds import SOUND_CLASSES
+from ..sounds import segment
+from ..sounds import join_sounds
+from ..sounds import iter_vowels
+from ..sounds import leading_vowels
 from ..sounds import split_sounds
 
 
@@ -11,3 +16,29 @@ class SplitSoundsTests(unittest.TestCase):
     def test_split_sounds(self):
         self.assertSplitSounds(['dž', 'i', 'n', 'a', 's'])
         self.assertSplitSounds(['j', 'u', 'o', 'dž', 'e', 'm', 'i', 's'])
+
+
+class SegmentTests(unittest.TestCase):
+    def test_segment(self):
+        ids = segment('džiaugsmas')
+        self.assertEqual(len(ids), 9)
+        self.assertEqual(join_sounds(ids), 'džiaugsmas')
+        self.assertEqual(''.join(SOUND_CLASSES[i] for i in ids), 'TVVVTSRVS')
+
+    def test_unknown_sound(self):
+        ids = segment('x-ray')
+        self.assertEqual(join_sounds(ids), 'x-ray')
+        self.assertEqual(SOUND_CLASSES[ids[0]], '?')
+        self.assertEqual(segment('x'), ids[:1])
+
+    def test_iter_vowels(self):
+        self.assertEqual(list(iter_vowels('')), [])
+        self.assertEqual(list(iter_vowels('ia')), ['ia'])
+        self.assertEqual(list(iter_vowels('iams')), ['ia', ''])
+        self.assertEqual(list(iter_vowels('kiemas')), ['', 'ie', 'a'])
+
+    def test_leading_vowels(self):
+        self.assertEqual(leading_vowels('iams'), 'ia')
+        self.assertEqual(leading_vowels('mas'), '')
+        self.assertEqual(leading_vowels(segment('iams')), 'ia')
+        self.assertEqual(leading_vowels(segment('mas')), '')
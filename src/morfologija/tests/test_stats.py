@@ -0,0 +1,118 @@
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from .. import stats
+from .. import benchmarks
+
+from .utils import mdl
+from .utils import data_dir
+from .utils import create_line
+
+
+class StatsTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('ratas', 'noun', declension=1),
+            create_line('Jonas', 'noun', declension=1, properness='name'),
+            create_line('vėjas', 'noun', declension=2),
+            create_line('geras', 'adjective'),
+            'bad line',
+        ]
+
+    def count(self, keys, **kwargs):
+        keys = stats.parse_keys(keys, mdl.grammar)
+        return stats.count_lines(data_dir, self.lines, keys, **kwargs)
+
+    def test_parse_keys(self):
+        self.assertEqual(stats.parse_keys(['3', 'pos', 'properness'],
+                                          mdl.grammar),
+                         [3, 'pos', 'properness'])
+        self.assertRaises(stats.StatsError, stats.parse_keys, ['2'],
+                          mdl.grammar)
+        self.assertRaises(stats.StatsError, stats.parse_keys, ['nėra'],
+                          mdl.grammar)
+
+    def test_count_lines(self):
+        result = self.count(['pos', 'properness'], processes=1)
+        self.assertEqual(result.counts, {
+            ('noun', 'appellative'): 3,
+            ('noun', 'name'): 1,
+            ('adjective', None): 1,
+            (None, None): 1,
+        })
+        self.assertEqual((result.lines, result.errors), (6, 1))
+
+        result = self.count(['pardef', '3'], processes=1)
+        self.assertEqual(result.counts, {
+            ('vyr/as', 1): 2,
+            ('Jon/as', 1): 1,
+            ('vėj/as', 1): 1,
+            (None, 2): 1,
+            (None, -1): 1,
+        })
+
+    def test_invalid_lines(self):
+        self.lines[1:] = ['vyras 1 - 1 x 1 1 1', 'šuo 1 - x 1']
+        result = self.count(['pos', 'pardef'], processes=1)
+        self.assertEqual(result.counts, {
+            ('noun', 'vyr/as'): 1,
+            (None, None): 2,
+        })
+        self.assertEqual((result.lines, result.errors), (3, 2))
+
+    def test_parallel(self):
+        serial = self.count(['pardefs', '4'], processes=1)
+        parallel = self.count(['pardefs', '4'], processes=2, chunksize=1)
+        self.assertEqual(serial.counts, parallel.counts)
+        self.assertEqual(serial.errors, parallel.errors)
+
+    def test_write(self):
+        result = self.count(['pos', '3'], processes=1)
+        output = io.StringIO()
+        stats.write_counts(result.counts, output)
+        self.assertEqual(output.getvalue().splitlines(), [
+            'noun 1,4', 'adjective 2,1', '? -1,1',
+        ])
+
+        output = io.StringIO()
+        stats.write_json(result, output)
+        data = json.loads(output.getvalue())
+        self.assertEqual(data['keys'], ['pos', 3])
+        self.assertEqual(data['groups'][0], {'values': ['noun', 1],
+                                             'count': 4})
+
+
+class SignatureCountsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'counts.txt')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('1 1 1 1 3,2\n2 0 0 3 0,1\n')
+        signatures = list(benchmarks.read_counts(self.path))
+        with open(os.path.join(self.tmp, 'lexemes.txt'), 'w',
+                  encoding='utf-8') as f:
+            for signature in signatures:
+                for i in range(signature.count):
+                    line = benchmarks.create_line('žodis', signature.pos,
+                                                  signature.params)
+                    f.write(line + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_signatures(self):
+        result = stats.count(self.tmp)
+        self.assertEqual(result.keys, [3, 4, 5, 6, 7])
+        output = io.StringIO()
+        stats.write_counts(result.counts, output)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(output.getvalue(), f.read())
+
+    def test_columns(self):
+        result = stats.count(self.tmp, ['1', '7', '12'])
+        self.assertEqual(result.counts, {(1, 3, -1): 2, (1, 0, -1): 1})
@@ -1,6 +1,10 @@
 import unittest
 
+from ..sounds import segment
 from ..syllabification import syllabificate
+from ..syllabification import syllabificate_all
+from ..syllabification import syllabificate_column
+from ..syllabification import tostr
 
 
 class SyllabificationTest(unittest.TestCase):
@@ -25,3 +29,33 @@ class SyllabificationTest(unittest.TestCase):
         #self.assertSyllabification('in-du-iz-mas')
         #self.assertSyllabification('su-i-ro')
         #self.assertSyllabification('juod-že-mis')
+
+    def test_cache(self):
+        syllabificate.cache_clear()
+        self.assertEqual(syllabificate('medus'), ('me', 'dus'))
+        self.assertIs(syllabificate('medus'), syllabificate('medus'))
+        info = syllabificate.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+    def test_sound_ids(self):
+        self.assertEqual(syllabificate(segment('džiaugsmas')),
+                         syllabificate('džiaugsmas'))
+        self.assertEqual(syllabificate('džiaugsmas'), ('džiaug', 'smas'))
+
+    def test_tostr(self):
+        self.assertEqual([tostr(s) for s in ['š', 'dž', 't', 'r', 'a', 'x']],
+                         ['S', 'T', 'T', 'R', '?', '?'])
+
+
+class BatchSyllabificationTests(unittest.TestCase):
+    def test_syllabificate_all(self):
+        words = ['medus', 'siena', 'medus']
+        expected = [('me', 'dus'), ('sie', 'na'), ('me', 'dus')]
+        self.assertEqual(syllabificate_all(words), expected)
+        self.assertEqual(syllabificate_all(words, processes=2), expected)
+
+    def test_syllabificate_column(self):
+        lines = ['gyvybė 1 - 1', '', 'kalnai 1 - 1']
+        self.assertEqual(syllabificate_column(lines), [
+            ('gy', 'vy', 'bė'), ('kal', 'nai'),
+        ])
@@ -0,0 +1,64 @@
+import unittest
+
+from .. import validation
+
+from .utils import mdl
+from .utils import data_dir
+from .utils import create_line
+
+
+class ValidationTests(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            create_line('vyras', 'noun', declension=1),
+            create_line('geras', 'adjective'),
+            'bad line',
+            'vyras 999 - 1 1 1 1 1',
+            'vyras 1 - 99 1',
+            'vyras 1 - 1 99 1 1 0 1 0 0 0 1 0 0 0 0 0 0 0 0 0 0',
+            create_line('vėjas', 'noun', declension=2),
+        ]
+
+    def check(self, line):
+        return list(validation.check_line(mdl, line))
+
+    def test_check_line(self):
+        self.assertEqual(self.check(self.lines[0]), [])
+        self.assertEqual(self.check(self.lines[1]), [
+            ('stem', 'Can not find lemma for Būdvardis.'),
+        ])
+        self.assertEqual(self.check(self.lines[2]), [
+            ('syntax', 'Expected at least 4 fields, got 2.'),
+        ])
+        self.assertEqual(self.check(self.lines[3]), [
+            ('source', 'Unknown source code 999.'),
+        ])
+        self.assertEqual(self.check(self.lines[4]), [
+            ('pos', 'Unknown part of speech code 99.'),
+        ])
+        self.assertEqual(self.check(self.lines[5]), [
+            ('value', 'Unknown value 99 for field 4 (Tikriniškumas).'),
+        ])
+        self.assertEqual(
+            self.check(create_line('vyrai', 'noun', declension=1)),
+            [('stem', 'vyrai does not end with lemma suffix as.')],
+        )
+
+    def test_check_paradigm(self):
+        self.assertIsNone(validation.check_paradigm(mdl.paradigms, 'vyr/as'))
+        self.assertEqual(validation.check_paradigm(mdl.paradigms, 'nėra'),
+                         'Unknown paradigm nėra.')
+
+    def test_validate(self):
+        report = validation.validate(data_dir, self.lines, processes=1)
+        self.assertEqual(report.lines, 7)
+        self.assertEqual([error.lineno for error in report.errors],
+                         [2, 3, 4, 5, 6])
+        self.assertEqual(report.invalid_lines(), 5)
+        self.assertEqual(report.counts()['stem'], 1)
+
+    def test_parallel_order(self):
+        serial = validation.validate(data_dir, self.lines, processes=1)
+        parallel = validation.validate(data_dir, self.lines, processes=2,
+                                       chunksize=1)
+        self.assertEqual(serial.errors, parallel.errors)
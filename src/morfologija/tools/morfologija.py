@@ -1,24 +1,104 @@
 """Morphology database tool.
 
 Usage:
-  morfologija <lexeme> [-d <path>]
+  morfologija compile [analyzer | dawg | completion] [--frequencies=<file>] [-d <path>] [--profile]
+  morfologija analyze <form>... [-d <path>] [--profile]
+  morfologija complete <prefix> [--limit=<n>] [-d <path>] [--profile]
+  morfologija generate [-o <file>] [-f <format>] [-j <n>] [-d <path>] [--profile]
+  morfologija update -o <file> [-f <format>] [-j <n>] [-d <path>] [--profile]
+  morfologija validate [-o <file>] [-f <format>] [-j <n>] [-d <path>] [--profile]
+  morfologija dix [-o <file>] [-d <path>] [--profile]
+  morfologija query <condition>... [-d <path>] [--profile]
+  morfologija serve [--host=<host>] [--port=<port>] [--socket=<path>] [-j <n>] [-v] [-d <path>] [--profile]
+  morfologija stats [<key>...] [-o <file>] [--json=<file>] [-j <n>] [-d <path>] [--profile]
+  morfologija benchmark [<name>...] [-o <file>] [-n <lines>] [-r <n>] [--counts=<file>] [-d <path>] [--profile]
+  morfologija <lexeme> [-d <path>] [--profile]
+
+Commands:
+  compile               Build grammar, sources and paradigms from YAML files
+                        and write them to the binary model cache.
+  compile analyzer      Build reverse analyzer from all lexemes.txt forms.
+  compile dawg          Build minimal automaton of all lexemes.txt forms.
+  compile completion    Build prefix completion index of all lexemes.txt
+                        lexemes and forms, ranked by --frequencies if given.
+  analyze               Print lemma, part of speech and symbols of each
+                        reading of given word forms. Compiled automaton is
+                        used if analyzer is not compiled.
+  complete              Print words starting with given prefix and their
+                        lemmas.
+  generate              Write all forms of all lexemes to output file.
+  update                Update form list written by generate to output file
+                        and compiled analyzer after changes of data files,
+                        only lexemes affected by changes are generated
+                        again. Everything is generated on first run.
+  validate              Check all lexemes.txt lines and write every error:
+                        unknown source, part of speech and value codes,
+                        unmatched paradigm definitions, unknown paradigms
+                        and stems, that can not be derived. Summary is
+                        printed to standard error.
+  dix                   Export lexemes to Apertium lttoolbox dictionary.
+  query                 Print lexemes.txt lines matching all conditions,
+                        for example: 3=1 5=2 9!=0 7=2..4 8>=3. Numbers on the
+                        left are column numbers, starting from 0.
+  serve                 Run JSON over HTTP server with /lookup, /generate
+                        and /analyze endpoints.
+  stats                 Count lexemes.txt lines grouped by given keys and
+                        write counts in lmdb-counts.txt format. Key is a
+                        column number, as in query, or one of: pos,
+                        pardef, pardefs or a field name, for example
+                        properness. Without keys, lines are counted by
+                        signature.
+  benchmark             Run performance benchmarks and write results as
+                        JSON. Only given benchmarks are run, if any names
+                        are given. If there is no lexemes.txt file, a
+                        synthetic lexicon, sampled from signature counts,
+                        is used.
 
 Options:
   <lexeme>              A lexeme from morphology database.
   -h --help             Show this screen.
   -d --data-dir=<path>  Data directory [default: data].
+  -o --output=<file>    Output file, - for standard output [default: -].
+  -f --format=<format>  Output format, tsv or jsonl [default: tsv].
+  -j --jobs=<n>         Number of worker processes, defaults to number of
+                        CPUs.
+  --host=<host>         Server host [default: 127.0.0.1].
+  --port=<port>         Server port [default: 8000].
+  --socket=<path>       Listen on Unix socket instead of TCP port.
+  -v --verbose          Log each request.
+  -n --lines=<lines>    Number of synthetic lexicon lines [default: 10000].
+  -r --repeat=<n>       Number of runs of each benchmark [default: 3].
+  --counts=<file>       Signature counts file [default: lmdb-counts.txt].
+  --frequencies=<file>  Word frequency list, a word and its frequency in
+                        each line.
+  --json=<file>         Also write counts as JSON to given file.
+  --limit=<n>           Maximum number of completions [default: 10].
+  --profile             Print time spent in each processing stage and cache
+                        hit rates at exit, runs a single process.
 
 """
 
-import yaml
+import sys
+import json
 import docopt
 import os.path
 import textwrap
 
-from ..nodes import Node
-from ..grammar import Grammar
+from .. import model
+from .. import analyzer
+from .. import dawg
+from .. import completion
+from .. import benchmarks
+from .. import generation
+from .. import incremental
+from .. import lookup
+from .. import postings
+from .. import profiling
+from .. import server
+from .. import stats
+from .. import validation
+from ..converters.lttoolbox import Converter
 from ..lexemes import Lexeme
-from ..paradigms import ParadigmCollection
 
 wrapper = textwrap.TextWrapper(subsequent_indent='       ')
 
@@ -37,85 +117,301 @@ def print_field(field_code, field_label, value_code, value_label):
     print()
 
 
-def print_lexeme_details(f, query, grammar, paradigms, sources, data):
-    for i, line in enumerate(f, 1):
-        line = line.strip()
-        if line.startswith(query + ' ') or \
-            line.startswith(query + '('):
-            try:
-                lexeme = Lexeme(grammar, paradigms, sources, line)
-            except:
-                print('Error in line: {}'.format(line.strip()))
-                print('      in {}:{}'.format(data('lexemes.txt'), i))
-                raise
-
-            print('Leksema: {}'.format(lexeme.lexeme))
-            print('Vieta: {}:{}'.format(data('lexemes.txt'), i))
-            print('Eilutė: {}'.format(line.strip()))
-            print('Parametrai:\n{}'.format('\n'.join([
-                '    {}: {}'.format(
-                    k, (', '.join(v) if isinstance(v, list) else v)
-                )
-                for k, v in dict(lexeme.symbols, **lexeme.names).items()
-            ])))
-            print()
-
-            print_field(1, 'Šaltinis', lexeme.source.code, lexeme.source.label)
-            print_field(2, 'Lemma', None, lexeme.lemma)
-            print_field(3, 'Kalbos dalis', lexeme.pos.code, lexeme.pos.label)
-
-            for value in lexeme.properties:
-                print_field(value.field.code, value.field.label,
-                            value.code, value.label)
-
-                for pardef in lexeme.get_pardefs(value.node):
-                    print('    [{}]'.format(pardef))
-                    paradigm = paradigms.get(pardef)
-                    for forms, symbols in lexeme.affixes(value, paradigm, 'suffixes'):
-                        symbols = ', '.join([
-                            symbols[key]
-                            for key in ('number', 'gender', 'case')
-                        ])
-
-                        word = ', '.join([
-                            '%s/%s' % (stem, '/'.join(suffix))
-                            for stem, suffix in forms
-                        ])
-
-                        print('    {}: {}'.format(symbols, word))
-                    print()
-
-
-def print_query_lexemes(f, query):
-    key, val = map(int, query.split('='))
-    for i, line in enumerate(f, 1):
-        line = line.strip()
-        fields = line.split()
-        fields[3:] = list(map(int, fields[3:]))
-        if len(fields) > key and fields[key] == val:
+def print_lexeme_details(lines, grammar, paradigms, sources, data):
+    for i, line in lines:
+        try:
+            lexeme = Lexeme(grammar, paradigms, sources, line).resolve()
+        except:
+            print('Error in line: {}'.format(line.strip()))
+            print('      in {}:{}'.format(data('lexemes.txt'), i))
+            raise
+
+        print('Leksema: {}'.format(lexeme.lexeme))
+        print('Vieta: {}:{}'.format(data('lexemes.txt'), i))
+        print('Eilutė: {}'.format(line.strip()))
+        print('Parametrai:\n{}'.format('\n'.join([
+            '    {}: {}'.format(
+                k, (', '.join(v) if isinstance(v, (list, tuple)) else v)
+            )
+            for k, v in dict(lexeme.symbols, **lexeme.names).items()
+        ])))
+        print()
+
+        print_field(1, 'Šaltinis', lexeme.source.code, lexeme.source.label)
+        print_field(2, 'Lemma', None, lexeme.lemma)
+        print_field(3, 'Kalbos dalis', lexeme.pos.code, lexeme.pos.label)
+
+        for value in lexeme.properties:
+            print_field(value.field.code, value.field.label,
+                        value.code, value.label)
+
+            for pardef in lexeme.get_pardefs(value.node):
+                print('    [{}]'.format(pardef))
+                paradigm = paradigms.get(pardef)
+                for forms, symbols in lexeme.affixes(value, paradigm, 'suffixes'):
+                    symbols = ', '.join([
+                        symbols[key]
+                        for key in ('number', 'gender', 'case')
+                    ])
+
+                    word = ', '.join([
+                        '%s/%s' % (stem, '/'.join(suffix))
+                        for stem, suffix in forms
+                    ])
+
+                    print('    {}: {}'.format(symbols, word))
+                print()
+
+
+def print_query_lexemes(path, conditions):
+    try:
+        for i, line in postings.query(path, conditions):
             print(line)
+    except postings.QueryError as e:
+        print(e)
+
+
+def print_analyses(forms, analyzer):
+    for form in forms:
+        readings = analyzer.analyze(form)
+        if not readings:
+            print('{}: ?'.format(form))
+        for reading in readings:
+            print('{}: {} {} {}'.format(
+                form, reading.lemma, reading.pos,
+                ' '.join(symbol for key, symbol in reading.symbols),
+            ))
+
+
+def print_completions(prefix, limit, index):
+    for item in index.complete(prefix, limit):
+        print('{}: {}'.format(item.form, ', '.join(item.lemmas)))
+
+
+def generate(data_dir, output, fmt, jobs):
+    data = lambda name: os.path.join(data_dir, name)
+    errors = []
+    with open(data('lexemes.txt'), encoding='utf-8') as f:
+        if output == '-':
+            stats = generation.generate(data_dir, f, sys.stdout, fmt, jobs,
+                                        errors=errors)
+        else:
+            with open(output, 'w', encoding='utf-8') as out:
+                stats = generation.generate(data_dir, f, out, fmt, jobs,
+                                            errors=errors)
+
+    for i, error in errors:
+        print('{}:{}: {}'.format(data('lexemes.txt'), i, error),
+              file=sys.stderr)
+    speed = stats.lines / stats.seconds if stats.seconds else 0
+    print('{} forms from {} lines ({} errors) in {:.2f}s, {:.0f} lines/s'.
+          format(stats.forms, stats.lines, stats.errors, stats.seconds, speed),
+          file=sys.stderr)
+
+
+def update(data_dir, output, fmt, jobs):
+    data = lambda name: os.path.join(data_dir, name)
+    errors = []
+    stats = incremental.update(data_dir, output, fmt, jobs, errors)
+    for i, error in errors:
+        print('{}:{}: {}'.format(data('lexemes.txt'), i, error),
+              file=sys.stderr)
+    if stats.full:
+        print('{} lines generated in {:.2f}s'.format(stats.lines,
+                                                     stats.seconds),
+              file=sys.stderr)
+    else:
+        print('{} of {} lines generated again ({} changed paradigms) in '
+              '{:.2f}s'.format(stats.affected, stats.lines, stats.paradigms,
+                               stats.seconds),
+              file=sys.stderr)
+
+
+def validate(data_dir, output, fmt, jobs):
+    data = lambda name: os.path.join(data_dir, name)
+    with open(data('lexemes.txt'), encoding='utf-8') as f:
+        report = validation.validate(data_dir, f, jobs)
+
+    if fmt == 'jsonl':
+        text = ''.join(
+            json.dumps(error._asdict(), ensure_ascii=False) + '\n'
+            for error in report.errors
+        )
+    else:
+        text = ''.join(
+            '{}\t{}\t{}\n'.format(*error) for error in report.errors
+        )
+    if output == '-':
+        sys.stdout.write(text)
+    else:
+        with open(output, 'w', encoding='utf-8') as out:
+            out.write(text)
+
+    counts = ', '.join('{}: {}'.format(kind, n)
+                       for kind, n in report.counts().items() if n)
+    print('{} errors in {} of {} lines{} in {:.2f}s'.format(
+        len(report.errors), report.invalid_lines(), report.lines,
+        ' ({})'.format(counts) if counts else '', report.seconds,
+    ), file=sys.stderr)
+    return report
+
+
+def export_dix(mdl, data_dir, output):
+    data = lambda name: os.path.join(data_dir, name)
+    with open(data('lexemes.txt'), encoding='utf-8') as f:
+        converter = Converter(mdl.grammar, mdl.paradigms, mdl.sources, f)
+        if output == '-':
+            converter.write(sys.stdout)
+        else:
+            with open(output, 'w', encoding='utf-8') as out:
+                converter.write(out)
+
+    for i, error in converter.errors:
+        print('{}:{}: {}'.format(data('lexemes.txt'), i, error),
+              file=sys.stderr)
+    print('{} paradigm definitions written'.format(len(converter.pardefs)),
+          file=sys.stderr)
+
+
+def print_stats(data_dir, keys, output, json_output, jobs):
+    try:
+        result = stats.count(data_dir, keys, jobs)
+    except stats.StatsError as e:
+        print(e, file=sys.stderr)
+        return
+    if output == '-':
+        stats.write_counts(result.counts, sys.stdout)
+    else:
+        with open(output, 'w', encoding='utf-8') as out:
+            stats.write_counts(result.counts, out)
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as out:
+            stats.write_json(result, out)
+    print('{} groups of {} lines ({} errors) in {:.2f}s'.format(
+        len(result.counts), result.lines, result.errors, result.seconds,
+    ), file=sys.stderr)
+
+
+def benchmark(data_dir, output, names, lines, repeat, counts):
+    results = benchmarks.run(data_dir, counts, lines, repeat, names)
+    if output == '-':
+        benchmarks.write(results)
+    else:
+        with open(output, 'w', encoding='utf-8') as out:
+            benchmarks.write(results, out)
+
+    for name, result in results['benchmarks'].items():
+        print('{:20} {:10.4f}s {:12.2f}us/op'.format(
+            name, result['best'], result['per_op_us'] or 0,
+        ), file=sys.stderr)
 
 
 def main():
     args = docopt.docopt(__doc__)
+    if args['--profile']:
+        profiling.enable()
+
     data_dir = args['--data-dir']
     data = lambda name: os.path.join(data_dir, name)
 
-    with open(data('grammar.yaml'), encoding='utf-8') as f:
-        grammar = yaml.load(f)
-    grammar = Grammar(Node(dict(nodes=grammar)))
+    if args['compile'] and not (args['analyzer'] or args['dawg'] or
+                                args['completion']):
+        model.compile(data_dir)
+        print('Model cache written to {}'.format(data(model.CACHE_FILE)))
+        return
 
-    with open(data('sources.yaml'), encoding='utf-8') as f:
-        sources = yaml.load(f)
-    sources = Node(dict(nodes=sources))
+    jobs = int(args['--jobs']) if args['--jobs'] else None
+    if profiling.is_enabled():
+        # Stages run by worker processes are not counted.
+        jobs = 1
 
-    with open(data('paradigms.yaml'), encoding='utf-8') as f:
-        paradigms = yaml.load(f)
-    paradigms = ParadigmCollection(paradigms)
+    if args['generate']:
+        generate(data_dir, args['--output'], args['--format'], jobs)
+        return
 
-    with open(data('lexemes.txt'), encoding='utf-8') as f:
-        query = args['<lexeme>']
-        if '=' in query:
-            print_query_lexemes(f, query)
-        else:
-            print_lexeme_details(f, query, grammar, paradigms, sources, data)
+    if args['update']:
+        update(data_dir, args['--output'], args['--format'], jobs)
+        return
+
+    if args['validate']:
+        report = validate(data_dir, args['--output'], args['--format'], jobs)
+        sys.exit(1 if report.errors else 0)
+
+    if args['stats']:
+        print_stats(data_dir, args['<key>'], args['--output'],
+                    args['--json'], jobs)
+        return
+
+    if args['benchmark']:
+        benchmark(data_dir, args['--output'], args['<name>'],
+                  int(args['--lines']), int(args['--repeat']),
+                  args['--counts'])
+        return
+
+    if args['serve']:
+        server.serve(data_dir, args['--host'], int(args['--port']),
+                     args['--socket'], jobs, args['--verbose'])
+        return
+
+    mdl = model.load(data_dir)
+    grammar, sources, paradigms = mdl.grammar, mdl.sources, mdl.paradigms
+
+    if args['compile'] and args['analyzer']:
+        anl = analyzer.compile(mdl, data_dir)
+        for i, error in anl.errors:
+            print('{}:{}: {}'.format(data('lexemes.txt'), i, error))
+        print('Analyzer with {} forms written to {}'.format(
+            len(anl), data(analyzer.ANALYZER_FILE)))
+        return
+
+    if args['compile'] and args['dawg']:
+        errors = dawg.compile(mdl, data_dir)
+        for i, error in errors:
+            print('{}:{}: {}'.format(data('lexemes.txt'), i, error))
+        print('Automaton written to {}'.format(data(dawg.DAWG_FILE)))
+        return
+
+    if args['compile'] and args['completion']:
+        index, errors = completion.compile(mdl, data_dir,
+                                           args['--frequencies'])
+        for i, error in errors:
+            print('{}:{}: {}'.format(data('lexemes.txt'), i, error))
+        print('Completion index with {} words written to {}'.format(
+            len(index), data(completion.COMPLETION_FILE)))
+        return
+
+    if args['complete']:
+        index = completion.load(data_dir)
+        if index is None:
+            print('Completion index is not compiled, run: '
+                  'morfologija compile completion')
+            return
+        print_completions(args['<prefix>'], int(args['--limit']), index)
+        return
+
+    if args['dix']:
+        export_dix(mdl, data_dir, args['--output'])
+        return
+
+    if args['analyze']:
+        anl = analyzer.load(data_dir)
+        if anl is None:
+            anl = dawg.load(data_dir)
+        if anl is None:
+            print('Analyzer is not compiled, run: morfologija compile analyzer')
+            return
+        print_analyses(args['<form>'], anl)
+        return
+
+    if args['query']:
+        print_query_lexemes(data('lexemes.txt'), args['<condition>'])
+        return
+
+    query = args['<lexeme>']
+    if '=' in query:
+        print_query_lexemes(data('lexemes.txt'), [query])
+    else:
+        index = lookup.load(data('lexemes.txt'))
+        lines = index.lookup(query)
+        print_lexeme_details(lines, grammar, paradigms, sources, data)
+        index.close()
@@ -1,3 +1,6 @@
+import os
+import pickle
+
 from fn.iters import head
 
 first = head
@@ -25,3 +28,31 @@ def getnested(d, keys, default=None):
         else:
             return default
     return d
+
+
+def dump(path, header, obj):
+    """Atomically write pickled ``obj`` prefixed with ``header`` to ``path``."""
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def undump(path, header):
+    """Read object written by ``dump``.
+
+    Returns None if file does not exist or was written with different header.
+
+    """
+    try:
+        with open(path, 'rb') as f:
+            if pickle.load(f) != header:
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
@@ -0,0 +1,168 @@
+"""Lexicon validation.
+
+Checks every ``lexemes.txt`` line and collects all errors, instead of
+stopping at the first one. Lexicon is split into chunks of lines and chunks
+are checked by a pool of worker processes, the same way as in
+``generation``. Errors are reported in line order.
+
+Each error has a kind:
+
+syntax
+    Line has too few fields or fields, that must be numbers, are not.
+
+source
+    Unknown source code.
+
+pos
+    Unknown part of speech code.
+
+value
+    Unknown property value code. Every unknown value of a line is reported.
+
+pardef
+    Node has ``pardefs``, but none of them matches lexeme.
+
+paradigm
+    Paradigm definition key, or a key it extends, is not in paradigms.
+
+stem
+    Stem can not be derived from lexeme, or lexeme does not end with lemma
+    suffix of its paradigm.
+
+"""
+
+import os
+import time
+import collections
+
+from .generation import chunks
+from .generation import imap_model
+from .lexemes import Lexeme
+from .lexemes import LexemeError
+from .lexemes import iterlines
+
+KINDS = ('syntax', 'source', 'pos', 'value', 'pardef', 'paradigm', 'stem')
+
+Error = collections.namedtuple('Error', 'lineno kind message')
+
+
+class Report(object):
+    def __init__(self):
+        self.lines = 0
+        self.errors = []
+        self.seconds = 0
+
+    def counts(self):
+        """Return number of errors of each kind."""
+        counts = collections.OrderedDict((kind, 0) for kind in KINDS)
+        for error in self.errors:
+            counts[error.kind] += 1
+        return counts
+
+    def invalid_lines(self):
+        return len({error.lineno for error in self.errors})
+
+
+def parse_line(line):
+    """Return ``(source code, pos code, params)`` of a line."""
+    fields = line.split()
+    if len(fields) < 4:
+        raise ValueError('Expected at least 4 fields, got %d.' % len(fields))
+    try:
+        numbers = [int(field) for field in [fields[1]] + fields[3:]]
+    except ValueError as e:
+        raise ValueError('Fields 1 and 3 and following must be numbers, %s.'
+                         % e)
+    return numbers[0], numbers[1], tuple(numbers[2:])
+
+
+def check_signature(grammar, pos_code, params):
+    """Yield ``(kind, message)`` of unknown pos and value codes."""
+    pos = grammar.get_pos_by_code(pos_code)
+    if pos is None:
+        yield 'pos', 'Unknown part of speech code %s.' % pos_code
+        return
+    for field, value_code in zip(pos.fields.values(), params):
+        if field.get_value_by_code(value_code) is None:
+            yield 'value', 'Unknown value %s for field %s (%s).' % (
+                value_code, field.code, field.label,
+            )
+
+
+def check_paradigm(paradigms, key):
+    """Return error message if paradigm can not be resolved, else None."""
+    if key not in paradigms.paradigms:
+        return 'Unknown paradigm %s.' % key
+    try:
+        paradigms.table(key, 'suffixes')
+    except LexemeError as e:
+        return 'Paradigm %s can not be resolved: %s' % (key, e)
+    return None
+
+
+def check_line(mdl, line):
+    """Yield ``(kind, message)`` of all errors of a ``lexemes.txt`` line."""
+    try:
+        source, pos, params = parse_line(line)
+    except ValueError as e:
+        yield 'syntax', str(e)
+        return
+
+    if mdl.sources.get(code=source) is None:
+        yield 'source', 'Unknown source code %s.' % source
+
+    errors = list(check_signature(mdl.grammar, pos, params))
+    if errors:
+        yield from errors
+        return
+
+    lexeme = Lexeme(mdl.grammar, mdl.paradigms, mdl.sources, line)
+    resolved = True
+    for value in lexeme.properties:
+        keys = lexeme.get_pardefs(value.node)
+        if value.node.pardefs and not keys:
+            resolved = False
+            yield 'pardef', 'No paradigm definition of %s matches %s.' % (
+                value.label, lexeme.lexeme,
+            )
+        for key in keys:
+            message = check_paradigm(mdl.paradigms, key)
+            if message is not None:
+                resolved = False
+                yield 'paradigm', message
+
+    if resolved:
+        try:
+            suffix = lexeme.get_lemma_suffix()
+        except LexemeError as e:
+            yield 'stem', str(e)
+        else:
+            if not lexeme.lexeme.endswith(suffix):
+                yield 'stem', '%s does not end with lemma suffix %s.' % (
+                    lexeme.lexeme, suffix,
+                )
+
+
+def validate_chunk(mdl, chunk):
+    """Return number of lines and list of ``Error``'s of a chunk."""
+    errors = []
+    for lineno, line in chunk:
+        for kind, message in check_line(mdl, line):
+            errors.append(Error(lineno, kind, message))
+    return len(chunk), errors
+
+
+def validate(data_dir, lines, processes=None, chunksize=2000):
+    """Check all ``lines`` and return ``Report``."""
+    processes = processes or os.cpu_count() or 1
+    started = time.time()
+    report = Report()
+    tasks = ((chunk,) for chunk in chunks(iterlines(lines), chunksize))
+
+    for nlines, errors in imap_model(data_dir, validate_chunk, tasks,
+                                     processes):
+        report.lines += nlines
+        report.errors.extend(errors)
+
+    report.seconds = time.time() - started
+    return report